@@ -0,0 +1,213 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import statistics
+import sys
+from .suite import BENCHMARKS, run_worker
+
+"""
+    Description
+    -----------
+    오프라인 벤치마크 실행(python -m benchmarks)
+    - 벤치마크마다 새 프로세스(spawn)에서 실행(공유 HTTP 클라이언트 상태, 최대 메모리가 서로 섞이지 않도록)
+    - --repeat번 실행하여 지표별 중앙값 사용(실행 간 편차 완화), 최소/최대값은 range에 저장
+    - 결과 파일에는 측정한 환경(host_info)을 함께 저장, 절대값이므로 같은 환경에서 측정한 결과끼리만 비교
+    - --save-baseline : 결과를 기준값 파일로 저장(이 환경에서 저장, 저장소에는 올리지 않음)
+    - --check : 기준값과 비교하여 tolerance보다 나빠진 지표가 있으면 종료코드 1
+      (실행 범위가 기준값의 실행 범위와 겹치면 편차로 보고 나빠진 것으로 보지 않음)
+      (기준값이 없거나 다른 환경에서 측정되었으면 비교하지 않고 종료코드 2)
+
+    Example
+    -------
+    python -m benchmarks --save-baseline
+    python -m benchmarks --only stock phone --check
+
+    # 두 커밋 비교(같은 환경)
+    git checkout <이전 커밋> && python -m benchmarks --output before.json
+    git checkout <현재 커밋> && python -m benchmarks --baseline before.json --check
+"""
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 비교할 지표와 방향(True: 클수록 좋음)
+METRICS = {
+    ('fetch', 'pages_per_s'): True,
+    ('parse', 'rows_per_s'): True,
+    ('parse', 'cpu_s'): False,
+    ('write', 'rows_per_s'): True,
+    ('e2e', 'pages_per_s'): True,
+    ('e2e', 'rows_per_s'): True,
+    ('e2e', 'cpu_s'): False,
+    ('peak_rss_mb',): False,
+}
+
+def run_isolated(name, scale=1.0, recorded=None):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=run_worker, args=(name, scale, recorded, results))
+    process.start()
+    while True:
+        try:
+            result, error = results.get(timeout=1)
+            break
+        except queue.Empty:
+            if not process.is_alive():
+                result, error = None, '종료코드 {}'.format(process.exitcode)
+                break
+    process.join()
+    if error is not None:
+        raise RuntimeError('벤치마크 실행에 실패했습니다. ({}: {})'.format(name, error))
+    return result
+
+def host_info():
+    """
+        Description
+        -----------
+        측정 환경(호스트, CPU, Python), 같은 환경인지 비교하는 데 사용
+    """
+
+    return {'node': platform.node(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'cpus': os.cpu_count(), 'python': platform.python_version()}
+
+def median(results):
+    """
+        Description
+        -----------
+        여러 번 실행한 결과를 지표별 중앙값으로 합침(숫자가 아닌 값은 첫 번째 결과 사용)
+    """
+
+    first = results[0]
+    if isinstance(first, dict):
+        return {key: median([result[key] for result in results]) for key in first}
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return statistics.median(results)
+    return first
+
+def spread(results):
+    """
+        Description
+        -----------
+        여러 번 실행한 결과의 지표별 [최소값, 최대값](숫자가 아닌 값은 None)
+    """
+
+    first = results[0]
+    if isinstance(first, dict):
+        return {key: spread([result[key] for result in results]) for key in first}
+    if isinstance(first, (int, float)) and not isinstance(first, bool):
+        return [min(results), max(results)]
+    return None
+
+def save_results(path, results, repeat):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'host': host_info(), 'repeat': repeat, 'benchmarks': results}, f, indent=2)
+
+def load_results(path):
+    """
+        Output
+        ------
+        (측정 환경, {벤치마크: 결과}), 환경을 기록하지 않은 이전 형식은 측정 환경 None
+    """
+
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'benchmarks' not in data:
+        return None, data
+    return data.get('host'), data['benchmarks']
+
+def _value(result, metric):
+    for key in metric:
+        if result is None:
+            return None
+        result = result.get(key)
+    return result
+
+def compare(results, baseline, tolerance=0.2):
+    """
+        Description
+        -----------
+        기준값 대비 변화율 계산
+
+        Output
+        ------
+        [(벤치마크, 지표, 기준값, 현재값, 변화율, 나빠짐 여부), ...]
+    """
+
+    rows = []
+    for name, result in results.items():
+        for metric, higher in METRICS.items():
+            base = _value(baseline.get(name), metric)
+            value = _value(result, metric)
+            if not base or value is None:
+                continue
+            change = value / base - 1
+            regressed = change < -tolerance if higher else change > tolerance
+            base_range = _value(baseline[name].get('range'), metric)
+            value_range = _value(result.get('range'), metric)
+            if regressed and base_range and value_range:
+                # 가장 좋은 실행도 기준값의 가장 나쁜 실행보다 나빠야 함
+                regressed = value_range[1] < base_range[0] if higher else value_range[0] > base_range[1]
+            rows.append((name, '.'.join(metric), base, value, change, regressed))
+    return rows
+
+def print_results(results):
+    print('{:<12}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}{:>10}'.format(
+        'BENCHMARK', 'FETCH p/s', 'FETCH MB/s', 'PARSE r/s', 'PARSE cpu', 'WRITE r/s', 'E2E p/s', 'E2E r/s', 'RSS MB'))
+    for name, r in results.items():
+        print('{:<12}{:>12,.0f}{:>12}{:>12,.0f}{:>12.3f}{:>12,.0f}{:>12,.0f}{:>12,.0f}{:>10}'.format(
+            name, r['fetch']['pages_per_s'], '-' if r['fetch']['mb_per_s'] is None else '{:.1f}'.format(r['fetch']['mb_per_s']),
+            r['parse']['rows_per_s'], r['parse']['cpu_s'], r['write']['rows_per_s'], r['e2e']['pages_per_s'], r['e2e']['rows_per_s'],
+            '-' if r['peak_rss_mb'] is None else '{:.0f}'.format(r['peak_rss_mb'])))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='크롤러 오프라인 벤치마크')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='실행할 벤치마크(기본값: 전체)')
+    parser.add_argument('--scale', type=float, default=1.0, help='합성 데이터 규모(기본값: 1.0)')
+    parser.add_argument('--recorded', help='기록된 응답(ResponseCache 파일), 기록된 URL은 합성 페이지 대신 사용')
+    parser.add_argument('--repeat', type=int, default=5, help='벤치마크별 실행 횟수(지표별 중앙값 사용, 기본값: 5)')
+    parser.add_argument('--baseline', default=BASELINE, help='기준값 파일')
+    parser.add_argument('--save-baseline', action='store_true', help='결과를 기준값으로 저장')
+    parser.add_argument('--check', action='store_true', help='기준값보다 나빠지면 종료코드 1')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='허용 변화율(기본값: 0.2)')
+    parser.add_argument('--output', help='결과 저장 파일(JSON)')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print('벤치마크를 실행합니다. ({}, {}회)'.format(name, args.repeat), flush=True)
+        runs = [run_isolated(name, args.scale, args.recorded) for _ in range(max(1, args.repeat))]
+        results[name] = dict(median(runs), range=spread(runs))
+    print_results(results)
+
+    if args.output:
+        save_results(args.output, results, args.repeat)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            host, saved = load_results(args.baseline)
+            # 다른 환경에서 측정한 기준값과는 섞지 않음
+            if host == host_info():
+                baseline = saved
+        baseline.update(results)
+        save_results(args.baseline, baseline, args.repeat)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('기준값 파일이 없습니다. 이 환경에서 먼저 저장하세요. (--save-baseline, {})'.format(args.baseline))
+        return 2 if args.check else 0
+    host, baseline = load_results(args.baseline)
+    if host != host_info():
+        print('기준값이 다른 환경에서 측정되어 비교하지 않습니다. 이 환경에서 다시 저장하세요. (--save-baseline)')
+        print(' 기준값: {}'.format(host))
+        print(' 현재: {}'.format(host_info()))
+        return 2 if args.check else 0
+    rows = compare(results, baseline, args.tolerance)
+    print('{:<12}{:<20}{:>14}{:>14}{:>9}'.format('BENCHMARK', 'METRIC', 'BASELINE', 'CURRENT', 'CHANGE'))
+    for name, metric, base, value, change, regressed in rows:
+        print('{:<12}{:<20}{:>14,.3f}{:>14,.3f}{:>+8.0%}{}'.format(name, metric, base, value, change, '  !' if regressed else ''))
+    return 1 if args.check and any(row[-1] for row in rows) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
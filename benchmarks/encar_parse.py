@@ -0,0 +1,137 @@
+import argparse
+import os
+import sys
+import time
+import pandas as pd
+from crawler.encar import CAR_LIST_COLUMNS, TABLE_COLUMNS, normalize_car_list, parse_car_list
+
+"""
+    Description
+    -----------
+    엔카 목록 파서 비교(python -m benchmarks.encar_parse)
+    - legacy_car_list : 이전 추출 방식(BeautifulSoup으로 파싱한 뒤 행마다 컬럼별 select_one)
+    - parse_car_list : 현재 방식(lxml, 행마다 하위 요소를 한 번만 순회)
+    - 저장된 목록 페이지(tests/fixtures/encar)에서 두 방식으로 저장할 값(normalize_car_list 결과)이 같은지 확인하고
+      처리 속도 비교(DataFrame 생성 포함)
+    - 들여쓰기된(prettify) 페이지에서는 PRC 원문의 공백이 다르지만 숫자로 변환하므로 저장 값은 같음
+
+    Example
+    -------
+    python -m benchmarks.encar_parse --copies 40
+"""
+
+PAGES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures', 'encar')
+
+def load_pages():
+    """
+        Description
+        -----------
+        저장된 목록 페이지 {파일명: html}
+    """
+
+    pages = {}
+    for name in sorted(os.listdir(PAGES)):
+        if name.endswith('.html'):
+            with open(os.path.join(PAGES, name), 'r', encoding='utf-8') as f:
+                pages[name] = f.read()
+    return pages
+
+def legacy_car_list(content):
+    """
+        Description
+        -----------
+        이전 추출 방식(user-014 이전 _parse_page의 추출 부분)
+
+        Output
+        ------
+        {컬럼명: 값 리스트} (CAR_LIST_COLUMNS 순서)
+    """
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'lxml')
+    rows = []
+    for car in soup.select('tr')[1:]:
+        name1 = car.select_one('span.cls > strong').text
+        name2 = car.select_one('span.cls > em').text
+        name3 = car.select_one('span.dtl > strong').text
+        name4 = car.select_one('span.dtl > em').text
+        yer = car.select_one('span.yer').text
+        km = car.select_one('span.km').text
+        fue = car.select_one('span.fue').text
+        loc = car.select_one('span.loc').text
+        ins = '' if car.select_one('span.ins') == None else car.select_one('span.ins').text
+        ass = '' if car.select_one('span.ass') == None else car.select_one('span.ass').text
+        prc = car.select_one('td.prc_hs').text
+        link = car.select_one('a').attrs['href']
+        rows.append((name1, name2, name3, name4, yer, km, fue, loc, ins, ass, prc, link))
+    return {column: [row[i] for row in rows] for i, column in enumerate(CAR_LIST_COLUMNS)}
+
+def to_table(columns):
+    """
+        Description
+        -----------
+        추출 결과를 테이블에 저장할 형식으로 변환(_parse_page와 같은 변환)
+    """
+
+    df = pd.DataFrame(columns, columns=CAR_LIST_COLUMNS)
+    df.insert(0, 'BASE_DATE', '2020-05-20')
+    df.insert(1, 'CODE', 'benz')
+    df['LINK'] = 'http://www.encar.com' + df['LINK']
+    return normalize_car_list(df)
+
+def differences(pages=None):
+    """
+        Description
+        -----------
+        두 방식으로 저장할 값이 다른 (파일명, 컬럼) 리스트
+    """
+
+    pages = pages or load_pages()
+    result = []
+    for name, content in pages.items():
+        legacy, current = to_table(legacy_car_list(content)), to_table(parse_car_list(content))
+        if len(legacy) != len(current):
+            result.append((name, 'rows'))
+            continue
+        result.extend((name, column) for column in TABLE_COLUMNS if not legacy[column].equals(current[column]))
+    return result
+
+def measure(parse, contents, repeat=3):
+    """
+        Description
+        -----------
+        모든 페이지를 DataFrame으로 만드는 데 걸린 시간(repeat번 중 최솟값, 초)
+    """
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            pd.DataFrame(parse(content))
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.encar_parse', description='엔카 목록 파서 비교(이전 방식 대비)')
+    parser.add_argument('--copies', type=int, default=40, help='페이지를 반복할 횟수(기본값: 40)')
+    parser.add_argument('--repeat', type=int, default=3, help='측정 반복 횟수(최솟값 사용, 기본값: 3)')
+    args = parser.parse_args(argv)
+
+    pages = load_pages()
+    diff = differences(pages)
+    if diff:
+        print('결과가 다릅니다. ({})'.format(', '.join('{}:{}'.format(name, column) for name, column in diff)))
+        return 1
+    contents = list(pages.values()) * args.copies
+    rows = sum(len(parse_car_list(content)['LINK']) for content in pages.values()) * args.copies
+    legacy = measure(legacy_car_list, contents, args.repeat)
+    current = measure(parse_car_list, contents, args.repeat)
+    print('페이지 {:,}개, {:,}행'.format(len(contents), rows))
+    print('{:<28}{:>10.2f}s{:>12,.0f} rows/s'.format('BeautifulSoup + select_one', legacy, rows / legacy))
+    print('{:<28}{:>10.2f}s{:>12,.0f} rows/s  ({:.1f}x)'.format('lxml single pass', current, rows / current, legacy / current))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
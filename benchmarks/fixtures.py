@@ -0,0 +1,284 @@
+import json
+import random
+import sqlite3
+import threading
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from requests.adapters import HTTPAdapter
+
+"""
+    Description
+    -----------
+    벤치마크/테스트용 로컬 HTTP 서버(네이버 일별 시세, 세티즌 단말기 목록/시세, 엔카 검색 API와 브라우저 목록 페이지)
+    - 실제 페이지와 같은 구조의 합성 페이지를 규모(scale)에 맞춰 결정적으로 생성
+    - recorded(ResponseCache 파일)를 주면 기록된 URL은 기록된 응답을 그대로 재생
+      (실제 서버로 한 번 수집할 때 DBCrawler.set_cache('recorded.db')로 기록)
+    - FixtureAdapter가 모든 요청을 로컬 서버로 보내고 원래 URL은 X-Original-URL 헤더로 전달
+"""
+
+class Pages:
+    """
+        Description
+        -----------
+        합성 페이지 생성기
+
+        Input
+        -----
+        days : 일별 시세 페이지의 전체 일수
+        pnos : 단말기 수
+        phone_days : 단말기별 시세 일수
+        cars : 엔카 검색 결과 차량 수
+    """
+
+    def __init__(self, days=2000, pnos=300, phone_days=120, cars=2000):
+        self.days = [(date(2020, 5, 20) - timedelta(d)).strftime('%Y.%m.%d') for d in range(days)]
+        self.pnos = pnos
+        self.phone_days = phone_days
+        self.cars = cars
+
+    def daily_quote(self, page, per, columns, last_link=False):
+        """
+            Description
+            -----------
+            네이버 일별 시세 페이지(last_link : 10페이지를 넘으면 [맨뒤] 링크 표시, 주가 페이지만 해당)
+        """
+
+        rows = self.days[(page - 1) * per:page * per]
+        last = -(-len(self.days) // per)
+        pager = '<td class="on"><a href="?page={0}">{0}</a></td>'.format(page)
+        if last_link and last > 10:
+            pager += '<td class="pgRR"><a href="?page={}">맨뒤</a></td>'.format(last)
+        trs = ''.join('<tr><td align="center"><span class="tah p10 gray03">{}</span></td>'.format(day)
+                      + ''.join('<td class="num"><span class="tah p11">{:,.2f}</span></td>'.format(1000 + (i * 7 + j) % 500) for j in range(columns))
+                      + '</tr><tr><td colspan="{}" height="1" bgcolor="#e6e6e6"></td></tr>'.format(columns + 1)
+                      for i, day in enumerate(rows, start=(page - 1) * per))
+        return ('<html><head><meta http-equiv="Content-Type" content="text/html; charset=euc-kr"></head><body>'
+                '<table class="type2"><tr><th>날짜</th>' + '<th>값</th>' * columns + '</tr>' + trs + '</table>'
+                '<table class="Nnavi"><tr>' + pager + '</tr></table></body></html>').encode('cp949')
+
+    def catalog(self):
+        groups = ['1', '2', '3', '7', '1,2', '1,3', '2,3', '1,2,3', '1,2,3,7', '9', '0']
+        divs = []
+        for i in range(self.pnos):
+            div = ('<div name="wireless_{}[]"><ul><li style="float:left;width:180px"><a href="/market.php?q=info&amp;pno={}">모델{}</a></li>'
+                   '<li style="float:left;width:80px">SM-{}</li><li style="float:left;width:80px">{:,}원</li><li style="float:left">-</li></ul></div>').format(groups[i % len(groups)], 7000 + i, i, i, 100000 + i)
+            divs.append(div)
+            divs.append(div)
+        return ('<html><head><meta charset="euc-kr"></head><body>' + ''.join(divs) + '</body></html>').encode('cp949')
+
+    def price_history(self, pno):
+        pno = int(pno)
+        rows = ',\r\n\t'.join('{{date:"{}",low:{},mid:{},high:{}}}'.format((date(2020, 5, 17) - timedelta(d)).strftime('%Y-%m-%d'), 100000 + pno + d, 150000 + pno, 200000)
+                              for d in range(self.phone_days))
+        scripts = ''.join('<script type="text/javascript">var x{} = [1,2];</script>'.format(i) for i in range(18))
+        return ('<html><head><meta charset="euc-kr"></head><body>' + scripts + '<script type="text/javascript">\r\n\tvar chart = [\r\n\t'
+                + rows + '\r\n\t];\r\n</script></body></html>').encode('cp949')
+
+    def car(self, i):
+        rnd = random.Random(i)
+        return {'Id': str(30000000 + i), 'Manufacturer': '벤츠', 'Model': 'E-클래스 W213', 'Badge': 'E300 4MATIC', 'BadgeDetail': '아방가르드' if i % 3 else '',
+                'FuelType': '가솔린', 'Year': 201000.0 + rnd.randint(10, 20) * 100 + rnd.randint(1, 12), 'Mileage': float(rnd.randint(0, 200000)),
+                'OfficeCityState': '서울', 'Price': float(rnd.randint(500, 15000)), 'Condition': ['Inspection'] + (['Record'] if i % 2 else [])}
+
+    def car_search(self, offset, limit):
+        cars = [self.car(i) for i in range(offset, min(offset + limit, self.cars))]
+        return json.dumps({'Count': self.cars, 'SearchResults': cars}, ensure_ascii=False).encode('utf-8')
+
+    def car_list(self, page, rows=50):
+        """
+            Description
+            -----------
+            엔카 목록 테이블(브라우저에서 읽는 table outerHTML)
+        """
+
+        trs = []
+        for i in range((page - 1) * rows, min(page * rows, self.cars)):
+            car = self.car(i)
+            ym = int(car['Year'])
+            trs.append(('<tr><td class="img"><a href="/dc/dc_cardetailview.do?carid={id}&amp;pageid=dc_carsearch"><img src="x.jpg"></a></td>'
+                        '<td class="inf"><a href="/dc/dc_cardetailview.do?carid={id}"><span class="cls"><strong>{m}</strong> <em>{mo}</em></span>'
+                        '<span class="dtl"><strong>{b}</strong> <em>{bd}</em></span></a>'
+                        '<span class="detail"><span class="yer">{yy:02d}/{mm:02d}식</span><span class="km">{km:,}km</span><span class="fue">{f}</span><span class="loc">{l}</span></span>'
+                        '<span class="service">{ins}<span class="ass">성능점검</span></span></td>'
+                        '<td class="prc_hs"><strong>{prc:,}</strong>만원</td></tr>').format(
+                id=car['Id'], m=car['Manufacturer'], mo=car['Model'], b=car['Badge'], bd=car['BadgeDetail'], yy=ym // 100 % 100, mm=ym % 100,
+                km=int(car['Mileage']), f=car['FuelType'], l=car['OfficeCityState'], ins='<span class="ins">보험이력</span>' if i % 2 else '', prc=int(car['Price'])))
+        return ('<table class="car_list"><thead><tr><th>사진</th><th>차량정보</th><th>가격</th></tr></thead><tbody id="sr_normal">'
+                + ''.join(trs) + '</tbody></table>')
+
+    def car_list_page(self, hash_route):
+        """
+            Description
+            -----------
+            엔카 브라우저 목록 페이지(스크립트가 /fixture/car_list에서 목록 테이블을 받아 그림)
+            - hash_route=True : url의 #! 뒤 검색 조건(page, limit)으로 목록을 그림(fc_carsearchlist)
+            - hash_route=False : 20개씩 보기로 시작, select#pagerow, div#pagination의 페이지 번호 클릭으로 이동(ev_carsearchlist)
+        """
+
+        script = '''
+            var cars = %d, limit = 20;
+            function load(page) {
+                var xhr = new XMLHttpRequest();
+                xhr.open('GET', '/fixture/car_list?page=' + page + '&limit=' + limit, false);
+                xhr.send();
+                document.getElementById('list').innerHTML = xhr.responseText;
+                var links = '', last = Math.ceil(cars / limit);
+                for (var p = page + 1; p <= Math.min(last, page + 9); p++) {
+                    links += '<a href="javascript:void(0)" data-page="' + p + '">' + p + '</a> ';
+                }
+                document.getElementById('pagination').innerHTML = links;
+            }
+            function route() {
+                var fragment = location.hash.slice(2), search = fragment ? JSON.parse(decodeURIComponent(fragment)) : {};
+                limit = search.limit || 20;
+                load(search.page || 1);
+            }
+            document.getElementById('pagerow').onchange = function () { limit = parseInt(this.value); load(1); };
+            document.getElementById('pagination').onclick = function (e) {
+                var page = e.target.getAttribute('data-page');
+                if (page) { load(parseInt(page)); }
+            };
+            %s
+            route();
+        ''' % (self.cars, 'window.onhashchange = route;' if hash_route else '')
+        return ('<!DOCTYPE html><html><head><meta charset="utf-8"></head><body>'
+                '<select id="pagerow"><option value="20" selected>20개씩</option><option value="50">50개씩</option></select>'
+                '<div id="list"></div><div id="pagination"></div><script>' + script + '</script></body></html>').encode('utf-8')
+
+    def response(self, url):
+        """
+            Description
+            -----------
+            원래 URL에 해당하는 (상태코드, 본문)
+        """
+
+        u = urlparse(url)
+        q = {key: values[0] for key, values in parse_qs(u.query).items()}
+        page = int(q.get('page', 1))
+        if u.path.endswith('/sise_day.nhn'):
+            return 200, self.daily_quote(page, 10, 6, last_link=True)
+        if u.path.endswith('/exchangeDailyQuote.nhn'):
+            return 200, self.daily_quote(page, 10, 3)
+        if u.path.endswith('/worldDailyQuote.nhn'):
+            return 200, self.daily_quote(page, 7, 2)
+        if u.path.endswith('/goldDailyQuote.nhn') or u.path.endswith('/interestDailyQuote.nhn'):
+            return 200, self.daily_quote(page, 10, 4)
+        if u.netloc == 'price.cetizen.com' and u.path in ('', '/'):
+            return 200, self.catalog()
+        if u.path == '/market.php' and 'pno' in q:
+            return 200, self.price_history(q['pno'])
+        if u.path == '/search/car/list/general':
+            offset, limit = q['sr'].split('|')[2:4]
+            return 200, self.car_search(int(offset), int(limit))
+        if u.path in ('/fc/fc_carsearchlist.do', '/ev/ev_carsearchlist.do'):
+            return 200, self.car_list_page(u.path.startswith('/fc/'))
+        if u.path == '/fixture/car_list':
+            return 200, self.car_list(page, int(q.get('limit', 50))).encode('utf-8')
+        return 404, b''
+
+class FixtureServer:
+    """
+        Description
+        -----------
+        Pages(또는 기록된 응답)를 제공하는 로컬 HTTP 서버(요청 수, 전송 바이트 집계)
+
+        Example
+        -------
+        with FixtureServer(Pages()) as server:
+            server.install(DBCrawler.http)
+            ...
+    """
+
+    def __init__(self, pages, recorded=None):
+        self.pages = pages
+        self.recorded = {}
+        if recorded is not None:
+            conn = sqlite3.connect(recorded)
+            self.recorded = {url: zlib.decompress(content) for url, content in conn.execute('SELECT URL, CONTENT FROM RESPONSE_CACHE')}
+            conn.close()
+        self.requests = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._cache = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, body = server.respond(self.headers.get('X-Original-URL', self.path))
+                self.send_response(status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base = 'http://127.0.0.1:{}'.format(self.httpd.server_address[1])
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def respond(self, url):
+        if url in self.recorded:
+            status, body = 200, self.recorded[url]
+        else:
+            with self._lock:
+                response = self._cache.get(url)
+            if response is None:
+                response = self.pages.response(url)
+                with self._lock:
+                    self._cache[url] = response
+            status, body = response
+        with self._lock:
+            self.requests += 1
+            self.bytes += len(body)
+        return status, body
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes = 0
+
+    def install(self, http):
+        """
+            Description
+            -----------
+            HttpClient의 모든 요청을 로컬 서버로 보냄(set_max_in_flight를 다시 호출하면 다시 설치해야 함)
+        """
+
+        adapter = FixtureAdapter(self.base, pool_connections=16, pool_maxsize=max(16, http.max_in_flight))
+        http.session.mount('http://', adapter)
+        http.session.mount('https://', adapter)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class FixtureAdapter(HTTPAdapter):
+    """
+        Description
+        -----------
+        요청 URL을 로컬 서버로 바꾸고 원래 URL은 X-Original-URL 헤더로 전달하는 requests 어댑터
+    """
+
+    def __init__(self, base, **kwargs):
+        self.base = base
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        request.headers['X-Original-URL'] = request.url
+        u = urlparse(request.url)
+        request.url = self.base + (u.path or '/') + ('?' + u.query if u.query else '')
+        return super().send(request, **kwargs)
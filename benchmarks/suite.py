@@ -0,0 +1,270 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from abc import *
+from datetime import datetime
+import pandas as pd
+from crawler.DBCrawler import DBCrawler
+from crawler.StockPriceCrawler import StockPriceCrawler
+from crawler.OilPriceCrawler import OilPriceCrawler
+from crawler.ExchangeRateCrawler import ExchangeRateCrawler
+from crawler.naver import parse_daily_quote, to_iso_date
+from crawler.cetizen import PnoCrawler, UsedPhonePriceCrawler, parse_catalog, parse_price_history
+from crawler.encar import UsedCarPriceCrawler
+from .fixtures import FixtureServer, Pages
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+"""
+    Description
+    -----------
+    크롤러별 단계(fetch/parse/write)와 전체(e2e) 성능 측정
+    - fetch : 모든 페이지 요청(벽시계 시간, pages/s, MB/s)
+    - parse : 받은 페이지 파싱(CPU 시간, rows/s)
+    - write : 파싱 결과 저장(새 SQLite 파일, rows/s)
+    - parse, write는 짧으므로 min_seconds가 될 때까지 반복하여 1회 평균 사용
+    - e2e : crawler.run()(새 SQLite 파일, pages/s, rows/s, 프로세스 CPU 시간)
+    - 벤치마크마다 별도 프로세스에서 실행하여 최대 메모리(peak RSS) 측정
+"""
+
+HOSTS = ['finance.naver.com', 'price.cetizen.com', 'market.cetizen.com', 'api.encar.com', 'www.encar.com']
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if os.uname().sysname == 'Darwin' else rss / 2 ** 10
+
+class Benchmark(metaclass=ABCMeta):
+    """
+        Description
+        -----------
+        벤치마크 골격
+        - requests() : fetch 단계에서 받을 (url, params) 리스트
+        - parse(request, content) : 한 페이지의 DataFrame
+        - crawler(conn) : e2e/write 단계에서 사용할 크롤러(설정 완료 상태)
+    """
+
+    workers = 4
+    served = 0  # 서버를 거치지 않고 제공한 페이지 수
+    min_seconds = 0.5  # parse, write 단계의 최소 측정 시간
+
+    def requests(self, pages):
+        return []
+
+    @abstractmethod
+    def parse(self, request, content):
+        pass
+
+    @abstractmethod
+    def crawler(self, conn, pages):
+        pass
+
+    def fetch(self, server, pages):
+        requests = self.requests(pages)
+        server.reset()
+        start = time.perf_counter()
+        contents = [content for request, content in DBCrawler._map(lambda request: DBCrawler.http.get(*request), requests, self.workers)]
+        seconds = time.perf_counter() - start
+        return list(zip(requests, contents)), {'seconds': seconds, 'pages': len(requests), 'pages_per_s': len(requests) / seconds, 'mb_per_s': server.bytes / 2 ** 20 / seconds}
+
+    def run_parse(self, fetched):
+        rounds = 0
+        cpu = time.process_time()
+        start = time.perf_counter()
+        while True:
+            frames = [self.parse(request, content) for request, content in fetched]
+            rounds += 1
+            seconds = time.perf_counter() - start
+            if seconds >= self.min_seconds:
+                break
+        seconds /= rounds
+        cpu = (time.process_time() - cpu) / rounds
+        rows = sum(len(frame) for frame in frames)
+        return frames, {'seconds': seconds, 'cpu_s': cpu, 'rows': rows, 'rows_per_s': rows / seconds if seconds else 0.0}
+
+    def run_write(self, frames, pages, directory):
+        df = pd.concat(frames, ignore_index=True)
+        rounds = 0
+        seconds = 0.0
+        while rounds == 0 or seconds < self.min_seconds:
+            # 매번 새 파일에 저장(같은 행을 다시 저장하면 변경 없는 upsert가 되어 측정 대상이 달라짐)
+            conn = sqlite3.connect(os.path.join(directory, 'write{}.db'.format(rounds)))
+            crawler = self.crawler(conn, pages)
+            start = time.perf_counter()
+            for offset in range(0, len(df), crawler.batch_rows):
+                crawler._upsert(df.iloc[offset:offset + crawler.batch_rows])
+            seconds += time.perf_counter() - start
+            conn.close()
+            rounds += 1
+        seconds /= rounds
+        return {'seconds': seconds, 'rows': len(df), 'rows_per_s': len(df) / seconds if seconds else 0.0}
+
+    def run_e2e(self, server, pages, directory):
+        conn = sqlite3.connect(os.path.join(directory, 'e2e.db'))
+        crawler = self.crawler(conn, pages)
+        server.install(DBCrawler.http)
+        for host in HOSTS:
+            DBCrawler.http.set_rate(host, rate=1e9, max_rate=1e9, burst=1000)
+        server.reset()
+        self.served = 0
+        cpu = time.process_time()
+        start = time.perf_counter()
+        crawler.run()
+        seconds = time.perf_counter() - start
+        cpu = time.process_time() - cpu
+        rows = conn.execute('SELECT COUNT(*) FROM {}'.format(crawler.table_name)).fetchone()[0]
+        conn.close()
+        pages = server.requests + self.served
+        return {'seconds': seconds, 'cpu_s': cpu, 'pages': pages, 'rows': rows,
+                'pages_per_s': pages / seconds, 'rows_per_s': rows / seconds}
+
+class NaverBenchmark(Benchmark):
+
+    def __init__(self, cls, codes, url, column, per):
+        self.cls = cls
+        self.codes = codes
+        self.url = url
+        self.column = column
+        self.per = per
+
+    def requests(self, pages):
+        count = -(-len(pages.days) // self.per) + 1
+        return [(self.url.format(code, page),) for code in self.codes for page in range(1, count + 1)]
+
+    def parse(self, request, content):
+        dates, values = parse_daily_quote(content)
+        code = request[0].split('=')[1].split('&')[0]
+        return pd.DataFrame({'BASE_DATE': to_iso_date(dates), 'CODE': code, self.column: values})
+
+    def crawler(self, conn, pages):
+        crawler = self.cls(conn)
+        crawler.set_code(self.codes)
+        crawler.set_workers(len(self.codes))
+        return crawler
+
+class PnoBenchmark(Benchmark):
+
+    def __init__(self):
+        self.wireless = None
+
+    def requests(self, pages):
+        return [('https://price.cetizen.com/',)]
+
+    def parse(self, request, content):
+        if self.wireless is None:
+            self.wireless = PnoCrawler(sqlite3.connect(':memory:')).wireless
+        return parse_catalog(content, self.wireless)
+
+    def crawler(self, conn, pages):
+        return PnoCrawler(conn)
+
+class PhoneBenchmark(Benchmark):
+
+    workers = 8
+
+    def requests(self, pages):
+        return [('https://market.cetizen.com/market.php', {'q': 'info', 'pno': str(7000 + i)}) for i in range(pages.pnos)]
+
+    def parse(self, request, content):
+        return UsedPhonePriceCrawler._to_frame([request[1]['pno']], [parse_price_history(content)])
+
+    def crawler(self, conn, pages):
+        crawler = UsedPhonePriceCrawler(conn)
+        crawler.set_pno([str(7000 + i) for i in range(pages.pnos)])
+        crawler.set_workers(self.workers)
+        return crawler
+
+class EncarApiBenchmark(Benchmark):
+
+    def requests(self, pages):
+        return [('http://api.encar.com/search/car/list/general', {'count': 'true', 'q': '(And.Hidden.N._.(C.CarType.N._.Manufacturer.벤츠.))', 'sr': '|ModifiedDate|{}|100'.format(offset)})
+                for offset in range(0, pages.cars, 100)]
+
+    def parse(self, request, content):
+        return UsedCarPriceCrawler._parse_api('benz', json.loads(content)['SearchResults'])
+
+    def crawler(self, conn, pages):
+        crawler = UsedCarPriceCrawler(conn)
+        crawler.set_code(['benz'])
+        return crawler
+
+class EncarListBenchmark(Benchmark):
+    """
+        Description
+        -----------
+        브라우저 수집 경로(목록 테이블 html → 파싱 → 저장), 브라우저 대신 합성 목록 테이블을 재생
+    """
+
+    def fetch(self, server, pages):
+        count = -(-pages.cars // 50)
+        start = time.perf_counter()
+        fetched = [((page,), pages.car_list(page)) for page in range(1, count + 1)]
+        seconds = time.perf_counter() - start
+        return fetched, {'seconds': seconds, 'pages': count, 'pages_per_s': count / seconds if seconds else 0.0, 'mb_per_s': None}
+
+    def parse(self, request, content):
+        return UsedCarPriceCrawler._parse_page('benz', content, datetime.now().strftime('%Y-%m-%d'))
+
+    def crawler(self, conn, pages):
+        crawler = UsedCarPriceCrawler(conn, mode='browser')
+        crawler.set_code(['benz'])
+
+        def get_source(code, emit, stop=None):
+            for page in range(1, -(-pages.cars // 50) + 1):
+                self.served += 1
+                emit(page, pages.car_list(page))
+
+        crawler._get_source = get_source
+        return crawler
+
+BENCHMARKS = {
+    'stock': NaverBenchmark(StockPriceCrawler, ['005930', '005830'], 'https://finance.naver.com/item/sise_day.nhn?code={}&page={}', 'PRICE', 10),
+    'fx': NaverBenchmark(ExchangeRateCrawler, ['FX_USDKRW'], 'https://finance.naver.com/marketindex/exchangeDailyQuote.nhn?marketindexCd={}&page={}', 'RATE', 10),
+    'oil': NaverBenchmark(OilPriceCrawler, ['OIL_CL'], 'https://finance.naver.com/marketindex/worldDailyQuote.nhn?marketindexCd={}&fdtc=2&page={}', 'PRICE', 7),
+    'pno': PnoBenchmark(),
+    'phone': PhoneBenchmark(),
+    'encar_api': EncarApiBenchmark(),
+    'encar_list': EncarListBenchmark(),
+}
+
+def run_benchmark(name, scale=1.0, recorded=None):
+    """
+        Description
+        -----------
+        벤치마크 하나를 실행하고 단계별 결과 반환(현재 프로세스에서 실행)
+
+        Output
+        ------
+        {'fetch': {...}, 'parse': {...}, 'write': {...}, 'e2e': {...}, 'peak_rss_mb': ...}
+    """
+
+    benchmark = BENCHMARKS[name]
+    pages = Pages(days=int(2000 * scale), pnos=int(300 * scale), phone_days=120, cars=int(2000 * scale))
+    with FixtureServer(pages, recorded) as server, tempfile.TemporaryDirectory() as directory:
+        server.install(DBCrawler.http)
+        for host in HOSTS:
+            DBCrawler.http.set_rate(host, rate=1e9, max_rate=1e9, burst=1000)
+        fetched, fetch = benchmark.fetch(server, pages)
+        frames, parse = benchmark.run_parse(fetched)
+        write = benchmark.run_write(frames, pages, directory)
+        e2e = benchmark.run_e2e(server, pages, directory)
+    return {'fetch': fetch, 'parse': parse, 'write': write, 'e2e': e2e, 'peak_rss_mb': peak_rss_mb()}
+
+def run_worker(name, scale, recorded, results):
+    """
+        Description
+        -----------
+        별도 프로세스에서 run_benchmark를 실행하고 (결과, 오류)를 results 큐에 넣음
+    """
+
+    try:
+        results.put((run_benchmark(name, scale, recorded), None))
+    except BaseException as e:
+        results.put((None, repr(e)))
+        raise
@@ -0,0 +1,112 @@
+import queue
+import shutil
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+"""
+    Description
+    -----------
+    헤드리스 크롬 브라우저 풀(이미지, 폰트, CSS 차단)
+"""
+
+class BrowserPool:
+    
+    blocked_urls = ['*.css', '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.webp', '*.ico', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+    
+    def __init__(self, size=2, headless=True, executable_path='chromedriver'):
+        """
+            Input
+            -----
+            size : 최대 브라우저 수(필요할 때 하나씩 실행)
+            headless : 화면 없이 실행
+            executable_path : chromedriver 경로 또는 PATH에서 찾을 이름(찾지 못하면 Selenium Manager가 찾음)
+        """
+        
+        self.size = size
+        self.headless = headless
+        self.executable_path = executable_path
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+    
+    def _launch(self):
+        options = webdriver.ChromeOptions()
+        if self.headless:
+            options.add_argument('--headless')
+            options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.stylesheets': 2,
+            'profile.managed_default_content_settings.fonts': 2,
+        })
+        path = shutil.which(self.executable_path) if self.executable_path else None
+        driver = webdriver.Chrome(service=Service(path), options=options)
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        return driver
+    
+    @contextmanager
+    def driver(self):
+        """
+            Description
+            -----------
+            쉬고 있는 브라우저를 빌려줌(없으면 size까지 새로 실행, size에 도달하면 반납될 때까지 대기)
+            
+            Example
+            -------
+            pool = BrowserPool(4)
+            with pool.driver() as driver:
+                driver.get('http://www.encar.com')
+            pool.close()
+        """
+        
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                launch = len(self._drivers) < self.size
+                if launch:
+                    self._drivers.append(None)
+            if launch:
+                try:
+                    driver = self._launch()
+                except Exception:
+                    with self._lock:
+                        self._drivers.remove(None)
+                    raise
+                with self._lock:
+                    self._drivers[self._drivers.index(None)] = driver
+            else:
+                driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+    
+    def close(self):
+        """
+            Description
+            -----------
+            모든 브라우저 종료
+        """
+        
+        with self._lock:
+            drivers = [driver for driver in self._drivers if driver is not None]
+            self._drivers = []
+            self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
\ No newline at end of file
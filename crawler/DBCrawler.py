@@ -1,4 +1,13 @@
+import queue
+import sqlite3
+import threading
+import time
 from abc import *
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import pandas as pd
+from .HttpClient import HttpClient
+from .ResponseCache import ResponseCache
 
 """
     Description
@@ -8,14 +17,561 @@ from abc import *
 
 class DBCrawler(metaclass=ABCMeta):
     
+    http = HttpClient()
+    metrics = http.metrics
+    primary_key = None
+    checkpoint_table = 'CRAWLER_CHECKPOINT'
+    # Parquet 파티션 키 컬럼(None이면 Parquet 저장 미지원)
+    parquet_key = None
+    _parquet_stores = {}
+    
     def __init__(self, conn):
         self.conn = conn
         self.cur = self.conn.cursor()
+        self.incremental = False
+        self.workers = 1
+        self.batch_rows = 5000
+        self.queue_size = 64
+        self.parquet = None
+        self.run_date = None
+        self.rows = 0  # 저장한 데이터 행 수(체크포인트 제외)
+        self._create_checkpoint_table()
+        
+    @property
+    def name(self):
+        """
+            Description
+            -----------
+            체크포인트, 메트릭에 기록할 크롤러 이름(기본값: 클래스명)
+        """
         
+        return type(self).__name__
+    
     @abstractmethod
     def _create_table():
         pass
     
     @abstractmethod
     def run(self):
-        pass
\ No newline at end of file
+        pass
+    
+    def set_incremental(self, incremental=True):
+        """
+            Description
+            -----------
+            증분 수집 여부 설정(테이블에 저장된 최종 기준일자 이후 데이터만 수집)
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            spc = StockPriceCrawler(conn)
+            spc.set_incremental()
+        """
+        
+        self.incremental = incremental
+    
+    def set_run_date(self, run_date):
+        """
+            Description
+            -----------
+            실행 기준일자 설정(기본값 None: 실행한 날)
+            - 완료(done) 체크포인트는 같은 기준일자의 실행에서만 건너뜀(다른 날 실행하면 모든 단위를 다시 수집)
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            spc = StockPriceCrawler(conn)
+            spc.set_run_date('2020-05-20')
+        """
+        
+        self.run_date = run_date
+    
+    def set_workers(self, workers, max_in_flight=None):
+        """
+            Description
+            -----------
+            동시 수집 설정
+            
+            Input
+            -----
+            workers : 동시에 수집할 코드 수
+            max_in_flight : 호스트별 최대 동시 요청 수(모든 크롤러 공통, 요청 중인 크롤러가 있으면 바꿀 수 없음)
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            uppc = UsedPhonePriceCrawler(conn)
+            uppc.set_workers(16, max_in_flight=8)
+        """
+        
+        self.workers = workers
+        if max_in_flight is not None:
+            DBCrawler.http.set_max_in_flight(max_in_flight)
+    
+    def set_cache(self, path='http_cache.db', max_bytes=512 * 2 ** 20, offline=False, ttls=None):
+        """
+            Description
+            -----------
+            HTTP 응답 캐시 설정(모든 크롤러 공통, path가 None이면 사용하지 않음)
+            - 다시 실행할 때 유효기간 안의 페이지는 캐시에서 읽고, 지난 페이지는 ETag/Last-Modified로 재검증
+            - 기본 유효기간: 네이버 1페이지는 항상 재요청, 2페이지 이후와 세티즌 시세 페이지는 받은 날 하루(ResponseCache.default_ttls)
+            
+            Input
+            -----
+            path : 캐시 파일 경로
+            max_bytes : 최대 용량(넘으면 오래 사용하지 않은 응답부터 삭제)
+            offline : 네트워크 없이 캐시만 사용(재현/개발용)
+            ttls : 추가 유효기간 규칙 {URL 정규식: 초 | 'today' | None(영구)}
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            spc = StockPriceCrawler(conn)
+            spc.set_cache('http_cache.db', ttls={r'^https?://finance\.naver\.com/': 6 * 3600})
+        """
+        
+        if DBCrawler.http.cache is not None:
+            DBCrawler.http.cache.close()
+        if path is None:
+            DBCrawler.http.set_cache(None)
+            return
+        cache = ResponseCache(path, max_bytes, offline)
+        for pattern, ttl in (ttls or {}).items():
+            cache.set_ttl(pattern, ttl)
+        DBCrawler.http.set_cache(cache)
+    
+    def set_parquet(self, path='parquet', max_files=8):
+        """
+            Description
+            -----------
+            Parquet 저장 설정(SQLite 저장과 함께 코드, 연도별 Parquet 파일로도 저장, path가 None이면 사용하지 않음)
+            - 같은 경로는 모든 크롤러가 하나의 ParquetStore를 함께 사용
+            
+            Input
+            -----
+            path : 저장 폴더
+            max_files : 파티션당 파일 수가 이보다 많아지면 합침
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            erc = ExchangeRateCrawler(conn)
+            erc.set_parquet('parquet')
+            erc.run()
+            fx = ParquetStore('parquet').read('EXCHANGE_RATE', ['FX_USDKRW'], start='2015-01-01')
+        """
+        
+        if path is None:
+            self.parquet = None
+            return
+        if self.parquet_key is None:
+            raise ValueError('Parquet 저장을 지원하지 않는 크롤러입니다. ({})'.format(self.name))
+        # pyarrow는 Parquet 저장을 쓸 때만 불러옴
+        from .ParquetStore import ParquetStore
+        store = DBCrawler._parquet_stores.get(path)
+        if store is None:
+            store = DBCrawler._parquet_stores[path] = ParquetStore(path, max_files)
+        store.max_files = max_files
+        self.parquet = store
+    
+    def export_parquet(self, chunksize=100000):
+        """
+            Description
+            -----------
+            SQLite 테이블에 저장된 전체 데이터를 Parquet 저장소로 내보낸 뒤 파티션별로 합침(set_parquet 먼저 호출)
+            
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            spc = StockPriceCrawler(conn)
+            spc.set_parquet('parquet')
+            spc.export_parquet()
+        """
+        
+        if self.parquet is None:
+            raise ValueError('Parquet 저장소가 설정되지 않았습니다. (set_parquet)')
+        offset = 0
+        while True:
+            df = self._read_frame('SELECT * FROM {table_name} ORDER BY {key}, BASE_DATE LIMIT ? OFFSET ?'.format(
+                table_name=self.table_name, key=self.parquet_key), (chunksize, offset))
+            if df.empty:
+                break
+            with self.metrics.timer('parquet', crawler=self.name):
+                self.parquet.append(self.table_name, df, self.parquet_key, self.primary_key)
+            offset += len(df)
+        self.parquet.compact(self.table_name)
+        print('[{}] Parquet 내보내기를 종료합니다. (table: {}, 데이터수: {:,}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), self.table_name, offset))
+    
+    @staticmethod
+    def _map(func, items, workers=1):
+        """
+            Description
+            -----------
+            items의 각 원소에 func를 적용(workers > 1이면 스레드 풀로 동시 실행)
+            
+            Output
+            ------
+            (item, 결과)를 완료 순서대로 반환하는 generator
+        """
+        
+        if workers <= 1:
+            for item in items:
+                yield item, func(item)
+            return
+        
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = {}
+        try:
+            for item in items:
+                futures[executor.submit(func, item)] = item
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # 시작하지 않은 작업은 취소(shutdown(cancel_futures=True)는 Python 3.9부터 지원)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def _run_units(self, produce, units, write=None, finish=None):
+        """
+            Description
+            -----------
+            체크포인트 기반 스트리밍 실행
+            - 같은 기준일자(run_date)의 이전 실행에서 완료(done)된 단위(코드, 단말기 등)는 건너뜀
+              (다른 날 기록된 done은 무시하므로 계속 실패하는 단위가 있어도 나머지 단위는 매일 수집)
+            - produce(unit)는 (진행 페이지, DataFrame)을 차례로 내보내는 generator이며 수집 스레드(workers개)에서 실행
+            - 수집된 페이지는 크기가 제한된 큐(queue_size)를 거쳐 현재 스레드로 전달되고,
+              batch_rows행이 모일 때마다 write(unit, DataFrame, checkpoint, first)로 저장/커밋(수집과 저장이 겹쳐서 진행)
+            - 실패한 단위는 마지막 저장 지점과 함께 failed로 기록하고 나머지를 계속 수집한 뒤 마지막에 예외 발생
+            - 모든 단위가 완료되면 체크포인트 삭제(다음 실행은 처음부터)
+            - 크롤러별 pages/rows 카운터와 write 단계 소요시간을 metrics에 기록
+            
+            Input
+            -----
+            produce : 단위별 generator 함수
+            units : 수집 단위 리스트
+            write : 저장 함수(기본값: self._upsert(df, checkpoint=checkpoint))
+            finish : 단위의 모든 데이터를 저장한 뒤 done을 기록하기 전에 실행할 함수 finish(unit)(실패하면 단위 실패)
+        """
+        
+        if write is None:
+            write = lambda unit, df, checkpoint, first: self._upsert(df, checkpoint=checkpoint)
+        crawler = self.name
+        run_date = self.run_date or datetime.now().strftime('%Y-%m-%d')
+        
+        done = self._load_checkpoint('done', run_date)
+        pending = [unit for unit in units if unit not in done]
+        if len(pending) < len(units):
+            print('[{}] 체크포인트에서 재시작합니다. (완료: {:,}개, 남은 작업: {:,}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), len(units) - len(pending), len(pending)))
+        if not pending:
+            self._clear_checkpoint(units)
+            return
+        
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        
+        def put(item):
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+        
+        def worker(unit):
+            start_time[unit] = time.perf_counter()
+            print('[{}] 데이터 수집을 시작합니다. (code: {})'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), unit))
+            try:
+                with self.http.in_use():
+                    for page, df in produce(unit):
+                        if stop.is_set():
+                            return
+                        put((unit, page, df))
+            except Exception as e:
+                put((unit, None, e))
+            else:
+                put((unit, None, None))
+        
+        buffers = {unit: [] for unit in pending}
+        buffered = {unit: 0 for unit in pending}
+        rows = {unit: 0 for unit in pending}
+        progress = {unit: (None, None) for unit in pending}
+        saved = {}
+        start_time = {}
+        failed = []
+        
+        def flush(unit, status):
+            buffer = buffers[unit]
+            df = pd.concat(buffer, ignore_index=True) if buffer else None
+            last_page, last_date = progress[unit]
+            checkpoint = {'code': unit, 'status': status, 'last_page': last_page, 'last_date': last_date, 'run_date': run_date}
+            if df is None:
+                with self.conn:
+                    self._save_checkpoint(**checkpoint)
+            else:
+                with self.metrics.timer('write', crawler=crawler):
+                    write(unit, df, checkpoint, unit not in saved)
+                saved[unit] = progress[unit]
+            buffers[unit] = []
+            buffered[unit] = 0
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, self.workers))
+        futures = []
+        try:
+            for unit in pending:
+                futures.append(executor.submit(worker, unit))
+            remaining = len(pending)
+            while remaining:
+                unit, page, item = pages.get()
+                if isinstance(item, pd.DataFrame):
+                    self.metrics.count('pages', crawler=crawler)
+                    self.metrics.count('rows', len(item), crawler=crawler)
+                    buffers[unit].append(item)
+                    buffered[unit] += len(item)
+                    rows[unit] += len(item)
+                    progress[unit] = (page, item['BASE_DATE'].min() if len(item) else progress[unit][1])
+                    if buffered[unit] >= self.batch_rows:
+                        flush(unit, 'running')
+                    continue
+                remaining -= 1
+                if item is None and finish is not None:
+                    flush(unit, 'running')
+                    try:
+                        finish(unit)
+                    except Exception as e:
+                        item = e
+                if item is None:
+                    flush(unit, 'done')
+                    print('[{}] 데이터 수집을 종료합니다. (code: {}, 수집시간: {:.1f}초, 데이터수: {:,}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), unit, time.perf_counter() - start_time[unit], rows[unit]))
+                else:
+                    print('[{}] 수집에 실패했습니다. (unit: {}, error: {!r})'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), unit, item))
+                    self.metrics.count('failures', crawler=crawler)
+                    buffers[unit] = []
+                    last_page, last_date = saved.get(unit, (None, None))
+                    with self.conn:
+                        self._save_checkpoint(unit, 'failed', last_page, last_date, run_date)
+                    failed.append(unit)
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+        
+        if failed:
+            raise RuntimeError('수집에 실패한 작업이 있습니다. 다시 실행하면 실패한 작업부터 재개합니다. ({})'.format(', '.join(map(str, failed))))
+        self._clear_checkpoint(units)
+    
+    def _resume_point(self, code, checkpoint):
+        """
+            Description
+            -----------
+            코드별 수집 시작점 계산(중단된 코드는 마지막 저장 페이지부터 재개)
+            
+            Input
+            -----
+            checkpoint : _load_checkpoint()의 해당 코드 값(LAST_PAGE, LAST_DATE, STATUS) 또는 None
+            
+            Output
+            ------
+            (시작 페이지, 증분 수집 기준일자)
+            - 재개할 때는 이미 저장한 구간(LAST_DATE 이후) 아래의 최종 기준일자가 증분 기준일자
+            - 재개 페이지는 하루 사이 페이지가 밀렸을 수 있으므로 마지막 저장 페이지를 다시 수집
+        """
+        
+        last_page, last_date, status = checkpoint or (None, None, None)
+        if status in ('running', 'failed') and last_page is not None:
+            return last_page, self._get_last_date(code, before=last_date) if self.incremental else None
+        return 1, self._get_last_date(code) if self.incremental else None
+    
+    def _create_checkpoint_table(self):
+        """
+            Description
+            -----------
+            체크포인트 테이블 생성(크롤러, 코드별 진행상황, 기준일자 컬럼이 없는 기존 테이블에는 컬럼 추가)
+        """
+        
+        query = """
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                CRAWLER TEXT,
+                CODE TEXT,
+                LAST_PAGE INTEGER,
+                LAST_DATE TEXT,
+                STATUS TEXT,
+                UPDATED_AT TEXT,
+                RUN_DATE TEXT,
+                PRIMARY KEY (CRAWLER, CODE)
+            )
+        """.format(table_name=self.checkpoint_table)
+        self.cur.execute(query)
+        self.conn.commit()
+        self.cur.execute('PRAGMA table_info({table_name})'.format(table_name=self.checkpoint_table))
+        if 'RUN_DATE' in [row[1] for row in self.cur.fetchall()]:
+            return
+        try:
+            self.cur.execute('ALTER TABLE {table_name} ADD COLUMN RUN_DATE TEXT'.format(table_name=self.checkpoint_table))
+            self.conn.commit()
+        except sqlite3.OperationalError as e:
+            # 같은 데이터베이스를 쓰는 다른 크롤러가 먼저 추가한 경우
+            if 'duplicate column' not in str(e):
+                raise
+
+    
+    def _load_checkpoint(self, status=None, run_date=None):
+        """
+            Description
+            -----------
+            체크포인트 조회(run_date를 주면 해당 기준일자 실행의 체크포인트만)
+            
+            Output
+            ------
+            {코드: (LAST_PAGE, LAST_DATE, STATUS)}
+        """
+        
+        query = 'SELECT CODE, LAST_PAGE, LAST_DATE, STATUS FROM {table_name} WHERE CRAWLER = ?'.format(table_name=self.checkpoint_table)
+        params = (self.name,)
+        if status is not None:
+            query += ' AND STATUS = ?'
+            params += (status,)
+        if run_date is not None:
+            query += ' AND RUN_DATE = ?'
+            params += (run_date,)
+        self.cur.execute(query, params)
+        return {code: (last_page, last_date, status) for code, last_page, last_date, status in self.cur.fetchall()}
+    
+    def _save_checkpoint(self, code, status, last_page=None, last_date=None, run_date=None):
+        """
+            Description
+            -----------
+            체크포인트 기록(커밋은 호출하는 쪽 트랜잭션에서, run_date 기본값: 설정된 기준일자 또는 오늘)
+        """
+        
+        run_date = run_date or self.run_date or datetime.now().strftime('%Y-%m-%d')
+        query = 'INSERT OR REPLACE INTO {table_name} (CRAWLER, CODE, LAST_PAGE, LAST_DATE, STATUS, UPDATED_AT, RUN_DATE) VALUES (?, ?, ?, ?, ?, ?, ?)'.format(table_name=self.checkpoint_table)
+        self.cur.execute(query, (self.name, str(code), last_page, last_date, status, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), run_date))
+    
+    def _clear_checkpoint(self, codes=None):
+        """
+            Description
+            -----------
+            체크포인트 삭제(codes를 주면 해당 코드만, 같은 크롤러의 다른 작업 체크포인트는 유지)
+        """
+        
+        with self.conn:
+            if codes is None:
+                self.cur.execute('DELETE FROM {table_name} WHERE CRAWLER = ?'.format(table_name=self.checkpoint_table), (self.name,))
+            else:
+                self.cur.executemany('DELETE FROM {table_name} WHERE CRAWLER = ? AND CODE = ?'.format(table_name=self.checkpoint_table), [(self.name, str(code)) for code in codes])
+    
+    def _get_last_date(self, code, before=None):
+        """
+            Description
+            -----------
+            테이블에 저장된 코드별 최종 기준일자 조회(없으면 None)
+            
+            Input
+            -----
+            before : 지정하면 해당 일자 이전 데이터 중 최종 기준일자
+        """
+        
+        query = 'SELECT MAX(BASE_DATE) FROM {table_name} WHERE CODE = ?'.format(table_name=self.table_name)
+        params = (code,)
+        if before is not None:
+            query += ' AND BASE_DATE < ?'
+            params += (before,)
+        self.cur.execute(query, params)
+        return self.cur.fetchone()[0]
+    
+    def _read_frame(self, query, params=()):
+        """
+            Description
+            -----------
+            조회 결과를 DataFrame으로 반환(pd.read_sql과 같은 변환, DBWriter 연결에서도 사용 가능)
+        """
+        
+        self.cur.execute(query, params)
+        return pd.DataFrame.from_records(self.cur.fetchall(), columns=[column[0] for column in self.cur.description], coerce_float=True)
+    
+    def _ensure_primary_key(self):
+        """
+            Description
+            -----------
+            to_sql(if_exists='replace')로 재생성되어 기본키가 사라진 기존 테이블에 유니크 인덱스 복구
+        """
+        
+        if self.primary_key is None:
+            return
+        self.cur.execute('PRAGMA table_info({table_name})'.format(table_name=self.table_name))
+        if any(row[5] for row in self.cur.fetchall()):
+            return
+        query = 'CREATE UNIQUE INDEX IF NOT EXISTS PK_{table_name} ON {table_name} ({keys})'.format(table_name=self.table_name, keys=', '.join(self.primary_key))
+        self.cur.execute(query)
+        self.conn.commit()
+    
+    def _upsert_statement(self, df, table_name=None, primary_key=None):
+        """
+            Description
+            -----------
+            upsert 쿼리와 레코드 생성
+            - 기본키 충돌 시 값이 바뀐 컬럼이 있을 때만 갱신(같은 행을 다시 저장하면 쓰기 없음)
+            - 결측값(NaN, NA)은 NULL로 저장
+            
+            Input
+            -----
+            df : 저장할 데이터(컬럼명 = 테이블 컬럼명)
+            table_name : 테이블명(기본값: self.table_name)
+            primary_key : 기본키 컬럼(기본값: self.primary_key)
+            
+            Output
+            ------
+            (쿼리, 레코드 iterator)
+        """
+        
+        table_name = table_name or self.table_name
+        primary_key = primary_key or self.primary_key
+        columns = list(df.columns)
+        query = 'INSERT INTO {table_name} ({columns}) VALUES ({values})'.format(
+            table_name=table_name, columns=', '.join(columns), values=', '.join(['?'] * len(columns)))
+        if primary_key is not None:
+            updates = [column for column in columns if column not in primary_key]
+            if updates:
+                action = 'UPDATE SET {} WHERE {}'.format(
+                    ', '.join('{0} = excluded.{0}'.format(column) for column in updates),
+                    ' OR '.join('{0} IS NOT excluded.{0}'.format(column) for column in updates))
+            else:
+                action = 'NOTHING'
+            query += ' ON CONFLICT({keys}) DO {action}'.format(keys=', '.join(primary_key), action=action)
+        values = []
+        for column in columns:
+            series = df[column]
+            if series.hasnans:
+                series = series.astype(object).where(series.notna(), None)
+            values.append(series.tolist())
+        return query, zip(*values)
+    
+    def _upsert(self, df, clear=None, checkpoint=None):
+        """
+            Description
+            -----------
+            데이터를 하나의 트랜잭션으로 저장(기본키 충돌 시 바뀐 행만 갱신)
+            
+            Input
+            -----
+            df : 저장할 데이터(컬럼명 = 테이블 컬럼명)
+            clear : 저장 전 삭제할 조건(ex. {'BASE_DATE': '2020-05-17', 'CODE': 'benz'})
+            checkpoint : 같은 트랜잭션에서 기록할 체크포인트(_save_checkpoint 인자, ex. {'code': '005830', 'status': 'done'})
+            - Parquet 저장소가 설정되어 있으면 커밋 전에 Parquet에 먼저 추가(중간에 종료되어 다시 저장해도 중복은 읽을 때 제거)
+        """
+        
+        query, records = self._upsert_statement(df)
+        if self.parquet is not None:
+            with self.metrics.timer('parquet', crawler=self.name):
+                self.parquet.append(self.table_name, df, self.parquet_key, self.primary_key)
+        
+        with self.conn:
+            if clear:
+                self.cur.execute('DELETE FROM {table_name} WHERE {where}'.format(
+                    table_name=self.table_name, where=' AND '.join('{} = ?'.format(column) for column in clear)), tuple(clear.values()))
+            self.cur.executemany(query, records)
+            if checkpoint:
+                self._save_checkpoint(**checkpoint)
+        self.rows += len(df)
@@ -0,0 +1,263 @@
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+"""
+    Description
+    -----------
+    하나의 SQLite 쓰기 연결(WAL, synchronous=NORMAL)을 여러 크롤러가 함께 쓰기 위한 쓰기 큐
+    - 쓰기는 전용 스레드가 실행(쓰기 잠금 경합 없음)
+    - 큐에 쌓인 트랜잭션은 batch_rows행까지 모아 하나의 트랜잭션으로 커밋(그룹 커밋, 트랜잭션마다 fsync하지 않음)
+    - 모은 트랜잭션은 각각 SAVEPOINT로 실행하므로 하나가 실패해도 나머지는 커밋
+    - 읽기는 스레드별 읽기 연결에서 바로 실행(WAL이므로 쓰기와 동시에 진행)
+"""
+
+_READ = re.compile(r'^\s*(SELECT|WITH|EXPLAIN|PRAGMA\s+\w+\s*(\(|;|$))', re.I)
+
+class DBWriter:
+
+    def __init__(self, path, queue_size=256, batch_rows=50000):
+        """
+            Input
+            -----
+            path : 데이터베이스 파일 경로
+            queue_size : 대기할 수 있는 최대 트랜잭션 수(가득 차면 커밋하는 크롤러가 대기)
+            batch_rows : 하나의 트랜잭션으로 모을 최대 행 수
+        """
+
+        self.path = path
+        self.batch_rows = batch_rows
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.rows = 0
+        self.jobs = 0
+        self.commits = 0
+        self.busy = 0.0
+        self.started = time.perf_counter()
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._loop, name='DBWriter', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _size(statements):
+        return sum(len(params) if many else 1 for query, params, many in statements)
+
+    def _loop(self):
+        closed = False
+        while not closed:
+            job = self._jobs.get()
+            if job is None:
+                break
+            batch = [job]
+            size = self._size(job[0])
+            while size < self.batch_rows:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    closed = True
+                    break
+                batch.append(job)
+                size += self._size(job[0])
+            self._commit(batch)
+
+    def _commit(self, batch):
+        """
+            Description
+            -----------
+            모은 트랜잭션을 하나의 트랜잭션(각각 SAVEPOINT)으로 실행하고 커밋 후 결과 전달
+        """
+
+        start = time.perf_counter()
+        results = []
+        try:
+            self.conn.execute('BEGIN')
+            for statements, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                self.conn.execute('SAVEPOINT job')
+                try:
+                    rows = 0
+                    for query, params, many in statements:
+                        cur = self.conn.executemany(query, params) if many else self.conn.execute(query, params)
+                        rows += max(cur.rowcount, 0)
+                except Exception as e:
+                    self.conn.execute('ROLLBACK TO job')
+                    self.conn.execute('RELEASE job')
+                    future.set_exception(e)
+                else:
+                    self.conn.execute('RELEASE job')
+                    results.append((future, rows))
+            self.conn.execute('COMMIT')
+        except BaseException as e:
+            if self.conn.in_transaction:
+                self.conn.execute('ROLLBACK')
+            for statements, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.busy += time.perf_counter() - start
+        self.commits += 1
+        for future, rows in results:
+            self.rows += rows
+            self.jobs += 1
+            future.set_result(rows)
+
+    def stats(self):
+        """
+            Description
+            -----------
+            쓰기 통계(저장 행 수, 트랜잭션 수, 커밋 수, 쓰기 스레드 사용 시간, 초당 저장 행 수)
+        """
+
+        elapsed = time.perf_counter() - self.started
+        return {'rows': self.rows, 'jobs': self.jobs, 'commits': self.commits, 'busy_seconds': self.busy,
+                'rows_per_second': self.rows / elapsed if elapsed else 0.0,
+                'rows_per_busy_second': self.rows / self.busy if self.busy else 0.0}
+
+    def submit(self, statements):
+        """
+            Description
+            -----------
+            [(쿼리, 파라미터, executemany 여부), ...]를 하나의 트랜잭션으로 실행하도록 큐에 추가
+
+            Output
+            ------
+            변경된 행 수를 돌려주는 Future
+        """
+
+        future = Future()
+        self._jobs.put((statements, future))
+        return future
+
+    def connect(self):
+        """
+            Description
+            -----------
+            크롤러에 넘길 연결(sqlite3.Connection과 같은 방식으로 사용)
+
+            Example
+            -------
+            writer = DBWriter('external_data.db')
+            spc = StockPriceCrawler(writer.connect())
+        """
+
+        return QueuedConnection(self)
+
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+        self.conn.close()
+
+class QueuedConnection:
+    """
+        Description
+        -----------
+        쓰기 큐를 거치는 sqlite3.Connection 대용
+        - SELECT/PRAGMA 조회는 스레드별 읽기 연결에서 바로 실행
+        - 그 밖의 쿼리는 스레드별로 모았다가 commit()(또는 with 블록 종료) 시 하나의 트랜잭션으로 쓰기 스레드에 넘기고 완료를 기다림
+        - rollback()(또는 with 블록에서 예외)이면 모은 쿼리를 버림
+        - 쓰기 오류(ex. IntegrityError)는 execute가 아니라 commit에서 발생
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.rows = 0
+        self._local = threading.local()
+        self._readers = []
+        self._lock = threading.Lock()
+
+    def _reader(self):
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            reader = self._local.reader = sqlite3.connect(self.writer.path)
+            with self._lock:
+                self._readers.append(reader)
+        return reader
+
+    def _pending(self):
+        pending = getattr(self._local, 'pending', None)
+        if pending is None:
+            pending = self._local.pending = []
+        return pending
+
+    def cursor(self):
+        return QueuedCursor(self)
+
+    def execute(self, query, params=()):
+        return self.cursor().execute(query, params)
+
+    def executemany(self, query, params):
+        return self.cursor().executemany(query, params)
+
+    def commit(self):
+        statements = self._pending()
+        if not statements:
+            return
+        self._local.pending = []
+        rows = self.writer.submit(statements).result()
+        with self._lock:
+            self.rows += rows
+
+    def rollback(self):
+        self._local.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def close(self):
+        with self._lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers = []
+
+class QueuedCursor:
+
+    def __init__(self, conn):
+        self.connection = conn
+        self._cursor = None
+
+    def execute(self, query, params=()):
+        if _READ.match(query):
+            self._cursor = self.connection._reader().execute(query, params)
+        else:
+            self.connection._pending().append((query, params, False))
+            self._cursor = None
+        return self
+
+    def executemany(self, query, params):
+        self.connection._pending().append((query, list(params), True))
+        self._cursor = None
+        return self
+
+    @property
+    def description(self):
+        return self._cursor.description if self._cursor is not None else None
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor = None
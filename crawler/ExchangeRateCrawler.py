@@ -1,61 +1,18 @@
-import time
-import pandas as pd
-from datetime import datetime
-import sqlite3
-from .DBCrawler import DBCrawler
+from .quote import QuoteCrawler, SOURCES, get_quotes, iter_quote_pages
 
 """
     Description
     -----------
-    환율 데이터를 수집하는 크롤러
+    환율 데이터를 수집하는 크롤러(QuoteCrawler(conn, 'fx')와 같음)
 """
 
-class ExchangeRateCrawler(DBCrawler):
+class ExchangeRateCrawler(QuoteCrawler):
     
     def __init__(self, conn):
-        super().__init__(conn)
-        self.table_name = 'EXCHANGE_RATE'
-        self._create_table()
-        
-    def _create_table(self):
-        """
-            Description
-            -----------
-            테이블 생성
-        """
-        
-        query = """
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                BASE_DATE TEXT,
-                CODE TEXT,
-                RATE NUMBER,
-                PRIMARY KEY (CODE, BASE_DATE)
-            )
-        """.format(table_name=self.table_name)
-        self.cur.execute(query)
-        self.conn.commit()
-        
-    def set_code(self, codes):
-        """
-            Description
-            -----------
-            수집할 환율 코드들 설정
-            
-            Input
-            -----
-            code : FX_USDKRW(원/달러), FX_JPYKRW(원/엔), FX_CNYKRW(원/위안)
-            
-            Example
-            -------
-            conn = sqlite3.connect('external_data.db')
-            erc = ExchangeRateCrawler(conn)
-            erc.set_code(['FX_USDKRW', 'FX_JPYKRW', 'FX_CNYKRW'])
-        """
-        
-        self.codes = codes
+        super().__init__(conn, 'fx')
         
     @staticmethod
-    def get_exchange_rate(code):
+    def get_exchange_rate(code, last_date=None):
         """
             Description
             -----------
@@ -64,6 +21,7 @@ class ExchangeRateCrawler(DBCrawler):
             Input
             -----
             code : FX_USDKRW(원/달러), FX_JPYKRW(원/엔), FX_CNYKRW(원/위안)
+            last_date : 증분 수집 기준일자(YYYY-MM-DD, 해당 일자 이후 데이터만 수집)
 
             Output
             ------
@@ -75,51 +33,19 @@ class ExchangeRateCrawler(DBCrawler):
 
         """
 
-        delay = 0.02
-        page = 1
-        result = []
-        start_time = datetime.now()
-
-        # 수집
-        print('[{}] 데이터 수집을 시작합니다. (code: {})'.format(start_time.strftime('%Y/%m/%d %H:%M:%S'), code))
-        while(True):
-            url = 'https://finance.naver.com/marketindex/exchangeDailyQuote.nhn?marketindexCd={}&page={}'.format(code, page)
-            data = pd.read_html(url)[0].dropna()
-            if page != 1:
-                try:
-                    if data.iloc[-1, 0] == result[-1].iloc[-1, 0]:
-                        break
-                except:
-                    break
-            result.append(data)
-            page += 1
-            time.sleep(delay)
-            
-        exchange_rate = pd.concat(result).reset_index(drop=True)
-        exchange_rate.columns = ['BASE_DATE', 'RATE', '전일대비', '사실 때', '파실 때', '보내실 때', '받으실 때', 'T/C 사실 때', '외화수표 파실 때']
-        exchange_rate['BASE_DATE'] = exchange_rate['BASE_DATE'].apply(lambda x: datetime.strptime(x, '%Y.%m.%d').strftime('%Y-%m-%d'))
-        exchange_rate = exchange_rate[['BASE_DATE', 'RATE']]
-        exchange_rate.insert(1, 'CODE', code)
-
-        end_time = datetime.now()
-        print('[{}] 데이터 수집을 종료합니다. (code: {}, 수집시간: {}초, 데이터수: {:,}개)'.format(end_time.strftime('%Y/%m/%d %H:%M:%S'), code, (end_time-start_time).seconds, len(exchange_rate)))
-        
-        return exchange_rate
+        return get_quotes(SOURCES['fx'], code, last_date, 'ExchangeRateCrawler')
         
-    def run(self):
+    @staticmethod
+    def iter_exchange_rate(code, last_date=None, start_page=1):
         """
             Description
             -----------
-            크롤러 실행
-            
+            환율 데이터를 페이지 단위로 수집하는 generator(최신 → 과거 순, iter_quote_pages 참고)
+
             Example
             -------
-            conn = sqlite3.connect('external_data.db')
-            erc = ExchangeRateCrawler(conn)
-            erc.set_code(['FX_USDKRW', 'FX_JPYKRW', 'FX_CNYKRW'])
-            erc.run()
+            for page, data in ExchangeRateCrawler.iter_exchange_rate('FX_JPYKRW'):
+                print(page, len(data))
         """
-        
-        for code in self.codes:
-            exchange_rate = self.get_exchange_rate(code)
-            exchange_rate.to_sql(name=self.table_name, con=self.conn, if_exists='replace', index=False)
\ No newline at end of file
+
+        return iter_quote_pages(SOURCES['fx'], code, last_date, start_page, 'ExchangeRateCrawler')
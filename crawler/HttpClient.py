@@ -0,0 +1,287 @@
+import threading
+import time
+from contextlib import contextmanager
+from random import random
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from .Metrics import Metrics
+from .RateLimiter import RateLimiter
+from .ResponseCache import CacheMiss
+
+"""
+    Description
+    -----------
+    모든 크롤러가 공유하는 HTTP 클라이언트(호스트별 keep-alive 커넥션 풀, gzip/deflate, 타임아웃, 속도 제한, 재시도)
+"""
+
+class HttpClient:
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/81.0.4044.138 Safari/537.36',
+        'Accept-Encoding': 'gzip, deflate',
+        'Connection': 'keep-alive',
+    }
+    
+    retry_status = (429, 500, 502, 503, 504)
+    
+    def __init__(self, max_in_flight=4, timeout=(5, 30), retries=5, backoff=1.0, backoff_max=60.0, metrics=None):
+        """
+            Input
+            -----
+            max_in_flight : 호스트별 최대 동시 요청 수(= 호스트별 커넥션 풀 크기)
+            timeout : (연결 타임아웃, 읽기 타임아웃) 초
+            retries : 429/5xx/타임아웃 발생 시 재시도 횟수
+            backoff, backoff_max : 재시도 대기시간(초) = min(backoff_max, backoff * 2^시도횟수) * [0.5, 1.5)
+            metrics : 요청 시간(fetch 단계)과 requests/retries/bytes/cache_hits 카운터를 기록할 Metrics(호스트별)
+        """
+        
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._limiters = {}
+        self._limiter_options = {}
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self._host_slots = {}
+        self._lock = threading.Lock()
+        self._users = 0
+        self.cache = None
+        self.max_in_flight = None
+        self.set_max_in_flight(max_in_flight)
+    
+    def set_max_in_flight(self, max_in_flight):
+        """
+            Description
+            -----------
+            호스트별 최대 동시 요청 수 설정(커넥션 풀을 새로 만들므로 수집을 시작하기 전에 한 번 설정)
+            - 같은 값이면 아무것도 하지 않음(기존 커넥션 풀, 설치된 어댑터 유지)
+            - 사용 중(in_use, 요청 중)이면 다른 작업의 커넥션 풀과 동시 요청 제한이 초기화되므로 RuntimeError
+        """
+        
+        with self._lock:
+            if max_in_flight == self.max_in_flight:
+                return
+            if self._users:
+                raise RuntimeError('사용 중에는 최대 동시 요청 수를 바꿀 수 없습니다. 수집을 시작하기 전에 설정하세요. ({} → {})'.format(self.max_in_flight, max_in_flight))
+            self.max_in_flight = max_in_flight
+            self._host_slots.clear()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max_in_flight)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+    
+    @contextmanager
+    def in_use(self):
+        """
+            Description
+            -----------
+            사용 중 표시(사용 중에는 set_max_in_flight로 최대 동시 요청 수를 바꿀 수 없음)
+            
+            Example
+            -------
+            with DBCrawler.http.in_use():
+                crawler.run()
+        """
+        
+        with self._lock:
+            self._users += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._users -= 1
+    
+    @contextmanager
+    def host_slot(self, url):
+        """
+            Description
+            -----------
+            호스트별 동시 요청 수 제한(max_in_flight)
+        """
+        
+        host = urlparse(url).netloc
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_in_flight)
+        with self.in_use(), slot:
+            yield
+    
+    def set_cache(self, cache):
+        """
+            Description
+            -----------
+            응답 캐시 설정(ResponseCache, None이면 사용하지 않음)
+            
+            Example
+            -------
+            http = HttpClient()
+            http.set_cache(ResponseCache('http_cache.db'))
+        """
+        
+        self.cache = cache
+    
+    def set_rate(self, host, **options):
+        """
+            Description
+            -----------
+            호스트별 속도 제한 설정(RateLimiter 인자)
+            
+            Example
+            -------
+            http = HttpClient()
+            http.set_rate('www.encar.com', rate=0.5, max_rate=1.0)
+        """
+        
+        with self._lock:
+            self._limiter_options[host] = options
+            self._limiters.pop(host, None)
+    
+    def limiter(self, host):
+        """
+            Description
+            -----------
+            호스트의 RateLimiter 반환(없으면 생성)
+        """
+        
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(**self._limiter_options.get(host, {}))
+            return limiter
+    
+    def get(self, url, params=None, headers=None):
+        """
+            Description
+            -----------
+            GET 요청(압축 해제된 응답 본문을 bytes로 반환)
+            429/5xx/연결오류/타임아웃은 지수 백오프로 재시도하고, 호스트 요청 속도를 낮춤
+            
+            Example
+            -------
+            http = HttpClient()
+            html = http.get('https://market.cetizen.com/market.php', {'q': 'info', 'pno': '7296'}).decode('cp949')
+        """
+        
+        cache = self.cache
+        if cache is None:
+            return self.request(url, params, headers).content
+        return self._get_cached(cache, url, params, headers)[0]
+    
+    def _get_cached(self, cache, url, params=None, headers=None):
+        """
+            Description
+            -----------
+            캐시를 거치는 GET 요청
+            - 유효기간 안이면 캐시, 지나면 ETag/Last-Modified로 재검증(304면 캐시), 오프라인이면 캐시만(없으면 CacheMiss)
+            
+            Output
+            ------
+            (응답 본문, 본문의 validators)
+        """
+        
+        key = cache.key(url, params)
+        entry = cache.lookup(key)
+        if entry is not None and (cache.offline or cache.fresh(key, entry)):
+            cache.hits += 1
+            self.metrics.count('cache_hits', host=urlparse(key).netloc)
+            return entry['content'], {'etag': entry['etag'], 'last_modified': entry['last_modified']}
+        if cache.offline:
+            raise CacheMiss('캐시에 없는 요청입니다. (offline: {})'.format(key))
+        content, validators = self._get_if_modified(key, entry, headers=headers)
+        if content is None:
+            cache.touch(key)
+            return entry['content'], validators
+        cache.store(key, content, validators)
+        return content, validators
+    
+    def get_if_modified(self, url, validators=None, params=None, headers=None):
+        """
+            Description
+            -----------
+            조건부 GET 요청(ETag → If-None-Match, Last-Modified → If-Modified-Since)
+            - 캐시가 설정되어 있으면 캐시를 거쳐 요청(응답을 캐시에 기록, 오프라인이면 캐시만 사용)하고
+              캐시된 응답의 validators가 주어진 validators와 같으면 변경 없음으로 처리
+            
+            Input
+            -----
+            validators : 이전 응답의 {'etag': ..., 'last_modified': ...}(없으면 일반 GET)
+            
+            Output
+            ------
+            (응답 본문(변경 없음(304)이면 None), 이번 응답의 validators)
+            
+            Example
+            -------
+            content, validators = http.get_if_modified('https://price.cetizen.com/', validators)
+        """
+        
+        cache = self.cache
+        if cache is None:
+            return self._get_if_modified(url, validators, params, headers)
+        content, current = self._get_cached(cache, url, params, headers)
+        validators = validators or {}
+        if any(validators.get(name) and validators.get(name) == current.get(name) for name in ('etag', 'last_modified')):
+            return None, current
+        return content, current
+    
+    def _get_if_modified(self, url, validators=None, params=None, headers=None):
+        """
+            Description
+            -----------
+            조건부 GET 요청(캐시를 거치지 않음, get_if_modified 참고)
+        """
+        
+        validators = validators or {}
+        headers = dict(headers or {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+        res = self.request(url, params, headers)
+        if res.status_code == 304:
+            return None, validators
+        return res.content, {'etag': res.headers.get('ETag'), 'last_modified': res.headers.get('Last-Modified')}
+    
+    def request(self, url, params=None, headers=None):
+        """
+            Description
+            -----------
+            GET 요청(재시도 포함, requests.Response 반환)
+        """
+        
+        host = urlparse(url).netloc
+        limiter = self.limiter(host)
+        attempt = 0
+        while(True):
+            limiter.acquire()
+            retry_after = None
+            self.metrics.count('requests', host=host)
+            try:
+                with self.host_slot(url), self.metrics.timer('fetch', host=host):
+                    res = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            else:
+                self.metrics.count('bytes', len(res.content), host=host)
+                if res.status_code not in self.retry_status:
+                    limiter.success()
+                    res.raise_for_status()
+                    return res
+                error = requests.HTTPError('{} Error: {}'.format(res.status_code, res.reason), response=res)
+                retry_after = res.headers.get('Retry-After')
+            limiter.backoff()
+            if attempt >= self.retries:
+                raise error
+            if retry_after is not None and retry_after.isdigit():
+                wait = float(retry_after)
+            else:
+                wait = min(self.backoff_max, self.backoff * 2 ** attempt) * (0.5 + random())
+            time.sleep(wait)
+            attempt += 1
+            self.metrics.count('retries', host=host)
+    
+    def close(self):
+        self.session.close()
\ No newline at end of file
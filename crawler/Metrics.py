@@ -0,0 +1,220 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+"""
+    Description
+    -----------
+    단계별 소요시간(히스토그램)과 카운터를 모으는 메트릭 저장소(모든 크롤러 공통)
+    - 단계 : fetch(HTTP 요청), parse(html/json 추출), transform(DataFrame 변환), write(저장/커밋)
+    - 카운터 : pages, rows, requests, retries, bytes, cache_hits 등
+    - 시간은 단조 시계(time.perf_counter)로 측정
+    - JSON lines(실행마다 한 줄 추가) 또는 Prometheus 텍스트 파일(node_exporter textfile collector)로 내보냄
+"""
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """
+            Description
+            -----------
+            구간 경계값 기준 분위수 추정(해당 구간의 상한, 마지막 구간은 최댓값)
+        """
+
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+class Metrics:
+
+    # 구간 상한(초)
+    buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def count(self, name, value=1, **labels):
+        """
+            Description
+            -----------
+            카운터 증가
+
+            Example
+            -------
+            DBCrawler.metrics.count('rows', len(df), crawler='StockPriceCrawler')
+        """
+
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage, seconds, **labels):
+        key = self._key(stage, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, stage, **labels):
+        """
+            Description
+            -----------
+            with 블록의 소요시간을 단계 히스토그램에 기록(예외가 발생해도 기록)
+
+            Example
+            -------
+            with DBCrawler.metrics.timer('parse', crawler='StockPriceCrawler'):
+                dates, values = parse_daily_quote(content)
+        """
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        """
+            Description
+            -----------
+            현재 값(dict)
+
+            Output
+            ------
+            {'counters': [{'name', 'labels', 'value'}, ...],
+             'stages': [{'stage', 'labels', 'count', 'sum', 'min', 'max', 'p50', 'p95', 'buckets'}, ...]}
+        """
+
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value} for (name, labels), value in sorted(self._counters.items())]
+            stages = [{'stage': stage, 'labels': dict(labels), 'count': h.count, 'sum': h.sum, 'min': h.min, 'max': h.max,
+                       'p50': h.quantile(0.5), 'p95': h.quantile(0.95), 'buckets': dict(zip(list(map(str, h.buckets)) + ['+Inf'], h.counts))}
+                      for (stage, labels), h in sorted(self._histograms.items())]
+        return {'counters': counters, 'stages': stages}
+
+    def write_jsonl(self, path, **labels):
+        """
+            Description
+            -----------
+            현재 값을 JSON 한 줄로 파일 끝에 추가(실행 시각, labels 포함)
+        """
+
+        record = dict(time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'), **labels, **self.snapshot())
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def to_prometheus(self, prefix='crawler', **labels):
+        """
+            Description
+            -----------
+            Prometheus 텍스트 형식
+            - 카운터 : <prefix>_<name>_total
+            - 단계 : <prefix>_stage_seconds(histogram, stage 레이블)
+        """
+
+        def format_labels(pairs):
+            pairs = list(labels.items()) + list(pairs)
+            if not pairs:
+                return ''
+            return '{' + ','.join('{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"')) for key, value in pairs) + '}'
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        lines = []
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append('# TYPE {}_{}_total counter'.format(prefix, name))
+            lines.extend('{}_{}_total{} {}'.format(prefix, name, format_labels(pairs), value) for (n, pairs), value in counters if n == name)
+        if histograms:
+            metric = '{}_stage_seconds'.format(prefix)
+            lines.append('# TYPE {} histogram'.format(metric))
+            for (stage, pairs), h in histograms:
+                pairs = (('stage', stage),) + pairs
+                cumulative = 0
+                for bound, count in zip(list(map(str, h.buckets)) + ['+Inf'], h.counts):
+                    cumulative += count
+                    lines.append('{}_bucket{} {}'.format(metric, format_labels(pairs + (('le', bound),)), cumulative))
+                lines.append('{}_sum{} {}'.format(metric, format_labels(pairs), h.sum))
+                lines.append('{}_count{} {}'.format(metric, format_labels(pairs), h.count))
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix='crawler', **labels):
+        """
+            Description
+            -----------
+            Prometheus 텍스트 파일로 저장(임시 파일에 쓴 뒤 교체하므로 수집기가 쓰는 중인 파일을 읽지 않음)
+        """
+
+        temp = '{}.{}.tmp'.format(path, os.getpid())
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(prefix, **labels))
+        os.replace(temp, path)
+
+    def write(self, path, **labels):
+        """
+            Description
+            -----------
+            확장자로 형식 선택(.prom → Prometheus 텍스트, 그 밖에는 JSON lines)
+
+            Example
+            -------
+            DBCrawler.metrics.write('metrics.jsonl', job='nightly')
+            DBCrawler.metrics.write('/var/lib/node_exporter/crawler.prom')
+        """
+
+        if path.endswith('.prom'):
+            self.write_prometheus(path, **labels)
+        else:
+            self.write_jsonl(path, **labels)
+
+    def summary(self):
+        """
+            Description
+            -----------
+            단계별 소요시간 요약(단계, 레이블, 횟수, 합계, p50, p95, 최댓값) 문자열
+        """
+
+        lines = ['{:<10}{:<40}{:>8}{:>10}{:>10}{:>10}{:>10}'.format('STAGE', 'LABELS', 'COUNT', 'SUM(s)', 'P50(s)', 'P95(s)', 'MAX(s)')]
+        for stage in self.snapshot()['stages']:
+            lines.append('{:<10}{:<40}{:>8,}{:>10.2f}{:>10.3f}{:>10.3f}{:>10.3f}'.format(
+                stage['stage'], ','.join('{}={}'.format(key, value) for key, value in stage['labels'].items()),
+                stage['count'], stage['sum'], stage['p50'], stage['p95'], stage['max']))
+        return '\n'.join(lines)
@@ -1,61 +1,18 @@
-import time
-import pandas as pd
-from datetime import datetime
-import sqlite3
-from .DBCrawler import DBCrawler
+from .quote import QuoteCrawler, SOURCES, get_quotes, iter_quote_pages
 
 """
     Description
     -----------
-    유가 데이터를 수집하는 크롤러
+    유가 데이터를 수집하는 크롤러(QuoteCrawler(conn, 'oil')와 같음)
 """
 
-class OilPriceCrawler(DBCrawler):
+class OilPriceCrawler(QuoteCrawler):
     
     def __init__(self, conn):
-        super().__init__(conn)
-        self.table_name = 'OIL_PRICE'
-        self._create_table()
-        
-    def _create_table(self):
-        """
-            Description
-            -----------
-            테이블 생성
-        """
-        
-        query = """
-            CREATE TABLE IF NOT EXISTS {table_name} (
-                BASE_DATE TEXT,
-                CODE TEXT,
-                PRICE NUMBER,
-                PRIMARY KEY (CODE, BASE_DATE)
-            )
-        """.format(table_name=self.table_name)
-        self.cur.execute(query)
-        self.conn.commit()
-        
-    def set_code(self, codes):
-        """
-            Description
-            -----------
-            수집할 유가 코드들 설정
-            
-            Input
-            -----
-            code : OIL_CL(WTI), OIL_DU(두바이유), OIL_BRT(브렌트유)
-            
-            Example
-            -------
-            conn = sqlite3.connect('external_data.db')
-            opc = OilPriceCrawler(conn)
-            opc.set_code(['OIL_CL', 'OIL_DU', 'OIL_BRT'])
-        """
-        
-        self.codes = codes
+        super().__init__(conn, 'oil')
         
     @staticmethod
-    def get_oil_price(code):
+    def get_oil_price(code, last_date=None):
         """
             Description
             -----------
@@ -64,6 +21,7 @@ class OilPriceCrawler(DBCrawler):
             Input
             -----
             code : OIL_CL(WTI), OIL_DU(두바이유), OIL_BRT(브렌트유)
+            last_date : 증분 수집 기준일자(YYYY-MM-DD, 해당 일자 이후 데이터만 수집)
 
             Output
             ------
@@ -75,51 +33,19 @@ class OilPriceCrawler(DBCrawler):
 
         """
 
-        delay = 0.01
-        page = 1
-        result = []
-        start_time = datetime.now()
-
-        # 수집
-        print('[{}] 데이터 수집을 시작합니다. (code: {})'.format(start_time.strftime('%Y/%m/%d %H:%M:%S'), code))
-        while(True):
-            url = 'https://finance.naver.com/marketindex/worldDailyQuote.nhn?marketindexCd={}&fdtc=2&page={}'.format(code, page)
-            data = pd.read_html(url)[0].dropna()
-            if page != 1:
-                try:
-                    if data.iloc[-1, 0] == result[-1].iloc[-1, 0]:
-                        break
-                except:
-                    break
-            result.append(data)
-            page += 1
-            time.sleep(delay)
-
-        # 가공
-        oil_price = pd.concat(result).reset_index(drop=True)
-        oil_price.columns = ['BASE_DATE', 'PRICE', '전일대비', '등락율']
-        oil_price['BASE_DATE'] = oil_price['BASE_DATE'].apply(lambda x: datetime.strptime(x, '%Y.%m.%d').strftime('%Y-%m-%d'))
-        oil_price = oil_price[['BASE_DATE', 'PRICE']]
-        oil_price.insert(1, 'CODE', code)
-
-        end_time = datetime.now()
-        print('[{}] 데이터 수집을 종료합니다. (code: {}, 수집시간: {}초, 데이터수: {:,}개)'.format(end_time.strftime('%Y/%m/%d %H:%M:%S'), code, (end_time-start_time).seconds, len(oil_price)))
-        return oil_price
+        return get_quotes(SOURCES['oil'], code, last_date, 'OilPriceCrawler')
         
-    def run(self):
+    @staticmethod
+    def iter_oil_price(code, last_date=None, start_page=1):
         """
             Description
             -----------
-            크롤러 실행
-            
+            유가 데이터를 페이지 단위로 수집하는 generator(최신 → 과거 순, iter_quote_pages 참고)
+
             Example
             -------
-            conn = sqlite3.connect('external_data.db')
-            opc = OilPriceCrawler(conn)
-            opc.set_code(['OIL_CL', 'OIL_DU', 'OIL_BRT'])
-            opc.run()
+            for page, data in OilPriceCrawler.iter_oil_price('OIL_DU'):
+                print(page, len(data))
         """
-        
-        for code in self.codes:
-            oil_price = self.get_oil_price(code)
-            oil_price.to_sql(name=self.table_name, con=self.conn, if_exists='replace', index=False)
\ No newline at end of file
+
+        return iter_quote_pages(SOURCES['oil'], code, last_date, start_page, 'OilPriceCrawler')
@@ -0,0 +1,259 @@
+import json
+import os
+import threading
+import time
+from itertools import count
+from urllib.parse import quote, unquote
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+"""
+    Description
+    -----------
+    크롤러 결과를 Parquet 파일로 저장하는 열 기반 이력 저장소(SQLite와 함께 사용, pyarrow 14 이상 필요)
+    - <root>/<테이블>/<키>=<코드>/YEAR=<연도>/part-*.parquet(hive 파티션, 키 = CODE 또는 PNO)
+    - 저장은 파티션마다 새 파일을 추가(기존 파일은 다시 쓰지 않음), 파일이 max_files개를 넘으면 하나로 합침(compaction)
+    - 같은 기본키가 여러 파일에 있으면 나중에 저장한 행을 사용
+    - 읽기는 요청한 코드, 연도의 파일만 메모리 맵으로 열고 기준일자 조건은 양 끝 연도 파티션에만 적용
+"""
+
+_sequence = count()
+
+class ParquetStore:
+
+    def __init__(self, root='parquet', max_files=8):
+        """
+            Input
+            -----
+            root : 저장 폴더
+            max_files : 파티션당 파일 수가 이보다 많아지면 합침
+        """
+
+        if pa is None:
+            raise ImportError('Parquet 저장소를 사용하려면 pyarrow를 설치해야 합니다. (pip install pyarrow)')
+        # concat_tables(promote_options=...)는 pyarrow 14부터 지원
+        if int(pa.__version__.split('.')[0]) < 14:
+            raise ImportError('Parquet 저장소를 사용하려면 pyarrow 14 이상이 필요합니다. (현재: {}, pip install -U pyarrow)'.format(pa.__version__))
+        self.root = root
+        self.max_files = max_files
+        self._lock = threading.Lock()
+
+    def _table_dir(self, table_name):
+        return os.path.join(self.root, table_name)
+
+    def _partition_dir(self, table_name, key, code, year):
+        return os.path.join(self.root, table_name, '{}={}'.format(key, quote(str(code), safe='')), 'YEAR={}'.format(year))
+
+    @staticmethod
+    def _files(directory):
+        return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+
+    def meta(self, table_name):
+        """
+            Description
+            -----------
+            테이블 정보 {'key': 파티션 키 컬럼, 'primary_key': 기본키 컬럼}(없으면 None)
+        """
+
+        path = os.path.join(self._table_dir(table_name), '_meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_meta(self, table_name, key, primary_key):
+        meta = self.meta(table_name)
+        if meta is not None:
+            if meta['key'] != key:
+                raise ValueError('파티션 키가 다릅니다. ({}: {} != {})'.format(table_name, meta['key'], key))
+            return meta
+        meta = {'key': key, 'primary_key': list(primary_key)}
+        os.makedirs(self._table_dir(table_name), exist_ok=True)
+        path = os.path.join(self._table_dir(table_name), '_meta.json')
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(path + '.tmp', path)
+        return meta
+
+    @staticmethod
+    def _write_file(table, directory):
+        """
+            Description
+            -----------
+            파티션에 새 파일 저장(임시 파일에 쓴 뒤 이름 변경, 파일명은 저장 순서대로 정렬됨)
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, 'part-{:020d}-{}-{}.parquet'.format(time.time_ns(), os.getpid(), next(_sequence)))
+        pq.write_table(table, path + '.tmp', compression='zstd')
+        os.replace(path + '.tmp', path)
+        return path
+
+    def append(self, table_name, df, key='CODE', primary_key=('CODE', 'BASE_DATE')):
+        """
+            Description
+            -----------
+            데이터를 코드, 연도(BASE_DATE 앞 4자리) 파티션별 새 파일로 추가
+
+            Input
+            -----
+            table_name : 테이블명
+            df : 저장할 데이터(BASE_DATE, key 컬럼 필수)
+            key : 파티션 키 컬럼(CODE, PNO)
+            primary_key : 기본키 컬럼(같은 기본키는 나중에 저장한 행 사용)
+
+            Example
+            -------
+            store = ParquetStore('parquet')
+            store.append('STOCK_PRICE', StockPriceCrawler.get_stock_price('005830'))
+        """
+
+        if df is None or len(df) == 0:
+            return
+        df = df.reset_index(drop=True)
+        years = df['BASE_DATE'].astype(str).str[:4]
+        with self._lock:
+            self._write_meta(table_name, key, primary_key)
+            for (code, year), rows in df.groupby([df[key].astype(str), years], sort=False).indices.items():
+                part = df.iloc[rows].drop(columns=[key])
+                directory = self._partition_dir(table_name, key, code, year)
+                self._write_file(pa.Table.from_pandas(part, preserve_index=False), directory)
+                if len(self._files(directory)) > self.max_files:
+                    self._compact_partition(table_name, directory)
+
+    @staticmethod
+    def _read_partition(directory, subset, columns=None):
+        """
+            Description
+            -----------
+            파티션의 파일들을 메모리 맵으로 읽어 기준일자 순 pyarrow Table로 반환(파일이 여러 개면 subset 기준 중복 제거, 나중 파일 우선)
+        """
+
+        files = ParquetStore._files(directory)
+        if not files:
+            return None
+        tables = [pq.ParquetFile(path, memory_map=True).read(columns) for path in files]
+        if len(tables) == 1:
+            # 파일은 수집 순서(최근 날짜부터)대로 저장되어 있음
+            return tables[0].sort_by([('BASE_DATE', 'ascending')])
+        table = pa.concat_tables(tables, promote_options='default')
+        df = table.to_pandas().drop_duplicates(subset=subset, keep='last').sort_values('BASE_DATE', kind='stable')
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    @staticmethod
+    def _subset(meta):
+        # 파티션 안에서의 기본키(파티션 키 제외)
+        return [column for column in meta['primary_key'] if column != meta['key']]
+
+    def _compact_partition(self, table_name, directory):
+        files = self._files(directory)
+        if len(files) <= 1:
+            return
+        table = self._read_partition(directory, self._subset(self.meta(table_name)))
+        self._write_file(table, directory)
+        for path in files:
+            os.remove(path)
+
+    def _partitions(self, table_name, codes=None, start=None, end=None):
+        """
+            Description
+            -----------
+            조건에 맞는 (코드, 파티션 폴더) 리스트(폴더명으로만 거름, 파일은 열지 않음)
+        """
+
+        meta = self.meta(table_name)
+        if meta is None:
+            return meta, []
+        key = meta['key']
+        prefix = key + '='
+        root = self._table_dir(table_name)
+        wanted = None if codes is None else {str(code) for code in codes}
+        first_year = None if start is None else int(str(start)[:4])
+        last_year = None if end is None else int(str(end)[:4])
+        partitions = []
+        for name in sorted(os.listdir(root)):
+            if not name.startswith(prefix):
+                continue
+            code = unquote(name[len(prefix):])
+            if wanted is not None and code not in wanted:
+                continue
+            for year_name in sorted(os.listdir(os.path.join(root, name))):
+                year = int(year_name.partition('=')[2])
+                if (first_year is not None and year < first_year) or (last_year is not None and year > last_year):
+                    continue
+                partitions.append((code, os.path.join(root, name, year_name)))
+        return meta, partitions
+
+    def compact(self, table_name, codes=None):
+        """
+            Description
+            -----------
+            파티션별 파일을 하나로 합침(기본키 중복 제거, 기준일자 순 정렬)
+
+            Example
+            -------
+            ParquetStore('parquet').compact('STOCK_PRICE')
+        """
+
+        with self._lock:
+            for code, directory in self._partitions(table_name, codes)[1]:
+                self._compact_partition(table_name, directory)
+
+    def read(self, table_name, codes=None, start=None, end=None, columns=None):
+        """
+            Description
+            -----------
+            코드, 기준일자 범위의 데이터 조회
+
+            Input
+            -----
+            table_name : 테이블명
+            codes : 코드 리스트(기본값: 전체)
+            start, end : 기준일자 범위(YYYY-MM-DD, 양 끝 포함)
+            columns : 읽을 컬럼(기본값: 전체, 키 컬럼은 항상 포함)
+
+            Output
+            ------
+            DataFrame(키, 기준일자 순)
+
+            Example
+            -------
+            store = ParquetStore('parquet')
+            fx = store.read('EXCHANGE_RATE', ['FX_USDKRW', 'FX_JPYKRW'], start='2010-01-01')
+        """
+
+        meta, partitions = self._partitions(table_name, codes, start, end)
+        if meta is None:
+            raise KeyError('저장된 테이블이 없습니다. ({})'.format(table_name))
+        key = meta['key']
+        subset = self._subset(meta)
+        needed = None
+        if columns is not None:
+            columns = [column for column in columns if column != key]
+            needed = columns + [column for column in subset + ['BASE_DATE'] if column not in columns]
+        first_year = None if start is None else str(start)[:4]
+        last_year = None if end is None else str(end)[:4]
+        tables = []
+        # 코드 순(같은 코드는 연도 순 유지), 파티션 안은 기준일자 순
+        for code, directory in sorted(partitions, key=lambda partition: partition[0]):
+            table = self._read_partition(directory, subset, needed)
+            if table is None or table.num_rows == 0:
+                continue
+            # 양 끝 연도 파티션만 기준일자로 거름
+            year = os.path.basename(directory).partition('=')[2]
+            if year == first_year:
+                table = table.filter(pc.greater_equal(table['BASE_DATE'], str(start)))
+            if year == last_year:
+                table = table.filter(pc.less_equal(table['BASE_DATE'], str(end)))
+            if columns is not None:
+                table = table.select(columns)
+            tables.append(table.add_column(0, key, pa.array([code] * table.num_rows, pa.string())))
+        if not tables:
+            return pd.DataFrame(columns=[key] + (columns or []))
+        return pa.concat_tables(tables, promote_options='default').to_pandas()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+"""
+    Description
+    -----------
+    호스트별 적응형 토큰 버킷(응답이 정상이면 속도를 올리고, 서버가 거부하면 절반으로 줄임)
+"""
+
+class RateLimiter:
+    
+    def __init__(self, rate=10.0, min_rate=0.5, max_rate=100.0, increase=1.0, burst=1):
+        """
+            Input
+            -----
+            rate : 초기 초당 요청 수
+            min_rate, max_rate : 초당 요청 수 하한, 상한
+            increase : 정상 응답 1건당 증가시킬 초당 요청 수
+            burst : 버킷 크기(연속으로 보낼 수 있는 요청 수)
+        """
+        
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """
+            Description
+            -----------
+            토큰 1개를 얻을 때까지 대기
+        """
+        
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+    
+    def success(self):
+        """
+            Description
+            -----------
+            정상 응답: 속도를 increase만큼 증가(가산 증가)
+        """
+        
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+    
+    def backoff(self):
+        """
+            Description
+            -----------
+            429/5xx/타임아웃: 속도를 절반으로 감소(승산 감소)
+        """
+        
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
\ No newline at end of file
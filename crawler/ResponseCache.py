@@ -0,0 +1,187 @@
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime
+import requests
+
+"""
+    Description
+    -----------
+    HTTP 응답 캐시(SQLite 파일, URL별 본문/ETag/Last-Modified 저장)
+    - 출처(URL 패턴)별 유효기간, 만료 후 ETag/If-Modified-Since 재검증, 용량 기준 LRU 삭제, 오프라인 재생
+"""
+
+class CacheMiss(requests.RequestException):
+    """
+        Description
+        -----------
+        오프라인 모드에서 캐시에 없는 URL 요청
+    """
+
+class ResponseCache:
+
+    # (URL 정규식, 유효기간) - 앞에서부터 처음 일치하는 규칙 적용
+    # 유효기간: 초, 'today'(받은 날짜와 같은 날까지), None(영구), 0(항상 재검증/재요청)
+    # 네이버 일별 시세는 최신순이라 새 거래일이 추가될 때마다 page=2 이후 페이지도 한 행씩 밀리므로 영구 보관하지 않음
+    default_ttls = [
+        (r'^https?://finance\.naver\.com/.*[?&]page=1(&|$)', 0),
+        (r'^https?://finance\.naver\.com/', 'today'),
+        (r'^https?://market\.cetizen\.com/market\.php', 'today'),
+    ]
+
+    def __init__(self, path='http_cache.db', max_bytes=512 * 2 ** 20, offline=False, ttl=0):
+        """
+            Input
+            -----
+            path : 캐시 파일 경로
+            max_bytes : 저장할 본문(압축 후)의 최대 용량, 넘으면 가장 오래 사용하지 않은 응답부터 삭제
+            offline : True이면 네트워크 요청 없이 캐시만 사용(만료된 응답도 사용, 없으면 CacheMiss)
+            ttl : 일치하는 규칙이 없는 URL의 유효기간
+        """
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.ttl_default = ttl
+        self._ttls = [(re.compile(pattern), ttl) for pattern, ttl in self.default_ttls]
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        query = """
+            CREATE TABLE IF NOT EXISTS RESPONSE_CACHE (
+                URL TEXT PRIMARY KEY,
+                CONTENT BLOB,
+                ETAG TEXT,
+                LAST_MODIFIED TEXT,
+                FETCHED_AT REAL,
+                ACCESSED_AT REAL,
+                SIZE INTEGER
+            )
+        """
+        self.conn.execute(query)
+        self.conn.execute('CREATE INDEX IF NOT EXISTS IX_RESPONSE_CACHE_ACCESSED ON RESPONSE_CACHE (ACCESSED_AT)')
+        self.conn.commit()
+        self.size = self.conn.execute('SELECT COALESCE(SUM(SIZE), 0) FROM RESPONSE_CACHE').fetchone()[0]
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url, params=None):
+        """
+            Description
+            -----------
+            캐시 키(쿼리 문자열을 포함한 요청 URL)
+        """
+
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def set_ttl(self, pattern, ttl):
+        """
+            Description
+            -----------
+            URL 패턴별 유효기간 설정(기존 규칙보다 우선)
+
+            Example
+            -------
+            cache.set_ttl(r'^https?://finance\.naver\.com/', 3600)
+            cache.set_ttl(r'^https?://api\.encar\.com/', None)  # 영구
+        """
+
+        with self._lock:
+            self._ttls.insert(0, (re.compile(pattern), ttl))
+
+    def ttl(self, url):
+        for pattern, ttl in self._ttls:
+            if pattern.search(url):
+                return ttl
+        return self.ttl_default
+
+    def fresh(self, url, entry):
+        """
+            Description
+            -----------
+            캐시된 응답을 재검증 없이 사용할 수 있는지
+        """
+
+        ttl = self.ttl(url)
+        if ttl is None:
+            return True
+        if ttl == 'today':
+            return datetime.fromtimestamp(entry['fetched_at']).date() == datetime.now().date()
+        return time.time() - entry['fetched_at'] < ttl
+
+    def lookup(self, url):
+        """
+            Description
+            -----------
+            캐시된 응답({'content', 'etag', 'last_modified', 'fetched_at'}) 또는 None
+        """
+
+        with self._lock:
+            row = self.conn.execute('SELECT CONTENT, ETAG, LAST_MODIFIED, FETCHED_AT FROM RESPONSE_CACHE WHERE URL = ?', (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            with self.conn:
+                self.conn.execute('UPDATE RESPONSE_CACHE SET ACCESSED_AT = ? WHERE URL = ?', (time.time(), url))
+        return {'content': zlib.decompress(row[0]), 'etag': row[1], 'last_modified': row[2], 'fetched_at': row[3]}
+
+    def touch(self, url):
+        """
+            Description
+            -----------
+            재검증 결과 변경 없음(304) → 받은 시각 갱신
+        """
+
+        with self._lock:
+            self.revalidated += 1
+            with self.conn:
+                self.conn.execute('UPDATE RESPONSE_CACHE SET FETCHED_AT = ? WHERE URL = ?', (time.time(), url))
+
+    def store(self, url, content, validators=None):
+        """
+            Description
+            -----------
+            응답 저장(압축) 후 용량을 넘으면 LRU 삭제
+        """
+
+        validators = validators or {}
+        data = zlib.compress(content)
+        now = time.time()
+        with self._lock:
+            with self.conn:
+                row = self.conn.execute('SELECT SIZE FROM RESPONSE_CACHE WHERE URL = ?', (url,)).fetchone()
+                self.conn.execute('INSERT OR REPLACE INTO RESPONSE_CACHE (URL, CONTENT, ETAG, LAST_MODIFIED, FETCHED_AT, ACCESSED_AT, SIZE) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                  (url, data, validators.get('etag'), validators.get('last_modified'), now, now, len(data)))
+                self.size += len(data) - (row[0] if row else 0)
+                if self.size > self.max_bytes:
+                    self._evict()
+
+    def _evict(self):
+        """
+            Description
+            -----------
+            가장 오래 사용하지 않은 응답부터 max_bytes의 90% 이하가 될 때까지 삭제(트랜잭션 안에서 호출)
+        """
+
+        target = self.max_bytes * 0.9
+        urls = []
+        for url, size in self.conn.execute('SELECT URL, SIZE FROM RESPONSE_CACHE ORDER BY ACCESSED_AT'):
+            if self.size <= target:
+                break
+            urls.append((url,))
+            self.size -= size
+        self.conn.executemany('DELETE FROM RESPONSE_CACHE WHERE URL = ?', urls)
+
+    def clear(self):
+        with self._lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM RESPONSE_CACHE')
+            self.size = 0
+
+    def close(self):
+        self.conn.close()
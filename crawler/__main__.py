@@ -0,0 +1,184 @@
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from .DBCrawler import DBCrawler
+from .DBWriter import DBWriter
+from .ResponseCache import ResponseCache
+from .StockPriceCrawler import StockPriceCrawler
+from .OilPriceCrawler import OilPriceCrawler
+from .ExchangeRateCrawler import ExchangeRateCrawler
+from .quote import QuoteCrawler
+from .cetizen import PnoCrawler, UsedPhonePriceCrawler
+from .encar import UsedCarPriceCrawler
+
+"""
+    Description
+    -----------
+    설정 파일의 수집 작업을 동시에 실행(python -m crawler crawler.json)
+    - 모든 작업이 하나의 쓰기 연결(WAL)과 쓰기 큐(DBWriter, 그룹 커밋)를 함께 사용
+    - after에 적힌 작업이 성공한 뒤에 시작(실패하면 건너뜀)
+    - 끝나면 작업별 요약(상태, 소요시간, 저장한 데이터 행 수) 출력, 실패한 작업이 있으면 종료코드 1
+    - max_in_flight(호스트별 커넥션 풀 크기)는 작업을 시작하기 전에 한 번만 설정(작업 중에는 바꿀 수 없음)
+
+    설정 파일
+    ---------
+    {
+        "database": "external_data.db",
+        "max_in_flight": 4,
+        "cache": {"path": "http_cache.db", "offline": false},
+        "metrics": "crawler_metrics.jsonl",
+        "parquet": "parquet",
+        "jobs": [
+            {"name": "fx", "crawler": "ExchangeRateCrawler", "set": {"code": ["FX_JPYKRW"], "incremental": true}},
+            {"name": "rate", "crawler": "QuoteCrawler", "options": {"source": "rate"}, "set": {"code": ["IRR_CD91"], "incremental": true}},
+            {"name": "pno", "crawler": "PnoCrawler"},
+            {"name": "phone", "crawler": "UsedPhonePriceCrawler", "after": ["pno"],
+             "set": {"pno": {"query": "SELECT PNO FROM CETIZEN_PNO"}, "workers": 8}},
+            {"name": "car", "crawler": "UsedCarPriceCrawler", "options": {"browsers": 2}, "set": {"code": ["benz", "ev", "bmw"]}}
+        ]
+    }
+    - options : 크롤러 생성자 인자(conn 제외)
+    - set : 크롤러의 set_<이름>(값) 호출(ex. "code" → set_code), 값이 {"query": ...}이면 조회 결과 첫 컬럼 리스트
+    - metrics : 단계별 소요시간/카운터를 내보낼 파일(.prom이면 Prometheus 텍스트, 그 밖에는 JSON lines로 실행마다 한 줄 추가)
+    - parquet : Parquet 저장 폴더(지원하는 크롤러는 SQLite와 함께 코드, 연도별 Parquet로도 저장, 작업별로는 "set": {"parquet": ...})
+"""
+
+CRAWLERS = {cls.__name__: cls for cls in (StockPriceCrawler, OilPriceCrawler, ExchangeRateCrawler, QuoteCrawler, PnoCrawler, UsedPhonePriceCrawler, UsedCarPriceCrawler)}
+
+def run_job(job, conn, parquet=None, crawlers=None):
+    """
+        Description
+        -----------
+        작업 하나를 설정대로 만들어 실행
+
+        Input
+        -----
+        parquet : Parquet 저장 폴더(Parquet 저장을 지원하는 크롤러만 적용)
+        crawlers : 만든 크롤러를 추가할 리스트(실패해도 저장한 행 수를 알 수 있도록)
+    """
+
+    crawler = CRAWLERS[job['crawler']](conn, **job.get('options', {}))
+    if crawlers is not None:
+        crawlers.append(crawler)
+    if parquet is not None and crawler.parquet_key is not None:
+        crawler.set_parquet(parquet)
+    for name, value in job.get('set', {}).items():
+        if isinstance(value, dict) and 'query' in value:
+            crawler.cur.execute(value['query'])
+            value = [row[0] for row in crawler.cur.fetchall()]
+        getattr(crawler, 'set_' + name)(value)
+    crawler.run()
+
+def run(config, names=None):
+    """
+        Description
+        -----------
+        설정의 작업들을 동시에 실행하고 작업별 요약 반환
+
+        Input
+        -----
+        config : 설정(dict)
+        names : 실행할 작업 이름(기본값: 전체, 선택한 작업의 after는 무시하지 않음)
+
+        Output
+        ------
+        ([{'name', 'crawler', 'status', 'seconds', 'rows', 'error'}, ...], 쓰기 통계(DBWriter.stats()))
+    """
+
+    jobs = [job for job in config['jobs'] if names is None or job['name'] in names]
+    for job in jobs:
+        if job['crawler'] not in CRAWLERS:
+            raise ValueError('알 수 없는 크롤러입니다. ({}: {})'.format(job['name'], job['crawler']))
+    selected = {job['name'] for job in jobs}
+    if config.get('max_in_flight') is not None:
+        DBCrawler.http.set_max_in_flight(config['max_in_flight'])
+    if config.get('cache'):
+        cache = dict(config['cache'])
+        ttls = cache.pop('ttls', {})
+        DBCrawler.http.set_cache(ResponseCache(**cache))
+        for pattern, ttl in ttls.items():
+            DBCrawler.http.cache.set_ttl(pattern, ttl)
+
+    DBCrawler.metrics.reset()
+    writer = DBWriter(config.get('database', 'external_data.db'))
+    done = {job['name']: threading.Event() for job in jobs}
+    summary = {job['name']: {'name': job['name'], 'crawler': job['crawler'], 'status': 'pending', 'seconds': 0.0, 'rows': 0, 'error': None} for job in jobs}
+
+    def work(job):
+        result = summary[job['name']]
+        try:
+            for name in job.get('after', []):
+                if name in selected:
+                    done[name].wait()
+                    if summary[name]['status'] != 'ok':
+                        result['status'] = 'skipped'
+                        result['error'] = '{} 실패'.format(name)
+                        return
+            print('[{}] 작업을 시작합니다. ({})'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), job['name']))
+            conn = writer.connect()
+            crawlers = []
+            start = time.perf_counter()
+            try:
+                run_job(job, conn, config.get('parquet'), crawlers)
+                result['status'] = 'ok'
+            except Exception as e:
+                result['status'] = 'failed'
+                result['error'] = repr(e)
+            finally:
+                result['seconds'] = time.perf_counter() - start
+                # 쓰기 연결의 행 수에는 체크포인트, DELETE가 섞이므로 크롤러가 저장한 데이터 행 수 사용
+                result['rows'] = sum(crawler.rows for crawler in crawlers)
+                conn.close()
+                DBCrawler.metrics.observe('job', result['seconds'], job=job['name'], status=result['status'])
+            print('[{}] 작업을 종료합니다. ({}, {})'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), job['name'], result['status']))
+        finally:
+            done[job['name']].set()
+
+    try:
+        with DBCrawler.http.in_use(), ThreadPoolExecutor(max_workers=max(1, len(jobs))) as executor:
+            list(executor.map(work, jobs))
+    finally:
+        writer.close()
+        if DBCrawler.http.cache is not None:
+            DBCrawler.http.cache.close()
+            DBCrawler.http.set_cache(None)
+        if config.get('metrics'):
+            DBCrawler.metrics.write(config['metrics'])
+    return [summary[job['name']] for job in jobs], writer.stats()
+
+def print_summary(summary, stats=None):
+    print('{:<16}{:<24}{:<10}{:>10}{:>12}  {}'.format('JOB', 'CRAWLER', 'STATUS', 'SECONDS', 'ROWS', 'ERROR'))
+    for result in summary:
+        print('{:<16}{:<24}{:<10}{:>10.1f}{:>12,}  {}'.format(result['name'], result['crawler'], result['status'], result['seconds'], result['rows'], result['error'] or ''))
+    if stats is not None:
+        print('쓰기: {:,}행, 트랜잭션 {:,}개 → 커밋 {:,}회, {:,.0f}행/초(쓰기 스레드 기준 {:,.0f}행/초)'.format(
+            stats['rows'], stats['jobs'], stats['commits'], stats['rows_per_second'], stats['rows_per_busy_second']))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m crawler', description='설정 파일의 수집 작업을 동시에 실행')
+    parser.add_argument('config', help='설정 파일(JSON)')
+    parser.add_argument('--jobs', nargs='+', help='실행할 작업 이름(기본값: 전체)')
+    parser.add_argument('--offline', action='store_true', help='응답 캐시만 사용(네트워크 요청 없음)')
+    parser.add_argument('--metrics', help='메트릭 파일(.prom이면 Prometheus 텍스트, 그 밖에는 JSON lines)')
+    parser.add_argument('--parquet', help='Parquet 저장 폴더(SQLite와 함께 저장)')
+    args = parser.parse_args(argv)
+
+    with open(args.config, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    if args.offline:
+        config['cache'] = dict(config.get('cache') or {}, offline=True)
+    if args.metrics:
+        config['metrics'] = args.metrics
+    if args.parquet:
+        config['parquet'] = args.parquet
+    summary, stats = run(config, args.jobs)
+    print_summary(summary, stats)
+    print(DBCrawler.metrics.summary())
+    return 0 if all(result['status'] == 'ok' for result in summary) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,22 +1,98 @@
-import urllib.request as req
-from urllib.parse import urlparse, urlencode
-from bs4 import BeautifulSoup
+import ast
+import json
+import hashlib
+from urllib.parse import urlparse
+from lxml import etree, html
+import numpy as np
 import pandas as pd
 import re
+import time
 from datetime import datetime
 from .DBCrawler import DBCrawler
 
+# 첫 항목에 date 키가 있는 객체 배열(키 순서 무관)
+_PRICE_HISTORY = re.compile(rb'\[\s*\{(?=[^{}]*\bdate["\']?\s*:).*?\}\s*,?\s*\]', re.S)
+_PRICE_HISTORY_KEY = re.compile(rb'([{,]\s*)(\w+)\s*:')
+# date 키와 low/mid/high 키가 함께 있는 객체(시세 정보가 있는 페이지인지 판단)
+_PRICE_OBJECT = re.compile(rb'\{(?=[^{}]*\bdate["\']?\s*:)(?=[^{}]*\b(?:low|mid|high)["\']?\s*:)[^{}]*\}')
+
+def parse_price_history(content):
+    """
+        Description
+        -----------
+        시세 페이지(market.php?q=info)의 스크립트에서 시세 배열을 찾아 파싱(eval 없음)
+        - 시세 항목({date, low, mid, high})이 있는데 배열을 찾지 못하거나 값이 빠져 있으면 ValueError(페이지 형식 변경)
+        
+        Input
+        -----
+        content : 페이지 html(bytes)
+        
+        Output
+        ------
+        (BASE_DATE, LOW, MID, HIGH) 배열(시세 정보가 없는 페이지는 빈 배열)
+    """
+    
+    match = _PRICE_HISTORY.search(content)
+    if match is None:
+        if _PRICE_OBJECT.search(content) is not None:
+            raise ValueError('시세 항목은 있지만 시세 배열을 찾지 못했습니다. (페이지 형식 확인 필요)')
+        data = []
+    else:
+        txt = _PRICE_HISTORY_KEY.sub(rb'\1"\2":', match.group(0))
+        try:
+            data = json.loads(txt)
+        except ValueError:
+            data = ast.literal_eval(txt.decode('cp949'))
+    try:
+        return (np.array([dt['date'] for dt in data], dtype=object),
+                np.array([dt['low'] for dt in data], dtype=np.float64),
+                np.array([dt['mid'] for dt in data], dtype=np.float64),
+                np.array([dt['high'] for dt in data], dtype=np.float64))
+    except KeyError as e:
+        raise ValueError('시세 항목에 {} 값이 없습니다. (페이지 형식 확인 필요)'.format(e)) from None
+
+_WIRELESS_DIVS = etree.XPath('//div[starts-with(@name, "wireless_")]')
+_CATALOG_ITEMS = etree.XPath('.//li[starts-with(@style, "float:left")]')
+
+def parse_catalog(content, wireless):
+    """
+        Description
+        -----------
+        시세 메인 페이지의 div[name^=wireless_]를 한 번 순회하며 통신사별로 단말기 정보 추출
+        - 같은 단말기 div가 2개씩 있으므로(id=make_0 외 하나 더) 중복 제거
+        - 결과는 wireless 순서(통신사 그룹 순서)대로 정렬
+        
+        Input
+        -----
+        content : 페이지 html(cp949 bytes)
+        wireless : {div name: 통신사} (ex. {'wireless_1[]': 'S'})
+        
+        Output
+        ------
+        PNO, MODEL, WIRELESS 컬럼의 DataFrame
+    """
+    
+    buckets = {name: [] for name in wireless}
+    for div in _WIRELESS_DIVS(html.fromstring(content.decode('cp949'))):
+        bucket = buckets.get(div.get('name'))
+        if bucket is None:
+            continue
+        items = _CATALOG_ITEMS(div)
+        pno = urlparse(items[0].find('.//a').get('href')).query.split('&')[1].split('=')[1]
+        bucket.append((pno, items[0].text_content(), wireless[div.get('name')]))
+    rows = [row for bucket in buckets.values() for row in bucket]
+    return pd.DataFrame(rows, columns=['PNO', 'MODEL', 'WIRELESS']).drop_duplicates().reset_index(drop=True)
+
 class PnoCrawler(DBCrawler):
 
     def __init__(self, conn):
         super().__init__(conn)
         self.table_name = 'CETIZEN_PNO'
+        self.primary_key = ('PNO',)
         self._create_table()
+        self._ensure_primary_key()
 
-        url = 'https://price.cetizen.com/'
-        res = req.Request(url)
-        html = req.urlopen(res).read().decode('cp949')
-        self.soup = BeautifulSoup(html, 'html.parser')
+        self.url = 'https://price.cetizen.com/'
         self.wireless = {
             'wireless_1[]': 'S',
             'wireless_2[]': 'K',
@@ -46,45 +122,100 @@ class PnoCrawler(DBCrawler):
             )
         """.format(table_name=self.table_name)
         self.cur.execute(query)
+        query = """
+            CREATE TABLE IF NOT EXISTS {table_name}_CATALOG (
+                URL TEXT PRIMARY KEY,
+                ETAG TEXT,
+                LAST_MODIFIED TEXT,
+                CONTENT_HASH TEXT,
+                UPDATED_AT TEXT
+            )
+        """.format(table_name=self.table_name)
+        self.cur.execute(query)
         self.conn.commit()
     
-    def _get_info(self, tag):
-        tag2 = tag.find_all('li', {'style': re.compile('^float:left')})
-        pno = urlparse(tag2[0].a['href']).query.split('&')[1].split('=')[1]
-        name = tag2[0].text
-        model = tag2[1].text
-        price = tag2[2].text
-        return pno, name, model, price
-
-    def _get_info_wireless(self, wireless):
-        # id=make_0 인 애들 말고 하나씩 더 있어서 2개씩 중복됨(drop_duplicates 해야 함)
-        tag = self.soup.find_all('div', {'name': wireless[0]})
-        result = []
-        for i in range(len(tag)):
-            result.append([wireless[1], *self._get_info(tag[i])])
-        pno = pd.DataFrame(result, columns=['WIRELESS', 'PNO', 'MODEL', '중고시세', '증감'])
-        pno = pno[['PNO', 'MODEL', 'WIRELESS']].drop_duplicates().reset_index(drop=True)
-        return pno
+    def _load_catalog(self):
+        """
+            Description
+            -----------
+            이전에 받은 시세 메인 페이지의 ETag, Last-Modified, 본문 해시
+        """
+        
+        self.cur.execute('SELECT ETAG, LAST_MODIFIED, CONTENT_HASH FROM {table_name}_CATALOG WHERE URL = ?'.format(table_name=self.table_name), (self.url,))
+        row = self.cur.fetchone()
+        if row is None:
+            return {}, None
+        return {'etag': row[0], 'last_modified': row[1]}, row[2]
+
+    def _save_catalog(self, validators, content_hash):
+        with self.conn:
+            self.cur.execute('INSERT OR REPLACE INTO {table_name}_CATALOG (URL, ETAG, LAST_MODIFIED, CONTENT_HASH, UPDATED_AT) VALUES (?, ?, ?, ?, ?)'.format(table_name=self.table_name),
+                             (self.url, validators.get('etag'), validators.get('last_modified'), content_hash, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+    def _replace(self, df):
+        """
+            Description
+            -----------
+            단말기 목록을 받은 목록으로 교체(하나의 트랜잭션)
+            - 바뀐 단말기만 갱신하고 목록에서 사라진 단말기는 삭제
+            - 받은 목록이 비어 있으면 페이지 구조가 바뀐 것으로 보고 삭제하지 않고 예외 발생
+        """
+        
+        if df.empty:
+            raise ValueError('시세 메인 페이지에서 단말기 목록을 찾지 못했습니다. ({})'.format(self.url))
+        self.cur.execute('SELECT PNO FROM {table_name}'.format(table_name=self.table_name))
+        removed = sorted(set(row[0] for row in self.cur.fetchall()) - set(df['PNO']))
+        query, records = self._upsert_statement(df)
+        with self.conn:
+            self.cur.executemany('DELETE FROM {table_name} WHERE PNO = ?'.format(table_name=self.table_name), [(pno,) for pno in removed])
+            self.cur.executemany(query, records)
+        self.rows += len(df)
+        if removed:
+            print('목록에서 사라진 단말기를 삭제했습니다. ({:,}개)'.format(len(removed)))
 
     def run(self):
         """
+            Description
+            -----------
+            시세 메인 페이지에서 단말기 목록 수집(목록에서 사라진 단말기는 삭제)
+            - 이전 응답의 ETag/Last-Modified로 조건부 요청 → 304(변경 없음)이면 파싱/저장 생략
+            - 서버가 검증값을 주지 않아도 본문 해시가 같으면 파싱/저장 생략
+            
+            Example
+            -------
             conn = sqlite3.connect('external_data.db')
             pc = PnoCrawler(conn)
             pc.run()
         """
-        result = []
-        for wl in self.wireless.items():
-            result.append(self._get_info_wireless(wl))
-        pno = pd.concat(result)
-        pno.to_sql(name=self.table_name, con=self.conn, if_exists='replace', index=False)
+        
+        validators, last_hash = self._load_catalog()
+        content, validators = self.http.get_if_modified(self.url, validators)
+        if content is None:
+            print('단말기 목록이 변경되지 않았습니다. (304 Not Modified)')
+            return
+        content_hash = hashlib.sha1(content).hexdigest()
+        if content_hash == last_hash:
+            print('단말기 목록이 변경되지 않았습니다.')
+        else:
+            with self.metrics.timer('parse', crawler='PnoCrawler'):
+                df = parse_catalog(content, self.wireless)
+            self.metrics.count('pages', crawler='PnoCrawler')
+            self.metrics.count('rows', len(df), crawler='PnoCrawler')
+            with self.metrics.timer('write', crawler='PnoCrawler'):
+                self._replace(df)
+        self._save_catalog(validators, content_hash)
 
 
 class UsedPhonePriceCrawler(DBCrawler):
 
+    parquet_key = 'PNO'
+
     def __init__(self, conn):
         super().__init__(conn)
         self.table_name = 'CETIZEN_USED_PHONE_PRICE'
+        self.primary_key = ('BASE_DATE', 'PNO')
         self._create_table()
+        self._ensure_primary_key()
     
     def _create_table(self):
         """
@@ -126,42 +257,68 @@ class UsedPhonePriceCrawler(DBCrawler):
         self.pnos = pnos
 
     @staticmethod
-    def get_used_phone_price(pnos):
+    def _get_used_phone_price(pno):
         """
             Description
             -----------
-            크롤러 실행
-            
+            단말기 1개의 중고 시세 수집
+
+            Output
+            ------
+            (BASE_DATE, LOW, MID, HIGH) 배열
+        """
+
+        params = {'q': 'info', 'pno': pno}
+        url = 'https://market.cetizen.com/market.php'
+        content = DBCrawler.http.get(url, params)
+        with DBCrawler.metrics.timer('parse', crawler='UsedPhonePriceCrawler'):
+            return parse_price_history(content)
+
+    @staticmethod
+    def _to_frame(pnos, result):
+        """
+            Description
+            -----------
+            단말기별 (BASE_DATE, LOW, MID, HIGH) 배열을 컬럼 단위로 이어붙여 DataFrame 생성
+        """
+
+        counts = [len(data[0]) for data in result]
+        with DBCrawler.metrics.timer('transform', crawler='UsedPhonePriceCrawler'):
+            return pd.DataFrame({
+                'BASE_DATE': np.concatenate([data[0] for data in result] + [np.empty(0, dtype=object)]),
+                'PNO': np.repeat(np.array(pnos, dtype=object), counts),
+                'LOW': np.concatenate([data[1] for data in result] + [np.empty(0)]),
+                'MID': np.concatenate([data[2] for data in result] + [np.empty(0)]),
+                'HIGH': np.concatenate([data[3] for data in result] + [np.empty(0)]),
+            })
+
+    @staticmethod
+    def get_used_phone_price(pnos, workers=1):
+        """
+            Description
+            -----------
+            중고 단말기 시세 수집 프로그램(from 세티즌)
+
+            Input
+            -----
+            pnos : 단말기 코드 리스트
+            workers : 동시에 수집할 단말기 수
+
             Example
             -------
-            conn = sqlite3.connect('external_data.db')
-            uppc = UsedPhonePriceCrawler(conn)
-            uppc.set_pno(['7296', '7320', '7329'])
-            uppc.run()
+            used_phone_price = UsedPhonePriceCrawler.get_used_phone_price(['7296', '7320', '7329'], workers=8)
         """
 
+        pno_list = []
         result = []
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
-        print('[{}] 데이터 수집을 시작합니다. (pno: {}개)'.format(start_time.strftime('%Y/%m/%d %H:%M:%S'), len(pnos)))
-        for pno in pnos:
-            params = {'q': 'info', 'pno': pno}
-            url = 'https://market.cetizen.com/market.php'
-            url_params = '{}?{}'.format(url, urlencode(params))
-            html = req.urlopen(url_params).read().decode('cp949')
-            soup = BeautifulSoup(html, 'html.parser')
-            txt = soup.find_all('script', {'type': "text/javascript"})[18].text
-            start = txt.find('[')
-            end = txt.find(']')
-            txt = txt[start:end+1].replace('\r\n\t', '')\
-                .replace('date', '"date"').replace('mid', '"mid"').replace('high', '"high"').replace('low', '"low"')
-            data = eval(txt)
-            for dt in data:
-                result.append((dt['date'], pno, dt['low'], dt['mid'], dt['high']))
-        used_phone_price = pd.DataFrame(result, columns=['BASE_DATE', 'PNO', 'LOW', 'MID', 'HIGH']).reset_index(drop=True)
-        used_phone_price[['LOW', 'MID', 'HIGH']] = used_phone_price[['LOW', 'MID', 'HIGH']].astype(float)
-        end_time = datetime.now()
-        print('[{}] 데이터 수집을 종료합니다. (pno: {}개, 수집시간: {}초, 데이터수: {:,}개)'.format(end_time.strftime('%Y/%m/%d %H:%M:%S'), len(pnos), (end_time-start_time).seconds, len(used_phone_price)))
+        print('[{}] 데이터 수집을 시작합니다. (pno: {}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), len(pnos)))
+        for pno, data in DBCrawler._map(UsedPhonePriceCrawler._get_used_phone_price, pnos, workers):
+            pno_list.append(pno)
+            result.append(data)
+        used_phone_price = UsedPhonePriceCrawler._to_frame(pno_list, result)
+        print('[{}] 데이터 수집을 종료합니다. (pno: {}개, 수집시간: {:.1f}초, 데이터수: {:,}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), len(pnos), time.perf_counter() - start_time, len(used_phone_price)))
         return used_phone_price
 
     def run(self):
@@ -181,5 +338,4 @@ class UsedPhonePriceCrawler(DBCrawler):
             uppc.run()
         """
 
-        used_phone_price = self.get_used_phone_price(self.pnos)
-        used_phone_price.to_sql(name=self.table_name, con=self.conn, if_exists='replace', index=False)
\ No newline at end of file
+        self._run_units(lambda pno: [(None, self._to_frame([pno], [self._get_used_phone_price(pno)]))], self.pnos)
\ No newline at end of file
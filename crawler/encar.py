@@ -1,58 +1,288 @@
 import os
+import gzip
+import json
 import time
-from glob import glob
+import queue
+import hashlib
+import threading
+from itertools import count
+from urllib.parse import quote, unquote
+import numpy as np
 import pandas as pd
-from random import random
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.support.ui import Select
-from selenium.common.exceptions import NoSuchElementException
+import requests
+from lxml import etree, html as lxml_html
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException
+from .BrowserPool import BrowserPool
 from .DBCrawler import DBCrawler
 from datetime import datetime
 
+_ROWS = etree.XPath('(//tr)[position() > 1]')
+_NAMES = {'cls': (0, 1), 'dtl': (2, 3)}
+_TEXTS = {'yer': 4, 'km': 5, 'fue': 6, 'loc': 7, 'ins': 8, 'ass': 9, 'prc_hs': 10}
+_OPTIONAL = (8, 9)
+CAR_LIST_COLUMNS = ['NAME1', 'NAME2', 'NAME3', 'NAME4', 'YER', 'KM', 'FUE', 'LOC', 'INS', 'ASS', 'PRC', 'LINK']
+HISTORY_COLUMNS = ['NAME1', 'NAME2', 'NAME3', 'NAME4', 'YEAR_MONTH', 'KM', 'FUE', 'LOC', 'INS', 'ASS', 'PRC', 'LINK']
+TABLE_COLUMNS = ['BASE_DATE', 'CODE', 'CAR_ID', 'NAME1', 'NAME2', 'NAME3', 'NAME4', 'YEAR_MONTH', 'KM', 'FUE', 'LOC', 'INS', 'ASS', 'PRC', 'LINK']
+
+def parse_car_list(content):
+    """
+        Description
+        -----------
+        목록 테이블 html에서 차량 정보를 컬럼별 리스트로 추출
+        - 행마다 하위 요소를 한 번만 순회하며 class로 컬럼을 찾음(select_one 반복 없음)
+        - span.cls/span.dtl의 strong, em → NAME1~4, span.yer/km/fue/loc/ins/ass, td.prc_hs, 첫 번째 a의 href
+        - span.ins, span.ass가 없으면 ''
+        
+        Input
+        -----
+        content : 목록 테이블 html(str 또는 bytes)
+        
+        Output
+        ------
+        {컬럼명: 값 리스트} (CAR_LIST_COLUMNS 순서)
+    """
+    
+    columns = [[] for _ in CAR_LIST_COLUMNS]
+    for row in _ROWS(lxml_html.fromstring(content)):
+        values = [None] * len(CAR_LIST_COLUMNS)
+        for el in row.iter('span', 'td', 'a'):
+            if el.tag == 'a':
+                if values[11] is None:
+                    values[11] = el.get('href')
+                continue
+            for name in el.get('class', '').split():
+                if name in _TEXTS:
+                    i = _TEXTS[name]
+                    if values[i] is None and (el.tag == 'td') == (name == 'prc_hs'):
+                        values[i] = el.text_content()
+                elif name in _NAMES and el.tag == 'span':
+                    i, j = _NAMES[name]
+                    if values[i] is None:
+                        strong, em = el.find('strong'), el.find('em')
+                        if strong is not None and em is not None:
+                            values[i], values[j] = strong.text_content(), em.text_content()
+        for i in _OPTIONAL:
+            if values[i] is None:
+                values[i] = ''
+        if None in values:
+            missing = [CAR_LIST_COLUMNS[i] for i, value in enumerate(values) if value is None]
+            raise ValueError('목록 행에서 {}을(를) 찾을 수 없습니다.'.format(', '.join(missing)))
+        for column, value in zip(columns, values):
+            column.append(value)
+    return dict(zip(CAR_LIST_COLUMNS, columns))
+
+def normalize_car_list(df):
+    """
+        Description
+        -----------
+        목록 페이지 형식의 텍스트 컬럼을 테이블 형식으로 변환(컬럼 단위 벡터 연산)
+        - LINK의 carid → CAR_ID
+        - YER('19/05식') → YEAR_MONTH(201905, 연도 두 자리가 올해+1보다 크면 1900년대)
+        - KM('30,911km') → KM(30911), PRC('8,617', '8,617만원') → PRC(8617)
+        - 숫자가 없으면 결측(NULL)
+        
+        Input
+        -----
+        df : BASE_DATE, CODE, CAR_LIST_COLUMNS 컬럼의 DataFrame
+        
+        Output
+        ------
+        TABLE_COLUMNS 컬럼의 DataFrame
+    """
+    
+    def integer(series, pattern=r'(\d[\d,]*)'):
+        digits = series.astype(str).str.extract(pattern, expand=False).str.replace(',', '', regex=False)
+        return pd.to_numeric(digits, errors='coerce').astype('Int64')
+    
+    ym = df['YER'].astype(str).str.extract(r'(\d{2})\s*/\s*(\d{2})').apply(pd.to_numeric, errors='coerce').astype('Int64')
+    century = (ym[0] > datetime.now().year % 100 + 1).map({True: 1900, False: 2000}).astype('Int64')
+    result = df.drop(columns='YER').assign(
+        CAR_ID=integer(df['LINK'], r'carid=(\d+)'),
+        YEAR_MONTH=(century + ym[0]) * 100 + ym[1],
+        KM=integer(df['KM']),
+        PRC=integer(df['PRC']),
+    )
+    return result[TABLE_COLUMNS]
+
+def row_hash(df):
+    """
+        Description
+        -----------
+        행별 변경 감지용 해시(HISTORY_COLUMNS 값의 64비트 해시, 부호 있는 정수)
+    """
+    
+    return pd.util.hash_pandas_object(df[HISTORY_COLUMNS], index=False).to_numpy().view(np.int64)
+
 class UsedCarPriceCrawler(DBCrawler):
-    def __init__(self, conn):
+
+    api_url = 'http://api.encar.com/search/car/list/general'
+
+    def __init__(self, conn, browsers=2, headless=True, mode='api'):
         super().__init__(conn)
         self.table_name = 'ENCAR_USED_CAR_PRICE'
+        self.primary_key = ('BASE_DATE', 'CAR_ID', 'CODE')
         self._create_table()
         self.url_map = {
             'benz': 'http://www.encar.com/fc/fc_carsearchlist.do?carType=for&searchType=model&TG.R=B#!%7B%22action%22%3A%22(And.Hidden.N._.(C.CarType.N._.Manufacturer.%EB%B2%A4%EC%B8%A0.))%22%2C%22toggle%22%3A%7B%7D%2C%22layer%22%3A%22%22%2C%22sort%22%3A%22ModifiedDate%22%2C%22page%22%3A1%2C%22limit%22%3A20%7D',
             'ev': 'http://www.encar.com/ev/ev_carsearchlist.do?carType=ev&searchType=model&TG.R=D#!',
             'bmw': 'http://www.encar.com/fc/fc_carsearchlist.do?carType=for&searchType=model&TG.R=B#!%7B%22action%22%3A%22(And.Hidden.N._.(C.CarType.N._.Manufacturer.BMW.))%22%2C%22toggle%22%3A%7B%7D%2C%22layer%22%3A%22%22%2C%22sort%22%3A%22ModifiedDate%22%2C%22page%22%3A1%2C%22limit%22%3A20%7D',
         }
-        self.page_max = 3
-        self.driver = webdriver.Chrome('chromedriver')
+        self.mode = mode
+        self.api_limit = 100
+        self.host = 'www.encar.com'
+        self.http.set_rate(self.host, rate=0.5 * browsers, min_rate=0.1, max_rate=1.0 * browsers, increase=0.05)
+        self.http.set_rate('api.encar.com', rate=2.0, min_rate=0.2, max_rate=10.0, increase=0.2)
+        self.pool = BrowserPool(browsers, headless)
+        self.history = False
+        self.archive = None
+        # 세그먼트별 검색 API 결과 수(Count, 마지막 응답 기준)
+        self._api_counts = {}
+        self._archive_lock = threading.Lock()
 
     def _create_table(self):
         """
             Description
             -----------
             테이블 생성
+            - 기본키: (BASE_DATE, CAR_ID, CODE)(같은 차량이 여러 세그먼트(ex. benz, ev)에 있으면 세그먼트마다 저장), 인덱스: (CODE, BASE_DATE)
+            - YEAR_MONTH(YYYYMM), KM(km), PRC(만원)는 수집 시 정수로 변환하여 저장
+            - 모든 컬럼이 TEXT인 기존 테이블은 <table_name>_LEGACY로 옮긴 뒤 변환하여 이관
         """
         
+        legacy = '{}_LEGACY'.format(self.table_name)
+        self.cur.execute('PRAGMA table_info({table_name})'.format(table_name=self.table_name))
+        columns = [row[1] for row in self.cur.fetchall()]
+        if columns and 'CAR_ID' not in columns:
+            self.cur.execute('ALTER TABLE {table_name} RENAME TO {legacy}'.format(table_name=self.table_name, legacy=legacy))
+        
         query = """
             CREATE TABLE IF NOT EXISTS {table_name} (
-                BASE_DATE TEXT,
-                CODE TEXT,
+                BASE_DATE TEXT NOT NULL,
+                CODE TEXT NOT NULL,
+                CAR_ID INTEGER NOT NULL,
                 NAME1 TEXT,
                 NAME2 TEXT,
                 NAME3 TEXT,
                 NAME4 TEXT,
-                YER TEXT,
+                YEAR_MONTH INTEGER,
+                KM INTEGER,
                 FUE TEXT,
                 LOC TEXT,
                 INS TEXT,
                 ASS TEXT,
-                PRC TEXT,
-                LINK TEXT
+                PRC INTEGER,
+                LINK TEXT,
+                PRIMARY KEY (BASE_DATE, CAR_ID, CODE)
             )
         """.format(table_name=self.table_name)
         self.cur.execute(query)
+        self.cur.execute('CREATE INDEX IF NOT EXISTS IX_{table_name}_CODE ON {table_name} (CODE, BASE_DATE)'.format(table_name=self.table_name))
+        self._create_history_table()
         self.conn.commit()
+        
+        self.cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (legacy,))
+        if self.cur.fetchone() is not None:
+            self._migrate_legacy(legacy)
+
+    def _migrate_legacy(self, legacy, chunksize=50000):
+        """
+            Description
+            -----------
+            기존(TEXT) 테이블의 데이터를 변환하여 새 테이블로 이관한 뒤 삭제
+            - rowid 순서로 chunksize행씩 저장/커밋(중단되면 다음 실행에서 이어서 이관, 같은 키는 갱신)
+            - LINK에서 차량 ID를 찾을 수 없는 행은 버림
+        """
+        
+        print('({}) 기존 테이블을 이관합니다.'.format(legacy))
+        rowid = 0
+        rows = 0
+        dropped = 0
+        while(True):
+            chunk = self._read_frame('SELECT rowid AS ROW_ID, * FROM {legacy} WHERE rowid > ? ORDER BY rowid LIMIT ?'.format(legacy=legacy), (rowid, chunksize))
+            if chunk.empty:
+                break
+            rowid = int(chunk['ROW_ID'].iloc[-1])
+            if 'KM' not in chunk:
+                chunk['KM'] = None
+            df = normalize_car_list(chunk.drop(columns='ROW_ID'))
+            valid = df['CAR_ID'].notna()
+            dropped += int((~valid).sum())
+            rows += int(valid.sum())
+            self._upsert(df[valid])
+        self.cur.execute('DROP TABLE {legacy}'.format(legacy=legacy))
+        self.conn.commit()
+        print('({}) 이관이 종료되었습니다. (이관: {:,}행, 제외: {:,}행)'.format(legacy, rows, dropped))
+
+    def _create_history_table(self):
+        """
+            Description
+            -----------
+            변경 이력 테이블 생성(set_history 참고)
+            - <table_name>_HISTORY: 차량별 값이 유지된 구간 [VALID_FROM, VALID_TO)(VALID_TO가 NULL이면 현재 등록 중)
+            - <table_name>_RUN: 세그먼트별로 끝까지 수집한 날짜
+            - <table_name>_SNAPSHOT(view): 수집한 날짜별 전체 목록을 <table_name>과 같은 컬럼으로 재구성
+        """
+        
+        fields = ''.join('\n                {} {},'.format(column, 'INTEGER' if column in ('YEAR_MONTH', 'KM', 'PRC') else 'TEXT') for column in HISTORY_COLUMNS)
+        query = """
+            CREATE TABLE IF NOT EXISTS {table_name}_HISTORY (
+                CODE TEXT NOT NULL,
+                CAR_ID INTEGER NOT NULL,
+                VALID_FROM TEXT NOT NULL,
+                VALID_TO TEXT,
+                ROW_HASH INTEGER NOT NULL,{fields}
+                PRIMARY KEY (CODE, CAR_ID, VALID_FROM)
+            )
+        """.format(table_name=self.table_name, fields=fields)
+        self.cur.execute(query)
+        self.cur.execute('CREATE INDEX IF NOT EXISTS IX_{table_name}_HISTORY_OPEN ON {table_name}_HISTORY (CODE, VALID_TO)'.format(table_name=self.table_name))
+        self.cur.execute('CREATE TABLE IF NOT EXISTS {table_name}_RUN (CODE TEXT NOT NULL, BASE_DATE TEXT NOT NULL, PRIMARY KEY (CODE, BASE_DATE))'.format(table_name=self.table_name))
+        query = """
+            CREATE VIEW IF NOT EXISTS {table_name}_SNAPSHOT AS
+            SELECT R.BASE_DATE, H.CODE, H.CAR_ID, {columns}
+            FROM {table_name}_RUN R
+            JOIN {table_name}_HISTORY H
+              ON H.CODE = R.CODE
+             AND H.VALID_FROM <= R.BASE_DATE
+             AND (H.VALID_TO IS NULL OR H.VALID_TO > R.BASE_DATE)
+        """.format(table_name=self.table_name, columns=', '.join('H.' + column for column in HISTORY_COLUMNS))
+        self.cur.execute(query)
 
     def set_code(self, codes):
         self.codes = codes
 
+    def set_history(self, history=True):
+        '''
+            Description:
+                변경 이력 모드 설정
+                - 날짜별 전체 목록(<table_name>) 대신 직전 상태와 비교하여 신규/변경/삭제된 차량만 <table_name>_HISTORY에 저장
+                - 값 비교는 차량 ID별 해시(row_hash), 변경 시 이전 행의 VALID_TO를 수집일로 닫고 새 행 추가
+                - 세그먼트를 끝까지 수집한 뒤에만 목록에서 사라진 차량을 닫음(수집 결과가 비어 있으면 닫지 않음)
+                - 검색 API로 수집했으면 수집한 차량 수가 검색 결과 수(Count) 이상일 때만 닫음
+                  (수집 중 수정되어 이미 받은 페이지로 옮겨간 차량을 삭제로 보지 않도록, 이때는 수집일도 기록하지 않음)
+                - 브라우저 수집 중 오류가 나면 세그먼트가 실패하므로 닫지 않음
+                - 특정일 전체 목록: SELECT * FROM <table_name>_SNAPSHOT WHERE CODE = 'benz' AND BASE_DATE = '2021-03-02'
+
+            Example:
+                ucpc.set_history()
+                ucpc.build_history()  # 기존 날짜별 목록을 이력으로 변환(선택)
+                ucpc.run()
+        '''
+
+        self.history = history
+
+    def set_mode(self, mode):
+        '''
+            Description:
+                수집 방식 설정
+                - 'api': 검색 API(JSON)를 직접 호출(검색 조건이 url에 없거나 API 호출이 실패하면 브라우저로 수집)
+                - 'browser': 브라우저로 목록 페이지를 열어서 수집
+        '''
+
+        self.mode = mode
+
     def run(self):
         """
             Description
@@ -62,106 +292,532 @@ class UsedCarPriceCrawler(DBCrawler):
             Example
             -------
             conn = sqlite3.connect('external_data.db')
-            ucpc = UsedCarPriceCrawler(conn)
+            ucpc = UsedCarPriceCrawler(conn, browsers=4)
             ucpc.set_code(['benz', 'ev', 'bmw'])
+            ucpc.set_workers(2)
             ucpc.run()
         """
 
-        for code in self.codes:
-            self._get_source(code)
-            df = self._parse(code)
-            df.to_sql(name=self.table_name, con=self.conn, if_exists='replace', index=False)
+        def crawl(code):
+            self._api_counts.pop(code, None)
+            if self.mode == 'api' and self._search(code) is not None:
+                page = None
+                try:
+                    for page, df in self._iter_api(code):
+                        yield page, df
+                    return
+                except (requests.RequestException, ValueError, KeyError) as e:
+                    if page is not None:
+                        raise
+                    print('({}) API 수집에 실패하여 브라우저로 수집합니다. ({!r})'.format(code, e))
+            yield from self._iter_browser(code)
 
-    def _get_source(self, code):
+        def write(code, df, checkpoint, first):
+            clear = {'BASE_DATE': df['BASE_DATE'].iloc[0], 'CODE': code} if first else None
+            self._upsert(df, clear=clear, checkpoint=checkpoint)
+
+        states = {}
+
+        def write_history(code, df, checkpoint, first):
+            if first:
+                states[code] = self._open_history(code, df['BASE_DATE'].iloc[0])
+            self._write_history(states[code], df, checkpoint)
+
+        def finish_history(code):
+            state = states.pop(code, None) or self._open_history(code, datetime.now().strftime('%Y-%m-%d'))
+            state['expected'] = self._api_counts.pop(code, None)
+            self._close_history(state)
+
+        try:
+            if self.history:
+                self._run_units(crawl, self.codes, write_history, finish_history)
+            else:
+                self._run_units(crawl, self.codes, write)
+        finally:
+            self.close()
+
+    def build_history(self, codes=None):
+        '''
+            Description:
+                <table_name>에 저장된 날짜별 전체 목록을 날짜 순서대로 비교하여 변경 이력으로 변환
+                (이미 이력에 반영된 날짜는 건너뜀, 날짜별 목록은 삭제하지 않음)
+        '''
+
+        if codes is None:
+            self.cur.execute('SELECT DISTINCT CODE FROM {table_name}'.format(table_name=self.table_name))
+            codes = [row[0] for row in self.cur.fetchall()]
+        for code in codes:
+            self.cur.execute('SELECT MAX(BASE_DATE) FROM {table_name}_RUN WHERE CODE = ?'.format(table_name=self.table_name), (code,))
+            last_date = self.cur.fetchone()[0] or ''
+            self.cur.execute('SELECT DISTINCT BASE_DATE FROM {table_name} WHERE CODE = ? AND BASE_DATE > ? ORDER BY BASE_DATE'.format(table_name=self.table_name), (code, last_date))
+            for (base_date,) in self.cur.fetchall():
+                df = self._read_frame('SELECT {columns} FROM {table_name} WHERE CODE = ? AND BASE_DATE = ?'.format(columns=', '.join(TABLE_COLUMNS), table_name=self.table_name), (code, base_date))
+                for column in ('YEAR_MONTH', 'KM', 'PRC'):
+                    df[column] = df[column].astype('Int64')
+                state = self._open_history(code, base_date)
+                self._write_history(state, df)
+                self._close_history(state)
+                print('({}) {} 이력 변환 (신규/변경: {:,}건, 삭제: {:,}건)'.format(code, base_date, state['written'], state['closed']))
+
+    def _open_history(self, code, base_date):
+        '''
+            Description:
+                세그먼트의 현재 등록 중인 차량(ID → 해시)을 읽어 비교 상태 생성
+        '''
+
+        self.cur.execute('SELECT CAR_ID, ROW_HASH FROM {table_name}_HISTORY WHERE CODE = ? AND VALID_TO IS NULL'.format(table_name=self.table_name), (code,))
+        return {'code': code, 'base_date': base_date, 'current': dict(self.cur.fetchall()), 'seen': set(), 'expected': None, 'written': 0, 'closed': 0}
+
+    def _write_history(self, state, df, checkpoint=None):
+        '''
+            Description:
+                수집한 차량 중 신규이거나 해시가 바뀐 차량만 이력에 저장(하나의 트랜잭션)
+                - 바뀐 차량은 현재 행의 VALID_TO를 수집일로 닫고 새 행 추가
+                - 같은 날 다시 수집하면 그날 추가한 행을 갱신
+        '''
+
+        df = df.drop_duplicates('CAR_ID', keep='last')
+        hashes = row_hash(df)
+        current = state['current']
+        car_ids = df['CAR_ID'].tolist()
+        previous = [current.get(car_id) for car_id in car_ids]
+        write = np.array([old != new for old, new in zip(previous, hashes.tolist())], dtype=bool)
+        closed = [car_id for car_id, old, changed in zip(car_ids, previous, write) if changed and old is not None]
+        state['seen'].update(car_ids)
+        current.update(zip(car_ids, hashes.tolist()))
+
+        rows = df.loc[write, ['CODE', 'CAR_ID'] + HISTORY_COLUMNS]
+        rows.insert(2, 'VALID_FROM', state['base_date'])
+        rows.insert(3, 'VALID_TO', None)
+        rows.insert(4, 'ROW_HASH', hashes[write])
+        query, records = self._upsert_statement(rows, '{}_HISTORY'.format(self.table_name), ('CODE', 'CAR_ID', 'VALID_FROM'))
+        with self.conn:
+            self.cur.executemany('UPDATE {table_name}_HISTORY SET VALID_TO = ? WHERE CODE = ? AND CAR_ID = ? AND VALID_TO IS NULL AND VALID_FROM < ?'.format(table_name=self.table_name),
+                                 [(state['base_date'], state['code'], car_id, state['base_date']) for car_id in closed])
+            self.cur.executemany(query, records)
+            if checkpoint:
+                self._save_checkpoint(**checkpoint)
+        state['written'] += len(rows)
+        self.rows += len(rows)
+
+    def _close_history(self, state):
+        '''
+            Description:
+                세그먼트를 끝까지 수집한 뒤 목록에서 사라진 차량의 VALID_TO를 수집일로 닫고 수집일 기록
+                (수집한 차량 수가 expected(검색 결과 수)보다 적으면 전체 목록이라고 볼 수 없으므로 건너뜀)
+        '''
+
+        if not state['seen']:
+            print('({}) 수집된 차량이 없어 삭제 처리를 건너뜁니다.'.format(state['code']))
+            return
+        if state['expected'] is not None and len(state['seen']) < state['expected']:
+            print('({}) 수집된 차량 수({:,}개)가 검색 결과 수({:,}개)보다 적어 삭제 처리를 건너뜁니다.'.format(state['code'], len(state['seen']), state['expected']))
+            return
+        delisted = [car_id for car_id in state['current'] if car_id not in state['seen']]
+        with self.conn:
+            self.cur.executemany('UPDATE {table_name}_HISTORY SET VALID_TO = ? WHERE CODE = ? AND CAR_ID = ? AND VALID_TO IS NULL'.format(table_name=self.table_name),
+                                 [(state['base_date'], state['code'], car_id) for car_id in delisted])
+            self.cur.execute('INSERT OR IGNORE INTO {table_name}_RUN (CODE, BASE_DATE) VALUES (?, ?)'.format(table_name=self.table_name), (state['code'], state['base_date']))
+        for car_id in delisted:
+            del state['current'][car_id]
+        state['closed'] += len(delisted)
+
+    def close(self):
+        '''
+            Description:
+                브라우저 종료
+        '''
+
+        self.pool.close()
+
+    def _search(self, code):
+        '''
+            Description:
+                url_map의 #! 뒤에 있는 검색 조건(action, sort, page, limit 등)
+                검색 조건이 없는 세그먼트는 None
+        '''
+
+        fragment = self.url_map[code].partition('#!')[2]
+        return json.loads(unquote(fragment)) if fragment else None
+
+    def _page_url(self, code, page, limit=50):
+        '''
+            Description:
+                url_map의 검색 조건에서 page, limit만 바꾼 url
+                검색 조건이 없는 세그먼트는 None
+        '''
+
+        search = self._search(code)
+        if search is None:
+            return None
+        search.update(page=page, limit=limit)
+        return '{}#!{}'.format(self.url_map[code].partition('#!')[0], quote(json.dumps(search, ensure_ascii=False, separators=(',', ':')), safe='()'))
+
+    def _iter_api(self, code):
+        '''
+            Description:
+                검색 조건(action, sort)으로 검색 API를 직접 호출 → api_limit건씩 끝까지 수집
+
+            Output:
+                (페이지, DataFrame) generator
+        '''
+
+        search = self._search(code)
+        headers = {'Referer': self.url_map[code].partition('#!')[0]}
+        offset = 0
+        while(True):
+            params = {'count': 'true', 'q': search['action'], 'sr': '|{}|{}|{}'.format(search.get('sort', 'ModifiedDate'), offset, self.api_limit)}
+            content = self.http.get(self.api_url, params, headers)
+            with self.metrics.timer('parse', crawler='UsedCarPriceCrawler'):
+                data = json.loads(content)
+            cars = data['SearchResults']
+            self._api_counts[code] = data['Count']
+            if cars:
+                with self.metrics.timer('transform', crawler='UsedCarPriceCrawler'):
+                    df = self._parse_api(code, cars)
+                yield offset // self.api_limit + 1, df
+            offset += self.api_limit
+            if not cars or offset >= data['Count']:
+                break
+
+    @staticmethod
+    def _parse_api(code, cars):
+        '''
+            Description:
+                검색 API 결과(SearchResults)를 테이블 컬럼으로 변환(Year, Mileage, Price는 그대로 정수로 저장)
+        '''
+
+        def text(key):
+            return np.array([car.get(key) or '' for car in cars], dtype=object)
+
+        def integer(key):
+            return pd.array([int(car[key]) if car.get(key) else None for car in cars], dtype='Int64')
+
+        return pd.DataFrame({
+            'BASE_DATE': datetime.now().strftime('%Y-%m-%d'),
+            'CODE': code,
+            'CAR_ID': [int(car['Id']) for car in cars],
+            'NAME1': text('Manufacturer'),
+            'NAME2': text('Model'),
+            'NAME3': text('Badge'),
+            'NAME4': text('BadgeDetail'),
+            'YEAR_MONTH': integer('Year'),
+            'KM': integer('Mileage'),
+            'FUE': text('FuelType'),
+            'LOC': text('OfficeCityState'),
+            'INS': ['보험이력' if 'Record' in (car.get('Condition') or []) else '' for car in cars],
+            'ASS': ['성능점검' if 'Inspection' in (car.get('Condition') or []) else '' for car in cars],
+            'PRC': integer('Price'),
+            'LINK': ['http://www.encar.com/dc/dc_cardetailview.do?carid={}'.format(car['Id']) for car in cars],
+        })
+
+    def _get_source(self, code, emit, stop=None):
         '''
             Description:
                 주어진 url로 접근 → 일반등록 차량에 있는 데이터를 html 형태로 수집
+                검색 조건이 url에 있는 세그먼트는 브라우저 풀의 여러 브라우저가 페이지를 나눠서 수집
                 
             Input:
-                code - 저장할 폴더명
+                code - 수집할 세그먼트
+                emit - 페이지를 받을 함수 emit(page, html)
+                stop - 설정되면 다음 페이지를 열지 않고 중단(threading.Event)
                 
             Output:
-                temp 폴더에 결과 저장
+                수집한 목록 테이블 html을 페이지마다 emit으로 전달(파일로 저장하지 않음)
             
             Example:
-                get_source('benz')
+                get_source('benz', print)
         '''
         
-        # 폴더 생성
-        if not any([s == 'temp' for s in os.listdir('.')]): os.mkdir('temp')
-        if not any([s == code for s in os.listdir('temp')]): os.mkdir('temp/{}'.format(code))
-        
+        print('({}) 수집을 시작합니다.'.format(code))
+        stop = stop or threading.Event()
+        if self._page_url(code, 1) is None:
+            with self.pool.driver() as driver:
+                self._get_source_by_click(driver, code, emit, stop)
+            return
+
+        pages = count(1)
+        lock = threading.Lock()
+        end = threading.Event()
+        errors = []
+
+        def work():
+            try:
+                with self.pool.driver() as driver:
+                    while not end.is_set() and not stop.is_set():
+                        with lock:
+                            page = next(pages)
+                        if not self._load_page(driver, self._page_url(code, page)):
+                            end.set()
+                            break
+                        emit(page, self._page_source(driver))
+            except Exception as e:
+                errors.append(e)
+                end.set()
+
+        threads = [threading.Thread(target=work) for _ in range(self.pool.size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        print('({}) 수집을 {}합니다.'.format(code, '중단' if stop.is_set() else '종료'))
+
+    def _get_source_by_click(self, driver, code, emit, stop):
+        '''
+            Description:
+                검색 조건이 url에 없는 세그먼트: 첫 페이지 접근 → 50개씩 보기 → 페이지 번호를 차례로 클릭하며 수집(stop이 설정되면 중단)
+        '''
+
         # 접속하기
-        print('({}) 첫 페이지에 접근합니다.'.format(code))
-        self.driver.get(self.url_map[code])
+        limiter = self.http.limiter(self.host)
+        limiter.acquire()
+        driver.get(self.url_map[code])
 
-        # [20개씩 보기] → [50개씩 보기]로 변환
-        viewer = Select(self.driver.find_element_by_css_selector('select#pagerow'))
-        time.sleep(1)
+        # [20개씩 보기] → [50개씩 보기]로 변환(목록이 다시 그려질 때까지 최대 10초 대기)
+        viewer = Select(WebDriverWait(driver, 10).until(lambda driver: driver.find_element(By.CSS_SELECTOR, 'select#pagerow')))
+        limiter.acquire()
         viewer.select_by_value('50')
-        time.sleep(10)
+        try:
+            WebDriverWait(driver, 10).until(lambda driver: len(driver.find_elements(By.CSS_SELECTOR, 'tbody#sr_normal > tr')) > 20)
+        except TimeoutException:
+            pass
 
         # 수집하기
         page = 1
-        print('수집을 시작합니다.')
-        while(True):
-            if(page > self.page_max):
-                print('수집을 종료합니다. (페이지 지정치 도달)')
+        while not stop.is_set():
+            emit(page, self._page_source(driver))
+            if stop.is_set():
+                print('({}) 수집을 중단합니다.'.format(code))
                 break
-            with open('temp/{}/carlist_{}_{:04d}.html'.format(code, code, page), 'w', -1, encoding='utf-8') as f:
-                soup = BeautifulSoup(self.driver.find_element_by_xpath('//tbody[@id="sr_normal"]/ancestor::table').get_attribute('outerHTML'), 'lxml')
-                html = str(soup)
-                f.write(html)
+            limiter.acquire()
             try:
-                self.driver.find_element_by_css_selector('div#pagination').find_element_by_xpath('//a[@data-page="{}"]'.format(page+1)).click()
+                self._click_page(driver, page+1)
             except NoSuchElementException:
-                print('수집을 종료합니다. (NoSuchElementException)')
+                print('({}) 수집을 종료합니다. (NoSuchElementException)'.format(code))
                 break
             page += 1
-            time.sleep(1+2*random())
+
+    def _load_page(self, driver, url, retries=3):
+        '''
+            Description:
+                페이지 url로 이동 → 목록이 바뀔 때까지 대기(실패 시 속도를 낮춰 재시도)
+
+            Output:
+                목록에 차량이 있으면 True, 마지막 페이지를 지나 목록이 비었으면 False
+                (재시도 후에도 실패하고 목록이 비어 있지 않으면 마지막 예외를 다시 발생 → 세그먼트 수집 실패)
+        '''
+
+        limiter = self.http.limiter(self.host)
+        for attempt in range(retries + 1):
+            try:
+                changed = self._table_changed(driver.find_element(By.CSS_SELECTOR, 'tbody#sr_normal'))
+            except NoSuchElementException:
+                changed = lambda driver: len(driver.find_elements(By.CSS_SELECTOR, 'tbody#sr_normal')) > 0
+            limiter.acquire()
+            try:
+                with self.metrics.timer('fetch', host=self.host):
+                    driver.get(url)
+                    WebDriverWait(driver, 30).until(changed)
+                limiter.success()
+                return len(driver.find_elements(By.CSS_SELECTOR, 'tbody#sr_normal > tr')) > 0
+            except (TimeoutException, WebDriverException):
+                limiter.backoff()
+                if attempt == retries:
+                    if self._empty_list(driver):
+                        return False
+                    raise
+                self.metrics.count('retries', host=self.host)
+                time.sleep(min(self.http.backoff_max, self.http.backoff * 2 ** attempt))
+
+    @staticmethod
+    def _empty_list(driver):
+        '''
+            Description:
+                현재 페이지에 목록(tbody#sr_normal)이 있고 차량이 없는지(브라우저 오류로 확인할 수 없으면 False)
+        '''
+
+        try:
+            return (len(driver.find_elements(By.CSS_SELECTOR, 'tbody#sr_normal')) > 0
+                    and len(driver.find_elements(By.CSS_SELECTOR, 'tbody#sr_normal > tr')) == 0)
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def _page_source(driver):
+        '''
+            Description:
+                현재 목록 테이블의 html
+        '''
+
+        return driver.find_element(By.XPATH, '//tbody[@id="sr_normal"]/ancestor::table').get_attribute('outerHTML')
+
+    def _click_page(self, driver, page, retries=3):
+        '''
+            Description:
+                페이지 번호 클릭 → 목록이 바뀔 때까지 대기(실패 시 속도를 낮춰 재시도)
+        '''
+
+        limiter = self.http.limiter(self.host)
+        for attempt in range(retries + 1):
+            try:
+                changed = self._table_changed(driver.find_element(By.CSS_SELECTOR, 'tbody#sr_normal'))
+                with self.metrics.timer('fetch', host=self.host):
+                    driver.find_element(By.CSS_SELECTOR, 'div#pagination').find_element(By.XPATH, '//a[@data-page="{}"]'.format(page)).click()
+                    WebDriverWait(driver, 30).until(changed)
+                limiter.success()
+                return
+            except NoSuchElementException:
+                raise
+            except (TimeoutException, WebDriverException):
+                limiter.backoff()
+                if attempt == retries:
+                    raise
+                self.metrics.count('retries', host=self.host)
+                time.sleep(min(self.http.backoff_max, self.http.backoff * 2 ** attempt))
         
-    def _parse(self, code):
+    @staticmethod
+    def _table_changed(tbody):
+        '''
+            Description:
+                WebDriverWait 조건: 목록(tbody#sr_normal)이 교체되었거나 내용이 바뀌었는지
+        '''
+
+        html = tbody.get_attribute('outerHTML')
+        def condition(driver):
+            try:
+                return tbody.get_attribute('outerHTML') != html
+            except StaleElementReferenceException:
+                return True
+        return condition
+
+    def _iter_browser(self, code):
+        '''
+            Description:
+                브라우저 수집과 파싱을 겹쳐서 진행
+                - 수집 스레드가 페이지 html을 크기가 제한된 큐(queue_size)에 넣으면 현재 스레드가 바로 파싱하여 내보냄
+                - archive가 설정되어 있으면 파싱 전에 원본 html을 보관
+                - 여러 브라우저가 페이지를 나눠 수집하므로 도착 순서가 페이지 순서와 다를 수 있음(진행 페이지는 기록하지 않음)
+                - generator가 닫히면(파싱/저장 실패, 수집 중단) 브라우저는 다음 페이지를 열지 않고 종료
+
+            Output:
+                (None, DataFrame)을 페이지마다 내보내는 generator
+        '''
+
+        pages = queue.Queue(maxsize=self.queue_size)
+        closed = threading.Event()
+        end = object()
+
+        def put(item):
+            while not closed.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def fetch():
+            try:
+                self._get_source(code, lambda page, html: put((page, html)), closed)
+            except Exception as e:
+                put((None, e))
+            else:
+                put((None, end))
+
+        base_date = datetime.now().strftime('%Y-%m-%d')
+        thread = threading.Thread(target=fetch, daemon=True)
+        thread.start()
+        try:
+            while True:
+                page, html = pages.get()
+                if html is end:
+                    break
+                if isinstance(html, Exception):
+                    raise html
+                if self.archive is not None:
+                    self._archive_page(base_date, code, page, html)
+                yield None, self._parse_page(code, html, base_date)
+        finally:
+            closed.set()
+            thread.join()
+
+    def set_archive(self, path):
+        '''
+            Description:
+                수집한 목록 html을 압축하여 보관(재파싱/재현용, None이면 보관하지 않음)
+                - html은 내용의 sha1으로 <path>/<sha1[:2]>/<sha1>.html.gz에 한 번만 저장(같은 페이지는 중복 저장하지 않음)
+                - <path>/index.tsv에 BASE_DATE, CODE, 페이지, sha1을 한 줄씩 기록
+        '''
+
+        self.archive = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def _archive_page(self, base_date, code, page, html):
+        data = html.encode('utf-8')
+        digest = hashlib.sha1(data).hexdigest()
+        path = os.path.join(self.archive, digest[:2], digest + '.html.gz')
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with gzip.open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        with self._archive_lock:
+            with open(os.path.join(self.archive, 'index.tsv'), 'a', encoding='utf-8') as f:
+                f.write('{}\t{}\t{}\t{}\n'.format(base_date, code, page, digest))
+
+    def iter_archive(self, code, base_date=None):
+        '''
+            Description:
+                보관한 목록 html을 다시 파싱(브라우저 없이 재현)
+
+            Input:
+                code - 세그먼트
+                base_date - 수집일(YYYY-MM-DD, 기본값: 보관된 마지막 수집일)
+
+            Output:
+                (페이지, DataFrame)을 페이지 순서대로 내보내는 generator
+
+            Example:
+                ucpc.set_archive('archive/encar')
+                df = pd.concat(df for page, df in ucpc.iter_archive('benz', '2021-03-02'))
+        '''
+
+        entries = {}
+        with open(os.path.join(self.archive, 'index.tsv'), 'r', encoding='utf-8') as f:
+            for line in f:
+                date, unit, page, digest = line.rstrip('\n').split('\t')
+                if unit == code:
+                    entries.setdefault(date, {})[int(page)] = digest
+        if not entries:
+            return
+        if base_date is None:
+            base_date = max(entries)
+        for page, digest in sorted(entries.get(base_date, {}).items()):
+            with gzip.open(os.path.join(self.archive, digest[:2], digest + '.html.gz'), 'rb') as f:
+                html = f.read().decode('utf-8')
+            yield page, self._parse_page(code, html, base_date)
+
+    @staticmethod
+    def _parse_page(code, html, base_date):
         '''
             Description:
-                get_source를 통해 수집된 html파일에서 데이터를 추출하여 xlsx 형태로 저장
+                목록 테이블 html 한 페이지에서 데이터를 추출
                 
             Input:
-                code - get_source를 통해 저장한 폴더명
+                code - 세그먼트
+                html - 목록 테이블 html
+                base_date - 수집일(YYYY-MM-DD)
                 
             Output:
-                temp 폴더에 결과 저장
+                DataFrame
         '''
         
-        print('({}) 파싱을 시작합니다.'.format(code))
-        result = []
-        files = glob('temp/{}/*.html'.format(code))
-        for file in files:
-            with open(file, 'r', -1, encoding='utf-8') as f:
-                html = f.read()
-            soup = BeautifulSoup(html, 'lxml')
-            carlist_batch = soup.select('tr')[1:]
-            result_batch = []
-            for car in carlist_batch:
-                name1 = car.select_one('span.cls > strong').text
-                name2 = car.select_one('span.cls > em').text
-                name3 = car.select_one('span.dtl > strong').text
-                name4 = car.select_one('span.dtl > em').text
-                yer = car.select_one('span.yer').text
-                km = car.select_one('span.km').text
-                fue = car.select_one('span.fue').text
-                loc = car.select_one('span.loc').text
-                ins = '' if car.select_one('span.ins') == None else car.select_one('span.ins').text
-                ass = '' if car.select_one('span.ass') == None else car.select_one('span.ass').text
-                prc = car.select_one('td.prc_hs').text
-                link = car.select_one('a').attrs['href']
-                result_batch.append((name1, name2, name3, name4, yer, km, fue, loc, ins, ass, prc, link))
-            column_name = ['NAME1', 'NAME2', 'NAME3', 'NAME4', 'YER', 'KM', 'FUE', 'LOC', 'INS', 'ASS', 'PRC', 'LINK']
-            df = pd.DataFrame(result_batch, columns=column_name)
-            result.append(df)
-        df = pd.concat(result).reset_index(drop=True)
-        df.insert(0, 'BASE_DATE', datetime.now().strftime('%Y-%m-%d'))
-        df.insert(1, 'CODE', code)
-        df['LINK'] = 'http://www.encar.com' + df['LINK']
-        print('파싱이 종료되었습니다.')
-
-        return df
\ No newline at end of file
+        with DBCrawler.metrics.timer('parse', crawler='UsedCarPriceCrawler'):
+            df = pd.DataFrame(parse_car_list(html))
+        with DBCrawler.metrics.timer('transform', crawler='UsedCarPriceCrawler'):
+            df.insert(0, 'BASE_DATE', base_date)
+            df.insert(1, 'CODE', code)
+            df['LINK'] = 'http://www.encar.com' + df['LINK']
+            return normalize_car_list(df)
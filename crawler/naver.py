@@ -0,0 +1,87 @@
+import re
+import numpy as np
+from lxml import etree, html
+
+"""
+    Description
+    -----------
+    네이버 일별 시세 페이지 파서
+"""
+
+_ROWS = etree.XPath('(//table)[1]//tr[td[2]]')
+_DATE = re.compile(r'^\d{4}\.\d{2}\.\d{2}$')
+_PAGER_CURRENT = etree.XPath('//table[contains(@class, "Nnavi")]//td[@class="on"]//a/@href')
+_PAGER_LAST = etree.XPath('//table[contains(@class, "Nnavi")]//td[@class="pgRR"]//a/@href')
+_PAGE = re.compile(r'[?&]page=(\d+)')
+
+def parse_daily_quote(content, column=1):
+    """
+        Description
+        -----------
+        일별 시세 페이지의 첫 번째 테이블에서 날짜, 값(종가) 컬럼만 추출
+        
+        Input
+        -----
+        content : 페이지 html(bytes)
+        column : 값 컬럼 위치(날짜 = 0, 기본값: 1)
+        
+        Output
+        ------
+        (날짜 배열(YYYY.MM.DD), 종가 배열(float64))
+        
+        Example
+        -------
+        dates, prices = parse_daily_quote(DBCrawler.http.get('https://finance.naver.com/item/sise_day.nhn?code=005830&page=1'))
+    """
+    
+    dates = []
+    prices = []
+    for row in _ROWS(html.fromstring(content)):
+        cells = row.findall('td')
+        date = cells[0].text_content().strip()
+        if _DATE.match(date) is None:
+            continue
+        dates.append(date)
+        prices.append(float(cells[column].text_content().strip().replace(',', '')))
+    return np.array(dates, dtype='U10'), np.array(prices, dtype=np.float64)
+
+def to_iso_date(dates):
+    """
+        Description
+        -----------
+        YYYY.MM.DD 배열을 YYYY-MM-DD 배열로 변환(문자 단위 벡터 연산, 행별 strptime 없음)
+        
+        Example
+        -------
+        to_iso_date(np.array(['2020.05.15'], dtype='U10'))  # array(['2020-05-15'])
+    """
+    
+    dates = np.array(dates, dtype='U10')
+    chars = dates.view('U1').reshape(-1, 10)
+    chars[:, [4, 7]] = '-'
+    return dates
+
+def parse_pager(content):
+    """
+        Description
+        -----------
+        일별 시세 페이지 하단 페이지 링크(table.Nnavi)에서 현재 페이지와 마지막 페이지([맨뒤] 링크) 추출
+        
+        Output
+        ------
+        (현재 페이지, 마지막 페이지), 링크가 없으면 None
+        
+        Example
+        -------
+        current, last = parse_pager(DBCrawler.http.get('https://finance.naver.com/item/sise_day.nhn?code=005830&page=1'))
+    """
+    
+    def page(links):
+        for link in links:
+            match = _PAGE.search(link)
+            if match is not None:
+                return int(match.group(1))
+        return None
+    
+    tree = html.fromstring(content)
+    return page(_PAGER_CURRENT(tree)), page(_PAGER_LAST(tree))
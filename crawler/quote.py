@@ -0,0 +1,360 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pandas as pd
+from .DBCrawler import DBCrawler
+from .naver import parse_daily_quote, parse_pager, to_iso_date
+
+"""
+    Description
+    -----------
+    페이지 단위 일별 시세(네이버 금융 주가, 시장지표) 수집 엔진
+    - 수집 대상은 QuoteSource(URL 템플릿, 테이블, 값 컬럼)로만 정의하고 수집/중단/파싱/저장은 QuoteCrawler가 처리
+    - 새 지표는 SOURCES에 QuoteSource를 추가하거나 QuoteCrawler(conn, QuoteSource(...))로 바로 사용
+    - 전체 수집(증분 아님)은 마지막 페이지를 먼저 찾고 남은 페이지를 동시에 받아 순서대로 처리(prefetch)
+"""
+
+class QuoteSource:
+    """
+        Description
+        -----------
+        일별 시세 소스 정의
+
+        Input
+        -----
+        name : 소스 이름(ex. stock, fx)
+        url : 페이지 URL 템플릿({code}, {page})
+        table_name : 저장 테이블
+        column : 값 컬럼명(ex. PRICE, RATE)
+        value_index : 페이지 테이블에서 값 컬럼 위치(날짜 = 0)
+        codes : 코드 예시 {코드: 설명}
+        description : 값 설명
+
+        Example
+        -------
+        source = QuoteSource('silver', 'https://finance.naver.com/marketindex/worldDailyQuote.nhn?marketindexCd={code}&fdtc=2&page={page}',
+                             'SILVER_PRICE', codes={'CMDT_SI': '은'})
+    """
+
+    def __init__(self, name, url, table_name, column='PRICE', value_index=1, codes=None, description=''):
+        self.name = name
+        self.url = url
+        self.table_name = table_name
+        self.column = column
+        self.value_index = value_index
+        self.codes = codes or {}
+        self.description = description
+
+    def page_url(self, code, page):
+        return self.url.format(code=code, page=page)
+
+    def __repr__(self):
+        return 'QuoteSource({!r}, table_name={!r}, column={!r})'.format(self.name, self.table_name, self.column)
+
+SOURCES = {source.name: source for source in [
+    QuoteSource('stock', 'https://finance.naver.com/item/sise_day.nhn?code={code}&page={page}', 'STOCK_PRICE', 'PRICE',
+                codes={'005830': 'DB손해보험', '005930': '삼성전자', '105560': 'KB금융'}, description='일별 주가(종가)'),
+    QuoteSource('oil', 'https://finance.naver.com/marketindex/worldDailyQuote.nhn?marketindexCd={code}&fdtc=2&page={page}', 'OIL_PRICE', 'PRICE',
+                codes={'OIL_CL': 'WTI', 'OIL_DU': '두바이유', 'OIL_BRT': '브렌트유'}, description='일별 유가(종가)'),
+    QuoteSource('fx', 'https://finance.naver.com/marketindex/exchangeDailyQuote.nhn?marketindexCd={code}&page={page}', 'EXCHANGE_RATE', 'RATE',
+                codes={'FX_USDKRW': '원/달러', 'FX_JPYKRW': '원/엔', 'FX_CNYKRW': '원/위안'}, description='일별 환율(매매기준율)'),
+    QuoteSource('gold', 'https://finance.naver.com/marketindex/goldDailyQuote.nhn?marketindexCd={code}&page={page}', 'GOLD_PRICE', 'PRICE',
+                codes={'CMDT_GD': '국내 금(원/g)'}, description='일별 국내 금 시세(매매기준)'),
+    QuoteSource('rate', 'https://finance.naver.com/marketindex/interestDailyQuote.nhn?marketindexCd={code}&page={page}', 'INTEREST_RATE', 'RATE',
+                codes={'IRR_CD91': 'CD(91일)', 'IRR_CALL': '콜금리', 'IRR_GOVT03Y': '국고채(3년)', 'IRR_CORP03Y': '회사채(3년)'}, description='일별 금리'),
+    QuoteSource('commodity', 'https://finance.naver.com/marketindex/worldDailyQuote.nhn?marketindexCd={code}&fdtc=2&page={page}', 'COMMODITY_PRICE', 'PRICE',
+                codes={'CMDT_GC': '국제 금', 'CMDT_SI': '은', 'CMDT_PDL': '팔라듐', 'CMDT_CDY': '구리'}, description='일별 국제 원자재 가격(종가)'),
+]}
+
+def find_last_page(source, code, start_page, content, max_page=2 ** 16):
+    """
+        Description
+        -----------
+        마지막 페이지 찾기
+        - 첫 페이지의 [맨뒤] 링크(주가 페이지)가 있으면 그 번호
+        - 없으면 start_page부터 2배씩 늘려가며 범위를 넘는 페이지를 찾은 뒤 이진 탐색
+          (페이지의 가장 과거 날짜는 마지막 페이지까지 계속 과거로 가고, 범위를 넘으면 행이 없거나 마지막 페이지가 반복됨)
+        
+        Input
+        -----
+        content : start_page의 html
+        max_page : 탐색할 최대 페이지
+        
+        Output
+        ------
+        (마지막 페이지, 탐색 중 받은 마지막 페이지 이하의 페이지 {페이지: html})
+    """
+    
+    current, last = parse_pager(content)
+    if last is not None:
+        return last, {}
+    
+    probed = {}
+    
+    def oldest(page, content=None):
+        # 범위를 넘은 페이지(행이 없거나 현재 페이지 번호가 다름)는 None
+        if content is None:
+            content = DBCrawler.http.get(source.page_url(code, page))
+        dates, values = parse_daily_quote(content, source.value_index)
+        current, last = parse_pager(content)
+        if len(dates) == 0 or (current is not None and current != page):
+            return None
+        probed[page] = content
+        return min(dates)
+    
+    # 2배씩 늘려가며 탐색 : 행이 없는 페이지(마지막 페이지 이후) 또는 직전 탐색 페이지와 같은 페이지(둘 다 마지막 페이지 이후)가 나올 때까지
+    previous, low, key = start_page - 1, start_page, oldest(start_page, content)
+    high = low * 2
+    while True:
+        high_key = oldest(high)
+        if high_key is None or high_key == key or high >= max_page:
+            break
+        previous, low, key = low, high, high_key
+        high *= 2
+    repeated = None
+    if high_key is not None and high_key == key:
+        # 같은 페이지 반복 : low부터 마지막 페이지 이후이므로 (previous, low]에서 처음 반복되는 페이지가 마지막 페이지
+        repeated = key
+        low, high = previous, low
+    
+    def before_last(page):
+        key = oldest(page)
+        return key is not None and key != repeated
+    
+    # before_last가 low에서 참, high에서 거짓인 경계 탐색
+    while high - low > 1:
+        middle = (low + high) // 2
+        if before_last(middle):
+            low = middle
+        else:
+            high = middle
+    last = high if repeated is not None else low
+    return last, {page: content for page, content in probed.items() if page <= last}
+
+def _page_contents(source, code, start_page=1, prefetch=1):
+    """
+        Description
+        -----------
+        (페이지, html)을 페이지 순서대로 내보내는 generator(끝을 판단하지 않으므로 소비하는 쪽에서 중단)
+        - prefetch > 1이면 마지막 페이지를 찾고 start_page 다음부터 마지막 페이지까지 prefetch개씩 동시에 요청
+          (호스트별 속도 제한, 동시 요청 수 제한은 HttpClient가 적용)
+        - 그 뒤는 한 페이지씩 요청(마지막 페이지를 적게 찾았거나 수집 중 페이지가 늘어난 경우)
+    """
+    
+    page = start_page
+    if prefetch > 1:
+        content = DBCrawler.http.get(source.page_url(code, page))
+        yield page, content
+        page += 1
+        last, probed = find_last_page(source, code, start_page, content)
+        if last >= page:
+            executor = ThreadPoolExecutor(max_workers=prefetch)
+            pending = deque()
+            try:
+                while pending or page <= last:
+                    while page <= last and len(pending) < prefetch * 2:
+                        content = probed.pop(page, None)
+                        pending.append((page, content if content is not None else executor.submit(DBCrawler.http.get, source.page_url(code, page))))
+                        page += 1
+                    fetched, content = pending.popleft()
+                    yield fetched, content if isinstance(content, bytes) else content.result()
+            finally:
+                # 받지 않은 페이지 요청은 취소(shutdown(cancel_futures=True)는 Python 3.9부터 지원)
+                for _, content in pending:
+                    if not isinstance(content, bytes):
+                        content.cancel()
+                executor.shutdown(wait=True)
+    while True:
+        yield page, DBCrawler.http.get(source.page_url(code, page))
+        page += 1
+
+def iter_quote_pages(source, code, last_date=None, start_page=1, name=None, prefetch=1):
+    """
+        Description
+        -----------
+        일별 시세를 페이지 단위로 수집하는 generator(최신 → 과거 순)
+        - 각 페이지에서 이전 페이지의 가장 과거 날짜보다 과거인 행만 사용
+          (수집 중 새 날짜가 추가되어 밀린 행, 마지막 페이지를 넘어 같은 페이지가 반복되는 경우 제외)
+        - 더 과거인 행이 없으면 종료
+
+        Input
+        -----
+        source : QuoteSource
+        code : 코드
+        last_date : 증분 수집 기준일자(YYYY-MM-DD, 해당 일자 이후 데이터만 수집)
+        start_page : 시작 페이지
+        name : 메트릭에 기록할 크롤러 이름(기본값: 소스 이름)
+        prefetch : 전체 수집(last_date 없음)일 때 동시에 받을 페이지 수(_page_contents 참고, 증분 수집은 1~2페이지이므로 한 페이지씩)
+
+        Output
+        ------
+        (페이지, 해당 페이지 데이터)
+
+        Example
+        -------
+        for page, data in iter_quote_pages(SOURCES['fx'], 'FX_JPYKRW'):
+            print(page, len(data))
+    """
+
+    name = name or source.name
+    oldest = None
+    stop_date = None if last_date is None else last_date.replace('-', '.')
+    contents = _page_contents(source, code, start_page, prefetch if last_date is None else 1)
+    try:
+        for page, content in contents:
+            with DBCrawler.metrics.timer('parse', crawler=name):
+                dates, values = parse_daily_quote(content, source.value_index)
+            if oldest is not None:
+                older = dates < oldest
+                dates = dates[older]
+                values = values[older]
+            if len(dates) == 0:
+                break
+            oldest = min(dates)
+            end = False
+            if stop_date is not None:
+                new = dates > stop_date
+                if not new.all():
+                    dates = dates[new]
+                    values = values[new]
+                    end = True
+            with DBCrawler.metrics.timer('transform', crawler=name):
+                df = pd.DataFrame({'BASE_DATE': to_iso_date(dates), 'CODE': code, source.column: values})
+            yield page, df
+            if end:
+                break
+    finally:
+        contents.close()
+
+def get_quotes(source, code, last_date=None, name=None):
+    """
+        Description
+        -----------
+        코드 하나의 일별 시세 전체(또는 last_date 이후) 수집
+
+        Example
+        -------
+        exchange_rate_jpykrw = get_quotes(SOURCES['fx'], 'FX_JPYKRW')
+    """
+
+    start_time = time.perf_counter()
+    print('[{}] 데이터 수집을 시작합니다. (code: {})'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), code))
+    result = [data for page, data in iter_quote_pages(source, code, last_date, name=name)]
+    quotes = pd.concat(result, ignore_index=True) if result else pd.DataFrame(columns=['BASE_DATE', 'CODE', source.column])
+    print('[{}] 데이터 수집을 종료합니다. (code: {}, 수집시간: {:.1f}초, 데이터수: {:,}개)'.format(datetime.now().strftime('%Y/%m/%d %H:%M:%S'), code, time.perf_counter() - start_time, len(quotes)))
+    return quotes
+
+class QuoteCrawler(DBCrawler):
+    """
+        Description
+        -----------
+        QuoteSource 하나를 수집하는 크롤러
+
+        Example
+        -------
+        conn = sqlite3.connect('external_data.db')
+        qc = QuoteCrawler(conn, 'rate')
+        qc.set_code(['IRR_CD91', 'IRR_GOVT03Y'])
+        qc.set_incremental()
+        qc.run()
+    """
+
+    parquet_key = 'CODE'
+
+    def __init__(self, conn, source):
+        """
+            Input
+            -----
+            source : SOURCES의 이름 또는 QuoteSource
+        """
+
+        super().__init__(conn)
+        self.source = SOURCES[source] if isinstance(source, str) else source
+        self.table_name = self.source.table_name
+        self.primary_key = ('CODE', 'BASE_DATE')
+        self.codes = []
+        self.prefetch = 4
+        self._create_table()
+        self._ensure_primary_key()
+
+    @property
+    def name(self):
+        # 소스별로 체크포인트를 구분(기존 크롤러 클래스는 클래스명 그대로)
+        if type(self) is QuoteCrawler:
+            return 'QuoteCrawler.{}'.format(self.source.name)
+        return type(self).__name__
+
+    def _create_table(self):
+        """
+            Description
+            -----------
+            테이블 생성
+        """
+
+        query = """
+            CREATE TABLE IF NOT EXISTS {table_name} (
+                BASE_DATE TEXT,
+                CODE TEXT,
+                {column} NUMBER,
+                PRIMARY KEY (CODE, BASE_DATE)
+            )
+        """.format(table_name=self.table_name, column=self.source.column)
+        self.cur.execute(query)
+        self.conn.commit()
+
+    def set_code(self, codes):
+        """
+            Description
+            -----------
+            수집할 코드들 설정(코드 예시: self.source.codes)
+
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            qc = QuoteCrawler(conn, 'commodity')
+            qc.set_code(['CMDT_GC', 'CMDT_SI'])
+        """
+
+        self.codes = codes
+
+    def set_prefetch(self, prefetch):
+        """
+            Description
+            -----------
+            코드 하나를 전체 수집할 때 동시에 받을 페이지 수 설정(기본값: 4, 1이면 한 페이지씩)
+            - 마지막 페이지를 먼저 찾은 뒤 나머지 페이지를 동시에 요청하고 페이지 순서대로 저장
+            - 실제 동시 요청 수는 호스트별 속도 제한, max_in_flight를 넘지 않음
+
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            spc = StockPriceCrawler(conn)
+            spc.set_code(['005930'])
+            spc.set_prefetch(8)
+            spc.set_workers(1, max_in_flight=8)
+            spc.run()
+        """
+
+        self.prefetch = prefetch
+
+    def iter_pages(self, code, last_date=None, start_page=1):
+        return iter_quote_pages(self.source, code, last_date, start_page, self.name, self.prefetch)
+
+    def run(self):
+        """
+            Description
+            -----------
+            크롤러 실행
+
+            Example
+            -------
+            conn = sqlite3.connect('external_data.db')
+            qc = QuoteCrawler(conn, 'gold')
+            qc.set_code(['CMDT_GD'])
+            qc.run()
+        """
+
+        checkpoint = self._load_checkpoint()
+        starts = {code: self._resume_point(code, checkpoint.get(code)) for code in self.codes}
+        self._run_units(lambda code: self.iter_pages(code, starts[code][1], starts[code][0]), self.codes)
@@ -0,0 +1,103 @@
+import os
+import sys
+import pytest
+from requests import Response
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import FixtureServer
+from crawler.DBCrawler import DBCrawler
+
+"""
+    Description
+    -----------
+    테스트 공통 설정(모든 요청은 benchmarks.fixtures의 로컬 서버로 보냄, 네트워크 사용 없음)
+"""
+
+class PagesAdapter(HTTPAdapter):
+    """
+        Description
+        -----------
+        Pages의 응답을 소켓 없이 같은 프로세스에서 돌려주는 requests 어댑터(요청 수만 집계)
+        - pages.response(url)는 (상태코드, 본문) 또는 (상태코드, 본문, 헤더)
+    """
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+        self.requests = 0
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        response = Response()
+        response.status_code, response._content, *headers = self.pages.response(request.url)
+        response.headers = CaseInsensitiveDict(*headers)
+        response.url = request.url
+        response.request = request
+        return response
+
+    def reset(self):
+        self.requests = 0
+
+@pytest.fixture
+def serve():
+    """
+        Description
+        -----------
+        serve(pages)로 로컬 서버를 띄우고 공유 HTTP 클라이언트를 그 서버로 연결(테스트가 끝나면 종료, 캐시 해제)
+
+        Example
+        -------
+        def test_stock(serve):
+            server = serve(Pages(days=30))
+    """
+
+    servers = []
+
+    def start(pages, recorded=None):
+        server = FixtureServer(pages, recorded)
+        servers.append(server)
+        server.install(DBCrawler.http)
+        for host in ('finance.naver.com', 'price.cetizen.com', 'market.cetizen.com', 'api.encar.com', 'www.encar.com'):
+            DBCrawler.http.set_rate(host, rate=1e9, max_rate=1e9, burst=1000)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+    if DBCrawler.http.cache is not None:
+        DBCrawler.http.cache.close()
+        DBCrawler.http.set_cache(None)
+
+@pytest.fixture
+def respond():
+    """
+        Description
+        -----------
+        respond(pages)로 공유 HTTP 클라이언트가 소켓 없이 Pages의 응답을 받도록 설정(요청이 많은 테스트용, 테스트가 끝나면 원래 어댑터로 복구)
+
+        Example
+        -------
+        def test_last_page(respond):
+            adapter = respond(Pages(days=30))
+    """
+
+    session = DBCrawler.http.session
+    adapters, trust_env = dict(session.adapters), session.trust_env
+
+    def start(pages):
+        # 프록시 환경변수는 쓰지 않으므로 요청마다 읽지 않음
+        session.trust_env = False
+        adapter = PagesAdapter(pages)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        for host in ('finance.naver.com', 'price.cetizen.com', 'market.cetizen.com', 'api.encar.com', 'www.encar.com'):
+            DBCrawler.http.set_rate(host, rate=1e9, max_rate=1e9, burst=1000)
+        return adapter
+
+    yield start
+    for prefix, adapter in adapters.items():
+        session.mount(prefix, adapter)
+    session.trust_env = trust_env
@@ -0,0 +1,30 @@
+import sqlite3
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.cetizen import PnoCrawler
+from crawler.ResponseCache import CacheMiss
+
+def test_catalog_is_recorded_and_replayed_offline(serve, tmp_path):
+    cache = str(tmp_path / 'http_cache.db')
+    server = serve(Pages(pnos=20))
+    online = PnoCrawler(sqlite3.connect(str(tmp_path / 'online.db')))
+    online.set_cache(cache)
+    online.run()
+    assert server.requests == 1
+    assert sqlite3.connect(cache).execute('SELECT COUNT(*) FROM RESPONSE_CACHE').fetchone()[0] == 1
+
+    server.reset()
+    conn = sqlite3.connect(str(tmp_path / 'offline.db'))
+    offline = PnoCrawler(conn)
+    offline.set_cache(cache, offline=True)
+    offline.run()
+    assert server.requests == 0
+    assert conn.execute('SELECT COUNT(*) FROM CETIZEN_PNO').fetchone()[0] == 20
+
+def test_offline_catalog_miss_raises(serve, tmp_path):
+    server = serve(Pages(pnos=20))
+    pc = PnoCrawler(sqlite3.connect(str(tmp_path / 'db.sqlite')))
+    pc.set_cache(str(tmp_path / 'empty_cache.db'), offline=True)
+    with pytest.raises(CacheMiss):
+        pc.run()
+    assert server.requests == 0
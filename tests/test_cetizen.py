@@ -0,0 +1,100 @@
+import re
+import sqlite3
+import pandas as pd
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.cetizen import PnoCrawler, parse_price_history
+
+PAGE = Pages(phone_days=5).price_history('7296')
+
+def test_price_history():
+    dates, low, mid, high = parse_price_history(PAGE)
+    assert list(dates) == ['2020-05-17', '2020-05-16', '2020-05-15', '2020-05-14', '2020-05-13']
+    assert list(low) == [107296, 107297, 107298, 107299, 107300]
+    assert list(mid) == [157296] * 5 and list(high) == [200000] * 5
+
+def test_reordered_and_quoted_keys():
+    page = re.sub(rb'\{date:("[^"]*"),low:(\d+),mid:(\d+),high:(\d+)\}', rb"{'high':\4,'mid':\3,'date':\1,'low':\2}", PAGE)
+    assert page != PAGE
+    assert [list(values) for values in parse_price_history(page)] == [list(values) for values in parse_price_history(PAGE)]
+
+def test_page_without_price_data_is_empty():
+    page = re.sub(rb'var chart = \[.*?\];', b'var chart = [];', PAGE, flags=re.S)
+    assert all(len(values) == 0 for values in parse_price_history(page))
+
+@pytest.mark.parametrize('old, new', [
+    (b'var chart = [', b'var chart = new Array('),  # 배열 형식 변경
+    (b',low:', b',lo:'),                           # 키 이름 변경
+])
+def test_unparsed_price_data_raises(old, new):
+    with pytest.raises(ValueError):
+        parse_price_history(PAGE.replace(old, new))
+
+class Catalog(Pages):
+    """
+        Description
+        -----------
+        시세 메인 페이지의 단말기 목록(renamed : {번호: 바뀐 모델명})
+    """
+
+    def __init__(self, pnos, renamed=None):
+        super().__init__(pnos=pnos)
+        self.renamed = renamed or {}
+
+    def catalog(self):
+        content = super().catalog()
+        for i, model in self.renamed.items():
+            content = content.replace('>모델{}<'.format(i).encode('cp949'), '>{}<'.format(model).encode('cp949'))
+        return content
+
+def catalog_rows(conn):
+    return conn.execute('SELECT PNO, MODEL, WIRELESS FROM CETIZEN_PNO ORDER BY PNO').fetchall()
+
+def test_catalog_drops_removed_handsets(respond, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    respond(Catalog(30))
+    PnoCrawler(conn).run()
+    rows = catalog_rows(conn)
+    assert len(rows) == 30
+
+    respond(Catalog(25, {3: '모델3 5G'}))
+    pc = PnoCrawler(conn)
+    pc.run()
+    assert pc.rows == 25
+    expected = [(pno, '모델3 5G' if pno == '7003' else model, wireless) for pno, model, wireless in rows[:25]]
+    assert catalog_rows(conn) == expected
+
+def test_empty_catalog_keeps_handsets(respond, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    respond(Catalog(30))
+    PnoCrawler(conn).run()
+    respond(Catalog(0))
+    with pytest.raises(ValueError):
+        PnoCrawler(conn).run()
+    assert len(catalog_rows(conn)) == 30
+
+def test_upsert_writes_only_changed_rows(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    pc = PnoCrawler(conn)
+    df = pd.DataFrame({'PNO': ['1', '2', '3'], 'MODEL': ['A', 'B', None], 'WIRELESS': 'S'})
+    pc._upsert(df)
+    changes = conn.total_changes
+    pc._upsert(df)
+    assert conn.total_changes == changes
+
+    # 2: 값 변경, 3: NULL → 값, 4: 추가, 1: 변경 없음
+    pc._upsert(pd.DataFrame({'PNO': ['1', '2', '3', '4'], 'MODEL': ['A', 'B2', 'C', 'D'], 'WIRELESS': 'S'}))
+    assert conn.total_changes - changes == 3
+    assert catalog_rows(conn) == [('1', 'A', 'S'), ('2', 'B2', 'S'), ('3', 'C', 'S'), ('4', 'D', 'S')]
+
+def test_primary_key_is_restored_on_legacy_table(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    # to_sql(if_exists='replace')로 만들어진 이전 테이블(기본키 없음)
+    pd.DataFrame({'PNO': ['1', '2'], 'MODEL': ['A', 'B'], 'WIRELESS': 'S'}).to_sql('CETIZEN_PNO', conn, index=False)
+    pc = PnoCrawler(conn)
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'index' AND name = 'PK_CETIZEN_PNO'").fetchone()[0] == 1
+
+    pc._upsert(pd.DataFrame({'PNO': ['2', '3'], 'MODEL': ['B2', 'C'], 'WIRELESS': 'S'}))
+    assert catalog_rows(conn) == [('1', 'A', 'S'), ('2', 'B2', 'S'), ('3', 'C', 'S')]
+    PnoCrawler(conn)
+    assert catalog_rows(conn) == [('1', 'A', 'S'), ('2', 'B2', 'S'), ('3', 'C', 'S')]
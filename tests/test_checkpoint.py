@@ -0,0 +1,67 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.DBWriter import DBWriter
+from crawler.StockPriceCrawler import StockPriceCrawler
+
+class Nightly(Pages):
+    """
+        Description
+        -----------
+        last_day까지의 일별 시세(상장폐지된 코드 999999는 404)
+    """
+
+    def __init__(self, last_day, days=30):
+        super().__init__(days=days)
+        self.days = [(last_day - timedelta(d)).strftime('%Y.%m.%d') for d in range(days)]
+
+    def response(self, url):
+        if 'code=999999' in url:
+            return 404, b''
+        return super().response(url)
+
+def test_persistent_failure_does_not_starve_other_units(serve, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    spc = StockPriceCrawler(conn)
+    spc.set_code(['005930', '999999'])
+    spc.set_incremental()
+    for night in range(3):
+        day = date(2020, 5, 20) + timedelta(night)
+        serve(Nightly(day))
+        spc.set_run_date(day.strftime('%Y-%m-%d'))
+        with pytest.raises(RuntimeError):
+            spc.run()
+        last_date = conn.execute("SELECT MAX(BASE_DATE) FROM STOCK_PRICE WHERE CODE = '005930'").fetchone()[0]
+        assert last_date == day.strftime('%Y-%m-%d')
+    assert conn.execute("SELECT COUNT(*) FROM STOCK_PRICE WHERE CODE = '005930'").fetchone()[0] == 32
+
+def test_same_day_rerun_skips_done_units(serve, tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    spc = StockPriceCrawler(conn)
+    spc.set_code(['005930', '999999'])
+    spc.set_run_date('2020-05-20')
+    server = serve(Nightly(date(2020, 5, 20)))
+    with pytest.raises(RuntimeError):
+        spc.run()
+    server.reset()
+    with pytest.raises(RuntimeError):
+        spc.run()
+    assert server.requests == 1
+
+def test_checkpoint_table_migrates_under_shared_writer(tmp_path):
+    path = str(tmp_path / 'db.sqlite')
+    old = sqlite3.connect(path)
+    old.execute('CREATE TABLE CRAWLER_CHECKPOINT (CRAWLER TEXT, CODE TEXT, LAST_PAGE INTEGER, LAST_DATE TEXT, STATUS TEXT, UPDATED_AT TEXT, PRIMARY KEY (CRAWLER, CODE))')
+    old.execute("INSERT INTO CRAWLER_CHECKPOINT VALUES ('StockPriceCrawler', '005930', NULL, NULL, 'done', '2020-05-19 23:00:00')")
+    old.commit()
+    old.close()
+
+    writer = DBWriter(path)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        crawlers = list(executor.map(lambda _: StockPriceCrawler(writer.connect()), range(4)))
+    assert crawlers[0]._load_checkpoint('done', '2020-05-20') == {}
+    writer.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT RUN_DATE FROM CRAWLER_CHECKPOINT WHERE CODE = '005930'").fetchone() == (None,)
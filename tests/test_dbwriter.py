@@ -0,0 +1,62 @@
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+import pytest
+from crawler.DBWriter import DBWriter
+
+INSERT = 'INSERT INTO T (ID) VALUES (?)'
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = DBWriter(str(tmp_path / 'db.sqlite'))
+    with writer.connect() as conn:
+        conn.execute('CREATE TABLE T (ID INTEGER PRIMARY KEY)')
+    yield writer
+    writer.close()
+
+def ids(writer):
+    return [row[0] for row in writer.connect().execute('SELECT ID FROM T ORDER BY ID').fetchall()]
+
+def test_failed_job_rolls_back_alone_in_group_commit(writer):
+    batch = [
+        ([(INSERT, [(1,), (2,)], True)], Future()),
+        # 3은 저장된 뒤 기본키 충돌로 실패 → 이 작업만 되돌림
+        ([(INSERT, (3,), False), (INSERT, (1,), False)], Future()),
+        ([(INSERT, (4,), False)], Future()),
+    ]
+    commits = writer.commits
+    writer._commit(batch)
+    assert writer.commits == commits + 1
+    assert batch[0][1].result() == 2
+    assert isinstance(batch[1][1].exception(), sqlite3.IntegrityError)
+    assert batch[2][1].result() == 1
+    assert ids(writer) == [1, 2, 4]
+
+def test_commit_raises_writer_error(writer):
+    conn = writer.connect()
+    with pytest.raises(sqlite3.IntegrityError):
+        with conn:
+            conn.execute(INSERT, (1,))
+            conn.execute(INSERT, (1,))
+    assert ids(writer) == []
+
+    # 실패한 쿼리는 버려지고 다음 트랜잭션은 정상 저장
+    with conn:
+        conn.execute(INSERT, (1,))
+    assert ids(writer) == [1]
+    assert conn.rows == 1
+
+def test_concurrent_commits_fail_independently(writer):
+    conn = writer.connect()
+
+    def job(i):
+        with conn:
+            conn.executemany(INSERT, [(i * 10 + n,) for n in range(5)])
+            if i == 3:
+                conn.execute(INSERT, (0,))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(job, i) for i in range(8)]
+    errors = [i for i, future in enumerate(futures) if future.exception() is not None]
+    assert errors == [3]
+    assert isinstance(futures[3].exception(), sqlite3.IntegrityError)
+    assert ids(writer) == sorted(i * 10 + n for i in range(8) if i != 3 for n in range(5))
@@ -0,0 +1,41 @@
+import shutil
+import sqlite3
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.BrowserPool import BrowserPool
+from crawler.encar import UsedCarPriceCrawler
+
+pytestmark = pytest.mark.skipif(shutil.which('chromedriver') is None, reason='chromedriver가 없습니다.')
+
+def crawler_for(server, tmp_path, mode='browser'):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    ucpc = UsedCarPriceCrawler(conn, browsers=2, mode=mode)
+    ucpc.url_map = {code: url.replace('http://www.encar.com', server.base) for code, url in ucpc.url_map.items()}
+    ucpc.http.set_rate(ucpc.host, rate=1e9, max_rate=1e9, burst=1000)
+    return conn, ucpc
+
+def test_pool_loads_fixture_page(serve):
+    server = serve(Pages(cars=30))
+    with BrowserPool(1) as pool:
+        with pool.driver() as driver:
+            driver.get(server.base + '/ev/ev_carsearchlist.do')
+            assert UsedCarPriceCrawler._page_source(driver).count('<tr>') == 21
+
+@pytest.mark.parametrize('code', ['benz', 'ev'])
+def test_browser_crawl(serve, tmp_path, code):
+    server = serve(Pages(cars=230))
+    conn, ucpc = crawler_for(server, tmp_path)
+    ucpc.set_code([code])
+    ucpc.run()
+    assert conn.execute('SELECT COUNT(DISTINCT CAR_ID) FROM ENCAR_USED_CAR_PRICE WHERE CODE = ?', (code,)).fetchone()[0] == 230
+
+def test_api_failure_falls_back_to_browser(serve, tmp_path):
+    class NoApi(Pages):
+        def car_search(self, offset, limit):
+            return b'not json'
+
+    server = serve(NoApi(cars=120))
+    conn, ucpc = crawler_for(server, tmp_path, mode='api')
+    ucpc.set_code(['benz'])
+    ucpc.run()
+    assert conn.execute('SELECT COUNT(DISTINCT CAR_ID) FROM ENCAR_USED_CAR_PRICE').fetchone()[0] == 120
@@ -0,0 +1,35 @@
+import sqlite3
+from contextlib import contextmanager
+from benchmarks.fixtures import Pages
+from crawler.encar import UsedCarPriceCrawler
+
+class FakePool:
+    """
+        Description
+        -----------
+        브라우저 대신 빈 객체를 빌려주는 풀(페이지 이동/읽기는 크롤러 메서드를 바꿔서 흉내냄)
+    """
+
+    size = 2
+
+    @contextmanager
+    def driver(self):
+        yield object()
+
+    def close(self):
+        pass
+
+def test_closing_browser_iterator_stops_page_loads(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    ucpc = UsedCarPriceCrawler(conn, mode='browser')
+    ucpc.pool = FakePool()
+    ucpc.queue_size = 4
+    loaded = []
+    table = Pages(cars=50).car_list(1)
+    ucpc._load_page = lambda driver, url: loaded.append(url) or len(loaded) < 10000
+    ucpc._page_source = lambda driver: table
+
+    pages = ucpc._iter_browser('benz')
+    next(pages)
+    pages.close()
+    assert len(loaded) < ucpc.queue_size + 2 * FakePool.size + 2
@@ -0,0 +1,126 @@
+import sqlite3
+import datetime as dt
+import random
+from benchmarks.fixtures import Pages
+from crawler import encar
+from crawler.encar import TABLE_COLUMNS, UsedCarPriceCrawler
+
+DAYS = ['2021-03-01', '2021-03-02', '2021-03-03']
+
+class Listing(Pages):
+    """
+        Description
+        -----------
+        검색 API가 listing(차량 ID → 차량 정보)의 차량을 ID 순서대로 반환
+    """
+
+    def __init__(self, cars=250):
+        super().__init__(cars=cars)
+        self.listing = {i: Pages.car(self, i) for i in range(cars)}
+        self.next_id = cars
+
+    def next_day(self, rnd):
+        sample = rnd.sample(sorted(self.listing), 50)
+        for i in sample[:30]:
+            self.listing[i] = dict(self.listing[i], Price=self.listing[i]['Price'] - 10)
+        for i in sample[30:]:
+            del self.listing[i]
+        for _ in range(25):
+            self.listing[self.next_id] = Pages.car(self, self.next_id)
+            self.next_id += 1
+
+    def car_search(self, offset, limit):
+        ids = sorted(self.listing)
+        self.cars = len(ids)
+        return super().car_search(offset, limit)
+
+    def car(self, i):
+        return self.listing[sorted(self.listing)[i]]
+
+class Shifting(Listing):
+    """
+        Description
+        -----------
+        두 번째 페이지를 요청할 때 그 페이지의 첫 차량이 수정되어 첫 페이지로 옮겨감(최근 수정순 정렬) → 수집에서 빠짐
+    """
+
+    moved = None
+
+    def car_search(self, offset, limit):
+        if offset == limit:
+            self.moved = sorted(self.listing)[offset]
+        return super().car_search(offset, limit)
+
+    def car(self, i):
+        ids = sorted(self.listing)
+        if self.moved is not None:
+            ids.remove(self.moved)
+            ids.insert(0, self.moved)
+        return self.listing[ids[i]]
+
+def on_day(monkeypatch, day):
+    class Today(dt.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.strptime(day, '%Y-%m-%d')
+    monkeypatch.setattr(encar, 'datetime', Today)
+
+def select(conn, table, day):
+    query = 'SELECT {} FROM {} WHERE CODE = ? AND BASE_DATE = ? ORDER BY CAR_ID'.format(', '.join(TABLE_COLUMNS), table)
+    return conn.execute(query, ('benz', day)).fetchall()
+
+def crawl(conn, day, history):
+    ucpc = UsedCarPriceCrawler(conn)
+    ucpc.set_code(['benz'])
+    ucpc.set_history(history)
+    ucpc.set_run_date(day)
+    ucpc.http.set_rate('api.encar.com', rate=1e9, max_rate=1e9, burst=1000)
+    ucpc.run()
+
+def history_rows(conn):
+    return conn.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE_HISTORY').fetchone()[0]
+
+def test_snapshot_view_matches_daily_tables(serve, monkeypatch):
+    pages = Listing()
+    history, daily = sqlite3.connect(':memory:'), sqlite3.connect(':memory:')
+    rnd = random.Random(16)
+    for n, day in enumerate(DAYS):
+        if n:
+            pages.next_day(rnd)
+        serve(pages)
+        on_day(monkeypatch, day)
+        crawl(history, day, True)
+        crawl(daily, day, False)
+    assert history_rows(history) == 250 + 2 * (30 + 25)
+
+    # 같은 날 다시 수집(완료 기록을 지워 끝까지 다시 수집) → 이력이 늘지 않음
+    history.execute('DELETE FROM CRAWLER_CHECKPOINT')
+    history.commit()
+    crawl(history, DAYS[-1], True)
+    assert history_rows(history) == 250 + 2 * (30 + 25)
+
+    for n, day in enumerate(DAYS):
+        expected = select(daily, 'ENCAR_USED_CAR_PRICE', day)
+        assert len(expected) == 250 + 5 * n
+        assert select(history, 'ENCAR_USED_CAR_PRICE_SNAPSHOT', day) == expected
+    assert history.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE').fetchone()[0] == 0
+
+def test_listing_moved_during_crawl_is_not_delisted(serve, monkeypatch):
+    history = sqlite3.connect(':memory:')
+    serve(Listing())
+    on_day(monkeypatch, DAYS[0])
+    crawl(history, DAYS[0], True)
+
+    pages = Shifting()
+    serve(pages)
+    on_day(monkeypatch, DAYS[1])
+    crawl(history, DAYS[1], True)
+    assert pages.moved is not None
+    assert history.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE_HISTORY WHERE VALID_TO IS NOT NULL').fetchone()[0] == 0
+    # 전체 목록이 아니므로 그날의 SNAPSHOT은 만들지 않음
+    assert history.execute('SELECT BASE_DATE FROM ENCAR_USED_CAR_PRICE_RUN').fetchall() == [(DAYS[0],)]
+
+    serve(Listing())
+    on_day(monkeypatch, DAYS[2])
+    crawl(history, DAYS[2], True)
+    assert len(select(history, 'ENCAR_USED_CAR_PRICE_SNAPSHOT', DAYS[2])) == 250
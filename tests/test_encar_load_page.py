@@ -0,0 +1,96 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+from urllib.parse import unquote
+import pytest
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from benchmarks.fixtures import Pages
+from crawler.encar import UsedCarPriceCrawler
+
+class FakeElement:
+
+    def __init__(self, driver, html):
+        self.driver = driver
+        self.html = html
+
+    def get_attribute(self, name):
+        return self.driver.html if self.html is None else self.html
+
+class FakeDriver:
+    """
+        Description
+        -----------
+        목록 페이지(url의 #! 검색 조건 page)를 Pages.car_list로 보여주는 브라우저(fail 페이지는 항상 WebDriverException)
+    """
+
+    def __init__(self, pages, fail):
+        self.pages = pages
+        self.fail = fail
+        self.html = None
+
+    def get(self, url):
+        page = json.loads(unquote(url.partition('#!')[2]))['page']
+        if page in self.fail:
+            raise WebDriverException('page {} crashed'.format(page))
+        self.html = self.pages.car_list(page)
+
+    def find_element(self, by, value):
+        if self.html is None:
+            raise NoSuchElementException('no page')
+        return FakeElement(self, None if value == 'tbody#sr_normal' else self.html)
+
+    def find_elements(self, by, value):
+        if self.html is None:
+            return []
+        if value == 'tbody#sr_normal':
+            return [FakeElement(self, None)]
+        tbody = self.html.partition('<tbody id="sr_normal">')[2]
+        return [None] * tbody.count('<tr>')
+
+class FakePool:
+
+    size = 2
+
+    def __init__(self, pages, fail=()):
+        self.pages = pages
+        self.fail = set(fail)
+
+    @contextmanager
+    def driver(self):
+        yield FakeDriver(self.pages, self.fail)
+
+    def close(self):
+        pass
+
+def crawl(tmp_path, monkeypatch, fail=()):
+    conn = sqlite3.connect(str(tmp_path / 'db.sqlite'))
+    ucpc = UsedCarPriceCrawler(conn, mode='browser')
+    ucpc.pool = FakePool(Pages(cars=230), fail)
+    ucpc.set_code(['benz'])
+    ucpc.set_run_date('2021-03-01')
+    ucpc.http.set_rate(ucpc.host, rate=1e9, max_rate=1e9, burst=1000)
+    monkeypatch.setattr(ucpc.http, 'backoff', 0)
+    return conn, ucpc
+
+def test_segment_ends_at_empty_page(tmp_path, monkeypatch):
+    conn, ucpc = crawl(tmp_path, monkeypatch)
+    ucpc.run()
+    assert conn.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE').fetchone()[0] == 230
+
+def test_failing_page_fails_the_unit(tmp_path, monkeypatch):
+    conn, ucpc = crawl(tmp_path, monkeypatch, fail=[3])
+    with pytest.raises(RuntimeError, match='benz'):
+        ucpc.run()
+    assert ucpc._load_checkpoint() == {'benz': (None, None, 'failed')}
+    assert conn.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE').fetchone()[0] == 0
+
+def test_failed_browser_crawl_closes_no_listings(tmp_path, monkeypatch):
+    conn, ucpc = crawl(tmp_path, monkeypatch)
+    ucpc.set_history()
+    ucpc.run()
+    ucpc.set_run_date('2021-03-02')
+    ucpc.pool = FakePool(Pages(cars=230), fail=[2])
+    with pytest.raises(RuntimeError, match='benz'):
+        ucpc.run()
+    assert conn.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE_HISTORY WHERE VALID_TO IS NULL').fetchone()[0] == 230
+    assert conn.execute('SELECT COUNT(*) FROM ENCAR_USED_CAR_PRICE_RUN').fetchone()[0] == 1
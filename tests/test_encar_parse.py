@@ -0,0 +1,38 @@
+import pytest
+from crawler.encar import UsedCarPriceCrawler, parse_car_list
+
+pytest.importorskip('bs4')
+
+from benchmarks.encar_parse import differences, legacy_car_list, load_pages
+
+def test_fixture_pages_match_legacy_extractor():
+    pages = load_pages()
+    assert len(pages) >= 5
+    assert differences(pages) == []
+
+def test_raw_pages_match_legacy_text_exactly():
+    for name, content in load_pages().items():
+        if 'prettified' not in name:
+            assert parse_car_list(content) == legacy_car_list(content), name
+
+def test_edge_rows():
+    columns = parse_car_list(load_pages()['list_edge.html'])
+    assert columns['NAME1'] == ['BMW', '벤츠 AMG', '아우디']
+    assert columns['NAME4'] == ['', '4도어', '프리미엄']
+    assert columns['INS'] == ['', '보험이력', '']
+    assert columns['ASS'] == ['', '', '성능점검']
+    assert columns['PRC'] == ['3,450만원', '12,900만원할인', '4,100만원']
+
+def test_prettified_page_normalizes_like_raw_page():
+    pages = load_pages()
+    raw = UsedCarPriceCrawler._parse_page('benz', pages['list_1.html'], '2020-05-20')
+    prettified = UsedCarPriceCrawler._parse_page('benz', pages['list_1_prettified.html'], '2020-05-20')
+    for column in ('CAR_ID', 'YEAR_MONTH', 'KM', 'PRC'):
+        assert raw[column].tolist() == prettified[column].tolist()
+
+def test_missing_required_field_raises():
+    content = load_pages()['list_edge.html'].replace('<span class="km">52,110km</span>', '')
+    with pytest.raises(ValueError, match='KM'):
+        parse_car_list(content)
+    with pytest.raises(AttributeError):
+        legacy_car_list(content)
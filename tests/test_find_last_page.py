@@ -0,0 +1,49 @@
+import re
+from urllib.parse import parse_qs, urlparse
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.DBCrawler import DBCrawler
+from crawler.quote import SOURCES, find_last_page
+
+# 페이지 수별 Pages(모드 간 공유)
+SIZES = {}
+
+class Paged(Pages):
+    """
+        Description
+        -----------
+        환율 페이지(10행)의 전체 페이지 수와 범위를 넘은 페이지의 응답을 코드로 지정(marketindexCd=<모드>_<페이지 수>)
+        - empty : 행이 없는 페이지
+        - clamp : 마지막 페이지(현재 페이지 번호가 다름)
+        - nopager : 마지막 페이지(페이지 링크 없음)
+    """
+
+    def __init__(self):
+        super().__init__(days=0)
+
+    def response(self, url):
+        q = parse_qs(urlparse(url).query)
+        mode, last = q['marketindexCd'][0].split('_')
+        last, page = int(last), int(q['page'][0])
+        if last not in SIZES:
+            # 마지막 페이지는 3행 모자라게
+            SIZES[last] = Pages(days=last * 10 - 3)
+        if mode != 'empty':
+            page = min(page, last)
+        content = SIZES[last].daily_quote(page, 10, 3)
+        if mode == 'nopager':
+            content = re.sub(rb'<table class="Nnavi">.*?</table>', b'', content)
+        return 200, content
+
+@pytest.mark.parametrize('mode', ['empty', 'clamp', 'nopager'])
+def test_find_last_page_is_exact(respond, mode):
+    server = respond(Paged())
+    source = SOURCES['fx']
+    for last in range(1, 300):
+        code = '{}_{}'.format(mode, last)
+        content = DBCrawler.http.get(source.page_url(code, 1))
+        server.reset()
+        found, probed = find_last_page(source, code, 1, content)
+        assert found == last, code
+        assert all(page <= last for page in probed)
+        assert server.requests <= 2 * last.bit_length() + 1, code
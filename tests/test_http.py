@@ -0,0 +1,85 @@
+import pytest
+import requests
+from benchmarks.fixtures import Pages
+from crawler import HttpClient as module
+from crawler.DBCrawler import DBCrawler
+from crawler.RateLimiter import RateLimiter
+
+URL = 'https://finance.naver.com/marketindex/exchangeDailyQuote.nhn?marketindexCd=FX_USDKRW&page=1'
+
+class Flaky(Pages):
+    """
+        Description
+        -----------
+        errors의 응답((상태코드, 헤더))을 차례로 돌려준 뒤 정상 응답
+    """
+
+    def __init__(self, errors):
+        super().__init__(days=30)
+        self.errors = list(errors)
+
+    def response(self, url):
+        if self.errors:
+            status, headers = self.errors.pop(0)
+            return status, b'', headers
+        return super().response(url)
+
+@pytest.fixture
+def waits(monkeypatch):
+    """
+        Description
+        -----------
+        재시도 대기시간(기다리지 않고 기록만 함, 공유 HTTP 클라이언트의 재시도 횟수는 3)
+    """
+
+    waits = []
+    monkeypatch.setattr(module.time, 'sleep', waits.append)
+    monkeypatch.setattr(DBCrawler.http, 'retries', 3)
+    return waits
+
+@pytest.mark.parametrize('status', [503, 429])
+def test_retries_until_success(respond, waits, status):
+    http = DBCrawler.http
+    adapter = respond(Flaky([(status, {}), (status, {})]))
+    http.set_rate('finance.naver.com', rate=8, min_rate=1, max_rate=10, increase=1, burst=1000)
+    res = http.request(URL)
+    assert res.status_code == 200 and res.content == Pages(days=30).response(URL)[1]
+    assert adapter.requests == 3
+    assert len(waits) == 2
+    # 실패 2번(8 → 4 → 2), 성공 1번(2 → 3)
+    assert http.limiter('finance.naver.com').rate == 3
+
+def test_retry_after_is_honoured(respond, waits):
+    http = DBCrawler.http
+    respond(Flaky([(429, {'Retry-After': '7'}), (503, {})]))
+    http.request(URL)
+    assert waits[0] == 7
+    # Retry-After가 없으면 지수 백오프(backoff * 2^1 * [0.5, 1.5))
+    assert http.backoff <= waits[1] < 3 * http.backoff
+
+def test_exhausted_retries_raise(respond, waits):
+    http = DBCrawler.http
+    adapter = respond(Flaky([(503, {})] * 10))
+    with pytest.raises(requests.HTTPError) as error:
+        http.request(URL)
+    assert error.value.response.status_code == 503
+    assert adapter.requests == http.retries + 1
+
+def test_client_error_is_not_retried(respond, waits):
+    adapter = respond(Flaky([(404, {})]))
+    with pytest.raises(requests.HTTPError):
+        DBCrawler.http.request(URL)
+    assert adapter.requests == 1 and waits == []
+
+def test_limiter_adjusts_within_bounds():
+    limiter = RateLimiter(rate=8, min_rate=1, max_rate=10, increase=1)
+    limiter.backoff()
+    assert limiter.rate == 4
+    for _ in range(5):
+        limiter.backoff()
+    assert limiter.rate == 1
+    limiter.success()
+    assert limiter.rate == 2
+    for _ in range(20):
+        limiter.success()
+    assert limiter.rate == 10
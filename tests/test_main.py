@@ -0,0 +1,32 @@
+import sqlite3
+import pytest
+from benchmarks.fixtures import Pages
+from crawler.DBCrawler import DBCrawler
+from crawler.__main__ import run
+
+def test_summary_counts_data_rows(serve, tmp_path):
+    serve(Pages(days=300, pnos=30))
+    adapter = DBCrawler.http.session.get_adapter('http://finance.naver.com')
+    database = str(tmp_path / 'db.sqlite')
+    config = {'database': database, 'max_in_flight': DBCrawler.http.max_in_flight, 'jobs': [
+        {'name': 'stock', 'crawler': 'StockPriceCrawler', 'set': {'code': ['005930', '005830'], 'workers': 2}},
+        {'name': 'pno', 'crawler': 'PnoCrawler'},
+    ]}
+    summary, stats = run(config)
+    # 같은 값이면 설치된 어댑터를 그대로 사용
+    assert DBCrawler.http.session.get_adapter('http://finance.naver.com') is adapter
+
+    conn = sqlite3.connect(database)
+    rows = {result['name']: result['rows'] for result in summary}
+    assert [result['status'] for result in summary] == ['ok', 'ok']
+    assert rows['stock'] == conn.execute('SELECT COUNT(*) FROM STOCK_PRICE').fetchone()[0] == 600
+    assert rows['pno'] == conn.execute('SELECT COUNT(*) FROM CETIZEN_PNO').fetchone()[0] == 30
+
+def test_max_in_flight_is_fixed_while_in_use():
+    http = DBCrawler.http
+    max_in_flight = http.max_in_flight
+    with http.in_use():
+        http.set_max_in_flight(max_in_flight)
+        with pytest.raises(RuntimeError, match='사용 중'):
+            http.set_max_in_flight(max_in_flight + 1)
+    assert http.max_in_flight == max_in_flight
@@ -0,0 +1,20 @@
+import threading
+import time
+from crawler.DBCrawler import DBCrawler
+
+def test_closing_map_cancels_queued_items():
+    started = []
+    lock = threading.Lock()
+
+    def work(item):
+        with lock:
+            started.append(item)
+        time.sleep(0.01)
+        return item
+
+    results = DBCrawler._map(work, range(100), workers=2)
+    next(results)
+    results.close()
+    count = len(started)
+    time.sleep(0.05)
+    assert count == len(started) < 10
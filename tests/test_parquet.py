@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from crawler import ParquetStore as module
+from crawler.ParquetStore import ParquetStore
+
+def frame(code, dates, price):
+    # 수집 순서와 같이 최근 날짜부터
+    return pd.DataFrame({'BASE_DATE': sorted(dates, reverse=True), 'CODE': code, 'PRICE': price})
+
+def test_read_is_sorted_by_key_and_date(tmp_path):
+    store = ParquetStore(str(tmp_path))
+    dates = ['2019-12-30', '2019-12-31', '2020-01-02', '2020-01-03']
+    store.append('STOCK_PRICE', frame('005930', dates, 1.0))
+    store.append('STOCK_PRICE', pd.concat([frame('105560', dates, 2.0), frame('005830', dates, 3.0)]))
+
+    df = store.read('STOCK_PRICE')
+    assert list(df['CODE']) == ['005830'] * 4 + ['005930'] * 4 + ['105560'] * 4
+    assert list(df['BASE_DATE']) == dates * 3
+
+    df = store.read('STOCK_PRICE', ['105560', '005930'], start='2019-12-31', end='2020-01-02', columns=['PRICE'])
+    assert list(df.columns) == ['CODE', 'PRICE']
+    assert list(df['CODE']) == ['005930'] * 2 + ['105560'] * 2
+
+def test_read_keeps_date_order_after_rewrite(tmp_path):
+    store = ParquetStore(str(tmp_path), max_files=2)
+    dates = ['2020-01-02', '2020-01-03']
+    store.append('STOCK_PRICE', frame('005930', dates, 1.0))
+    store.append('STOCK_PRICE', frame('005930', ['2020-01-01', '2020-01-03'], 2.0))
+    df = store.read('STOCK_PRICE')
+    assert list(df['BASE_DATE']) == ['2020-01-01', '2020-01-02', '2020-01-03']
+    assert list(df['PRICE']) == [2.0, 1.0, 2.0]
+    store.compact('STOCK_PRICE')
+    pd.testing.assert_frame_equal(store.read('STOCK_PRICE'), df)
+
+def test_old_pyarrow_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.setattr(module.pa, '__version__', '13.0.0')
+    with pytest.raises(ImportError, match='pyarrow 14'):
+        ParquetStore(str(tmp_path))